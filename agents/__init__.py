@@ -1,5 +1,30 @@
+from importlib import import_module
+
 from .random_agent import RandomAgent
 from .smart_random_agent import SmartRandomAgent
-from .ppo_agent import PPOAgent
+from .perfect_agent import PerfectAgent
+from .fast_policy_agent import FastPolicyAgent
+from .model_registry import ModelRegistry, get_model_registry
+
+# Agents backed by torch / stable_baselines3, imported on first use
+_LAZY_ATTRIBUTES = {
+    "PPOAgent": ".ppo_agent",
+    "MCTSAgent": ".mcts_agent",
+    "InferenceServer": ".inference_server",
+    "RemotePPOAgent": ".inference_server",
+}
+
+__all__ = ["RandomAgent", "SmartRandomAgent", "PPOAgent", "PerfectAgent", "MCTSAgent", "FastPolicyAgent", "InferenceServer", "RemotePPOAgent",
+           "ModelRegistry", "get_model_registry"]
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        value = getattr(import_module(_LAZY_ATTRIBUTES[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
-__all__ = ["RandomAgent", "SmartRandomAgent", "PPOAgent"]
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
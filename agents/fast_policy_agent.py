@@ -0,0 +1,51 @@
+import numpy as np
+
+from utils.policy_export import FastPolicy
+
+
+class FastPolicyAgent:
+    def __init__(self, policy_path, evaluation=False):
+        """
+        Initialize an agent from an exported policy (utils/policy_export.py).
+
+        The policy forward pass runs with NumPy only: no torch, stable_baselines3 or
+        gymnasium at serve time, millisecond loading and per-move latency.
+
+        :param policy_path: Path to the exported policy file (.npz).
+        :param evaluation: If True, the agent plays the most likely valid action.
+                           If False, it samples from the masked action distribution
+                           (like PPOAgent).
+        """
+        self.policy = FastPolicy(policy_path)
+        self.evaluation = evaluation
+        self.rng = np.random.default_rng()
+
+    def play(self, observation):
+        """
+        Decide the next action given the current observation.
+
+        :param observation: Dictionary containing:
+                            - 'observation': The game board state (numpy array).
+                            - 'action_mask': A binary mask (1 = valid action, 0 = invalid action).
+                            - 'current_player': The player to move.
+        :return: The selected action (integer index).
+        """
+        observations = {key: np.asarray(value)[None] for key, value in observation.items()}
+        return int(self.play_batch(observations)[0])
+
+    def play_batch(self, observations):
+        """
+        Decide the next action of several games with a single forward pass.
+
+        :param observations: Dictionary of stacked observations (first axis = game).
+        :return: Array with one selected action per game.
+        """
+        logits = self.policy.logits(np.asarray(observations["observation"]), np.asarray(observations["current_player"]))
+        mask = np.asarray(observations["action_mask"]).reshape(logits.shape) > 0
+        logits = np.where(mask, logits, -np.inf)
+        if self.evaluation:
+            return logits.argmax(axis=1)
+
+        # Sample from the masked softmax (Gumbel-max trick)
+        gumbel = -np.log(-np.log(self.rng.random(logits.shape)))
+        return (logits + gumbel).argmax(axis=1)
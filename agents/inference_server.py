@@ -0,0 +1,288 @@
+import os
+import queue
+import threading
+import time
+from multiprocessing.connection import Listener, Client, wait
+
+import numpy as np
+import torch as th
+
+from agents.ppo_agent import PPOAgent
+from configs.config import INFERENCE_MAX_BATCH_WAIT, INFERENCE_MAX_BATCH_SIZE
+
+
+def policy_actions(agent, observations, deterministic=False):
+    """
+    Actions of a PPOAgent for stacked observations with one policy forward pass.
+
+    Skips MaskablePPO.predict's per-call checks and conversions: the observations
+    are turned into tensors once and the masked action distribution is evaluated
+    under torch.no_grad.
+
+    Parameters:
+    - agent (PPOAgent): loaded PPO agent
+    - observations (dict): stacked observations (first axis = game)
+    - deterministic (bool): take the most likely action instead of sampling
+
+    Returns:
+    - np.ndarray: one action per game
+    """
+    policy = agent.agent.policy
+    obs_tensor, _ = policy.obs_to_tensor(agent.model_observation(observations))
+    with th.no_grad():
+        distribution = policy.get_distribution(obs_tensor, action_masks=observations["action_mask"])
+        actions = distribution.get_actions(deterministic=deterministic)
+    return actions.cpu().numpy()
+
+
+class InferenceServer:
+    """
+    Batched inference service for PPO opponents.
+
+    Clients (environments) send single observations tagged with the checkpoint path
+    of their opponent. The server waits at most max_batch_wait seconds after the first
+    pending request, then runs one forward pass per checkpoint on the gathered
+    observations and sends every action back to its client.
+
+    Every checkpoint is loaded once, in the process running the server. Clients talk
+    to it through a multiprocessing.connection socket, so they work the same from
+    threads of this process and from subprocess workers (they only carry the server
+    address and connect on their first request, which keeps them picklable).
+
+    Replies are ("ok", action) or ("error", message): a request that cannot be
+    answered (unknown checkpoint, malformed observation) fails on its client without
+    stopping the server, and connections whose client went away are dropped.
+    """
+
+    def __init__(self,
+                 agent_paths,
+                 max_batch_wait=INFERENCE_MAX_BATCH_WAIT,
+                 max_batch_size=INFERENCE_MAX_BATCH_SIZE,
+                 deterministic=False):
+        """
+        Parameters:
+        - agent_paths (list[str]): PPO checkpoints (.zip) served
+        - max_batch_wait (float): seconds waited to fill a batch after its first request
+        - max_batch_size (int): maximum number of requests per batch
+        - deterministic (bool): deterministic opponent actions
+        """
+        self.agents = {path: PPOAgent(agent_path=path) for path in agent_paths}
+        self.max_batch_wait = max_batch_wait
+        self.max_batch_size = max_batch_size
+        self.deterministic = deterministic
+
+        self.authkey = os.urandom(16)
+        self.listener = None
+        self.connections = []                  # only used by the serving thread
+        self.new_connections = queue.Queue()   # accepted connections, handed over to the serving thread
+        self.running = False
+        self.threads = []
+
+        # Counters
+        self.n_batches = 0
+        self.n_requests = 0
+
+    @property
+    def address(self):
+        return self.listener.address
+
+    def client(self):
+        """Return a new InferenceClient of this server (the server must be started)."""
+        return InferenceClient(self.address, self.authkey)
+
+    # ---------------------------
+    # Serving loop
+    # ---------------------------
+    def start(self):
+        """Open the socket and serve requests in background daemon threads."""
+        if not self.running:
+            self.listener = Listener(authkey=self.authkey)
+            self.running = True
+            self.threads = [
+                threading.Thread(target=self.accept_forever, daemon=True),
+                threading.Thread(target=self.serve_forever, daemon=True),
+            ]
+            for thread in self.threads:
+                thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and close every connection."""
+        if self.running:
+            self.running = False
+            # Wake up the accepting thread
+            try:
+                Client(self.address, authkey=self.authkey).close()
+            except OSError:
+                pass
+            for thread in self.threads:
+                thread.join()
+            self.listener.close()
+            self.register_connections()
+            for connection in self.connections:
+                connection.close()
+            self.connections = []
+
+    def accept_forever(self):
+        """Register incoming client connections."""
+        while self.running:
+            try:
+                connection = self.listener.accept()
+            except OSError:
+                return
+            if self.running:
+                self.new_connections.put(connection)
+            else:
+                connection.close()
+
+    def register_connections(self):
+        """Take over the connections accepted since the last call."""
+        while True:
+            try:
+                self.connections.append(self.new_connections.get_nowait())
+            except queue.Empty:
+                return
+
+    def drop(self, connection):
+        """Close a connection and forget it."""
+        if connection in self.connections:
+            self.connections.remove(connection)
+        connection.close()
+
+    def send(self, connection, reply):
+        """Send a reply, dropping the connection if its client went away."""
+        try:
+            connection.send(reply)
+        except OSError:  # BrokenPipeError, ConnectionResetError, ...
+            self.drop(connection)
+
+    def serve_forever(self):
+        """Gather and answer batches until stop() is called."""
+        while self.running:
+            batch = self.next_batch()
+            if batch:
+                self.answer(batch)
+
+    def receive(self, connections, batch):
+        """Read one request from each ready connection, dropping closed ones."""
+        for connection in connections:
+            try:
+                request = connection.recv()
+            except (EOFError, OSError):
+                self.drop(connection)
+                continue
+            except Exception as error:  # Unpicklable payload
+                self.send(connection, ("error", f"invalid request: {error!r}"))
+                continue
+            if not (isinstance(request, tuple) and len(request) == 2):
+                self.send(connection, ("error", "invalid request: expected (agent_path, observation)"))
+                continue
+            path, observation = request
+            batch.append((connection, path, observation))
+
+    def next_batch(self):
+        """
+        Wait for a first request, then gather requests until max_batch_wait has
+        elapsed or the batch is full. Each client has at most one pending request,
+        so the batch is returned at once when every connected client (or the only
+        one) already has its request in it: waiting longer could not fill it more.
+        """
+        batch = []
+        self.register_connections()
+        # Short timeout so that new connections and stop() are taken into account
+        self.receive(wait(list(self.connections), timeout=0.05), batch)
+        if not batch:
+            return batch
+
+        deadline = time.perf_counter() + self.max_batch_wait
+        while len(batch) < self.max_batch_size:
+            pending = {id(request[0]) for request in batch}
+            waiting = [connection for connection in self.connections if id(connection) not in pending]
+            if not waiting:
+                break
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            ready = wait(waiting, timeout=timeout)
+            if not ready:
+                break
+            self.receive(ready, batch)
+        return batch
+
+    def answer(self, batch):
+        """
+        Run one forward pass per checkpoint and send the actions back. A checkpoint
+        whose requests cannot be answered gets an error reply for each of them.
+        """
+        self.n_batches += 1
+        self.n_requests += len(batch)
+
+        by_path = {}
+        for connection, path, observation in batch:
+            by_path.setdefault(path, []).append((connection, observation))
+
+        for path, requests in by_path.items():
+            try:
+                if path not in self.agents:
+                    raise KeyError(f"checkpoint not served: {path}")
+                observations = {
+                    key: np.stack([observation[key] for _, observation in requests])
+                    for key in requests[0][1]
+                }
+                actions = policy_actions(self.agents[path], observations, self.deterministic).tolist()
+            except Exception as error:
+                for connection, _ in requests:
+                    self.send(connection, ("error", repr(error)))
+                continue
+            for (connection, _), action in zip(requests, actions):
+                self.send(connection, ("ok", action))
+
+    def stats(self):
+        """Return the number of batches and requests served."""
+        return {
+            "batches": self.n_batches,
+            "requests": self.n_requests,
+            "mean_batch_size": self.n_requests / self.n_batches if self.n_batches else 0.0,
+        }
+
+
+class InferenceClient:
+    """
+    Client side of an InferenceServer: one pending request at a time.
+    Connects on the first request, so it can be pickled to a worker process.
+    """
+
+    def __init__(self, address, authkey):
+        self.address = address
+        self.authkey = authkey
+        self.connection = None
+
+    def __getstate__(self):
+        return {"address": self.address, "authkey": self.authkey, "connection": None}
+
+    def play(self, agent_path, observation):
+        """
+        Send an observation to the server and wait for the opponent action.
+        Raises RuntimeError if the server could not answer the request.
+        """
+        if self.connection is None:
+            self.connection = Client(self.address, authkey=self.authkey)
+        self.connection.send((agent_path, observation))
+        status, result = self.connection.recv()
+        if status == "error":
+            raise RuntimeError(f"❌ Inference server error: {result}")
+        return result
+
+
+class RemotePPOAgent:
+    """
+    Stand-in for a PPOAgent whose moves are computed by an InferenceServer.
+    Has the same play(observation) interface, without loading the checkpoint.
+    """
+
+    def __init__(self, agent_path, client):
+        self.agent_path = agent_path
+        self.client = client
+
+    def play(self, observation):
+        return self.client.play(self.agent_path, observation)
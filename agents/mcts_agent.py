@@ -0,0 +1,246 @@
+import math
+import random
+import time
+
+import numpy as np
+import torch as th
+
+from agents.ppo_agent import PPOAgent
+from utils.bitboard import BitBoard, get_winning_lines, wins_through
+from utils.solver import board_bits
+from configs.config import *
+
+
+class Node:
+    """
+    Position of the search tree, seen from the player to move.
+
+    Edge statistics are stored in arrays indexed like `actions`: visits and value
+    sums (from the point of view of the player to move here), policy priors, and the
+    child reached through each edge once it has been created.
+    """
+
+    __slots__ = ("bits", "player", "terminal_value", "actions", "priors", "visits", "value_sums", "children", "pending")
+
+    def __init__(self, bits, player, terminal_value=None):
+        self.bits = bits                        # (player 0 marks, player 1 marks)
+        self.player = player                    # player to move
+        self.terminal_value = terminal_value    # value for the player to move if the game is over
+        self.actions = None                     # set when the node is expanded
+        self.priors = None
+        self.visits = None
+        self.value_sums = None
+        self.children = None
+        self.pending = False                    # waiting for its batched evaluation
+
+    def expanded(self):
+        return self.actions is not None
+
+
+class MCTSAgent:
+    """
+    Monte Carlo Tree Search (PUCT) guided by a trained MaskablePPO agent.
+
+    The masked action distribution of the policy gives the priors of a position and
+    the value head its evaluation. Leaves are selected batch_size at a time, each
+    path receiving a virtual loss so that the next selections explore other
+    branches, and the whole batch is evaluated with a single forward pass.
+
+    The search stops after n_simulations simulations or time_budget seconds per move,
+    whichever comes first. The most visited move is played (deterministic), or a
+    move sampled proportionally to the visit counts.
+    """
+
+    def __init__(self,
+                 agent_path,
+                 n_simulations=MCTS_SIMULATIONS,
+                 time_budget=None,
+                 batch_size=MCTS_BATCH_SIZE,
+                 c_puct=MCTS_C_PUCT,
+                 deterministic=True):
+        """
+        Parameters:
+        - agent_path (str or PPOAgent): trained PPO agent file (.zip) or loaded agent
+        - n_simulations (int): maximum number of simulations per move
+        - time_budget (float): maximum search time per move in seconds (None: no limit)
+        - batch_size (int): number of leaves evaluated per forward pass
+        - c_puct (float): exploration constant
+        - deterministic (bool): play the most visited move instead of sampling by visit count
+        """
+        self.ppo_agent = agent_path if isinstance(agent_path, PPOAgent) else PPOAgent(agent_path)
+        self.policy = self.ppo_agent.agent.policy
+        self.n_simulations = n_simulations
+        self.time_budget = time_budget
+        self.batch_size = batch_size
+        self.c_puct = c_puct
+        self.deterministic = deterministic
+        self.lines = None
+        self.n_evaluations = 0
+
+    # ---------------------------
+    # Playing
+    # ---------------------------
+    def play(self, player, gameboard, valid_moves, board_length=DEFAULT_BOARD_LENGTH, pattern_victory_length=DEFAULT_PATTERN_VICTORY_LENGTH):
+        """
+        Selects the next move for the player.
+
+        Parameters:
+        - player (int): The current player (0 or 1).
+        - gameboard (np.array or BitBoard): Current game board state.
+        - valid_moves (list or array): List of valid action indices.
+        - board_length (int): Size of the board (taken from the gameboard when possible).
+        - pattern_victory_length (int): Number of consecutive marks needed to win.
+
+        Returns:
+        - The index of the chosen action (int).
+        """
+        if isinstance(gameboard, BitBoard):
+            board_length = gameboard.lines.board_length
+            pattern_victory_length = gameboard.lines.pattern_victory_length
+            bits = tuple(gameboard.players)
+        else:
+            board_length = int(np.sqrt(np.asarray(gameboard).size))
+            bits = board_bits(gameboard)
+
+        valid_moves = [int(move) for move in valid_moves]
+        if len(valid_moves) == 1:
+            return valid_moves[0]
+
+        visits = self.search(bits, int(player), board_length, pattern_victory_length)
+        moves = [move for move in valid_moves if move in visits]
+        counts = np.array([visits[move] for move in moves], dtype=np.float64)
+        if self.deterministic or counts.sum() == 0:
+            return moves[int(counts.argmax())]
+        return random.choices(moves, weights=counts)[0]
+
+    def search(self, bits, player, board_length, pattern_victory_length):
+        """
+        Run the search from a position.
+
+        Returns:
+        - dict: action -> visit count of the root edges
+        """
+        if self.lines is None or (self.lines.board_length, self.lines.pattern_victory_length) != (board_length, pattern_victory_length):
+            self.lines = get_winning_lines(board_length, pattern_victory_length)
+
+        root = Node(bits, player)
+        self.evaluate([root])
+        deadline = None if self.time_budget is None else time.perf_counter() + self.time_budget
+
+        simulations = 0
+        while simulations < self.n_simulations:
+            leaves = []
+            for _ in range(min(self.batch_size, self.n_simulations - simulations)):
+                path, leaf = self.select(root)
+                if leaf.pending:
+                    # Already waiting in this batch: give the virtual loss back and stop filling
+                    self.backup(path, None)
+                    break
+                simulations += 1
+                if leaf.terminal_value is not None:
+                    self.backup(path, leaf.terminal_value)
+                else:
+                    leaf.pending = True
+                    leaves.append((path, leaf))
+            if leaves:
+                values = self.evaluate([leaf for _, leaf in leaves])
+                for (path, _), value in zip(leaves, values):
+                    self.backup(path, value)
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+
+        return dict(zip(root.actions.tolist(), root.visits.tolist()))
+
+    # ---------------------------
+    # Tree operations
+    # ---------------------------
+    def select(self, root):
+        """
+        Walk down the tree with PUCT, adding a virtual loss on every edge taken.
+
+        Returns:
+        - tuple: (path as a list of (node, edge index), reached leaf)
+        """
+        node, path = root, []
+        while node.expanded() and node.terminal_value is None:
+            total = node.visits.sum()
+            q = np.divide(node.value_sums, node.visits, out=np.zeros_like(node.value_sums), where=node.visits > 0)
+            u = self.c_puct * node.priors * math.sqrt(total + 1) / (1 + node.visits)
+            index = int(np.argmax(q + u))
+
+            # Virtual loss: count the visit as a lost one until its value is known
+            node.visits[index] += 1
+            node.value_sums[index] -= 1
+            path.append((node, index))
+
+            child = node.children[index]
+            if child is None:
+                child = self.child(node, int(node.actions[index]))
+                node.children[index] = child
+            node = child
+        return path, node
+
+    def child(self, node, action):
+        """Create the node reached by playing action."""
+        bits = list(node.bits)
+        bits[node.player] |= self.lines.cell_bits[action]
+        terminal_value = None
+        if wins_through(bits[node.player], action, self.lines):
+            terminal_value = -1.0  # the player to move has just lost
+        elif bits[0] | bits[1] == self.lines.full_mask:
+            terminal_value = 0.0
+        return Node(tuple(bits), 1 - node.player, terminal_value)
+
+    @staticmethod
+    def backup(path, value):
+        """
+        Replace the virtual losses of a path by the leaf value (seen from the player
+        to move at the leaf), or just remove them when value is None.
+        """
+        for node, index in reversed(path):
+            if value is None:
+                node.visits[index] -= 1
+                node.value_sums[index] += 1
+                continue
+            value = -value
+            node.value_sums[index] += 1 + value
+
+    def evaluate(self, nodes):
+        """
+        Expand nodes with one policy / value forward pass.
+
+        Returns:
+        - np.ndarray: value of each node for its player to move, in [-1, 1]
+        """
+        self.n_evaluations += 1
+        n_cells = self.lines.n_cells
+        boards = np.full((len(nodes), n_cells), EMPTY_CELL, dtype=np.int8)
+        for i, node in enumerate(nodes):
+            for player in (0, 1):
+                cells = [cell for cell in range(n_cells) if node.bits[player] >> cell & 1]
+                boards[i, cells] = player
+        masks = boards == EMPTY_CELL
+        board_length = self.lines.board_length
+        observations = {
+            "observation": boards.reshape(-1, board_length, board_length),
+            "action_mask": masks.astype(np.float32),
+            "current_player": np.array([node.player for node in nodes], dtype=np.float32),
+            "is_done": np.zeros(len(nodes), dtype=np.float32),
+        }
+
+        obs_tensor, _ = self.policy.obs_to_tensor(self.ppo_agent.model_observation(observations))
+        with th.no_grad():
+            distribution = self.policy.get_distribution(obs_tensor, action_masks=masks)
+            priors = distribution.distribution.probs.cpu().numpy()
+            values = self.policy.predict_values(obs_tensor).cpu().numpy().ravel()
+        values = np.clip(values / REWARD_VICTORY, -1.0, 1.0)
+
+        for i, node in enumerate(nodes):
+            node.actions = np.flatnonzero(masks[i])
+            node_priors = priors[i, node.actions]
+            node.priors = node_priors / node_priors.sum() if node_priors.sum() > 0 else np.full(len(node.actions), 1 / len(node.actions))
+            node.visits = np.zeros(len(node.actions), dtype=np.float64)
+            node.value_sums = np.zeros(len(node.actions), dtype=np.float64)
+            node.children = [None] * len(node.actions)
+            node.pending = False
+        return values
@@ -0,0 +1,137 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from configs.config import MODEL_REGISTRY_MAX_MODELS, MODEL_REGISTRY_MAX_BYTES
+
+
+def model_size(model):
+    """Memory used by the parameters and buffers of a model's policy, in bytes."""
+    tensors = list(model.policy.parameters()) + list(model.policy.buffers())
+    return sum(tensor.numel() * tensor.element_size() for tensor in tensors)
+
+
+class ModelRegistry:
+    """
+    Process-wide cache of loaded MaskablePPO agents.
+
+    Models are keyed by agent file path and modification time, so a checkpoint
+    overwritten on disk is loaded again. Every PPOAgent of the same file shares one
+    loaded model (inference only: predict runs under torch.no_grad and does not
+    modify it, so it can be used from several threads). Least recently used models
+    are evicted when more than max_models models or max_bytes bytes of parameters
+    are loaded.
+    """
+
+    def __init__(self, max_models=MODEL_REGISTRY_MAX_MODELS, max_bytes=MODEL_REGISTRY_MAX_BYTES):
+        """
+        Parameters:
+        - max_models (int): maximum number of loaded models
+        - max_bytes (int): maximum total size of the loaded models' parameters
+        """
+        self.max_models = max_models
+        self.max_bytes = max_bytes
+        self.models = OrderedDict()  # (path, mtime_ns) -> (model, size)
+        self.lock = threading.Lock()
+        self.loading_locks = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.load_time = 0.0
+        self.last_load_times = {}
+
+    @staticmethod
+    def key(agent_path):
+        path = os.path.abspath(agent_path)
+        return path, os.stat(path).st_mtime_ns
+
+    def get(self, agent_path):
+        """Return the loaded MaskablePPO of an agent file, loading it on a miss."""
+        key = self.key(agent_path)
+        with self.lock:
+            entry = self.models.get(key)
+            if entry is not None:
+                self.models.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            loading_lock = self.loading_locks.setdefault(key, threading.Lock())
+
+        # One thread loads a given file, the others wait for it
+        with loading_lock:
+            with self.lock:
+                entry = self.models.get(key)
+                if entry is not None:
+                    self.models.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+                self.misses += 1
+
+            from sb3_contrib import MaskablePPO
+
+            start = time.perf_counter()
+            model = MaskablePPO.load(key[0])
+            elapsed = time.perf_counter() - start
+
+            with self.lock:
+                self.load_time += elapsed
+                self.last_load_times[key[0]] = elapsed
+                # Drop older versions of the same file
+                for stale in [other for other in self.models if other[0] == key[0]]:
+                    del self.models[stale]
+                self.models[key] = (model, model_size(model))
+                self.evict()
+                self.loading_locks.pop(key, None)
+        return model
+
+    def evict(self):
+        """Evict least recently used models beyond the count and memory limits (keeps the newest)."""
+        while len(self.models) > 1 and (len(self.models) > self.max_models or self.total_bytes() > self.max_bytes):
+            self.models.popitem(last=False)
+            self.evictions += 1
+
+    def total_bytes(self):
+        return sum(size for _, size in self.models.values())
+
+    def preload(self, agents_dir="best_agents"):
+        """Load every agent file of a directory (up to the registry limits). Returns the number loaded."""
+        if not os.path.isdir(agents_dir):
+            return 0
+        paths = sorted(os.path.join(agents_dir, name) for name in os.listdir(agents_dir) if name.endswith(".zip"))
+        for path in paths[-self.max_models:]:
+            self.get(path)
+        return min(len(paths), self.max_models)
+
+    def clear(self):
+        with self.lock:
+            self.models.clear()
+
+    def stats(self):
+        with self.lock:
+            requests = self.hits + self.misses
+            return {
+                "models": [path for path, _ in self.models],
+                "n_models": len(self.models),
+                "bytes": self.total_bytes(),
+                "max_models": self.max_models,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / requests if requests else 0.0,
+                "evictions": self.evictions,
+                "total_load_time": self.load_time,
+                "mean_load_time": self.load_time / self.misses if self.misses else 0.0,
+                "last_load_times": dict(self.last_load_times),
+            }
+
+
+_model_registry = None
+
+
+def get_model_registry():
+    """Return the process-wide ModelRegistry."""
+    global _model_registry
+    if _model_registry is None:
+        _model_registry = ModelRegistry()
+    return _model_registry
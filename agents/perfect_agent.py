@@ -0,0 +1,76 @@
+import random
+
+import numpy as np
+
+from utils.bitboard import BitBoard
+from utils.solver import get_solution_table, board_bits
+from utils.transposition import bits_boards_batch, heuristic_differences
+from configs.config import *
+
+
+class PerfectAgent:
+    """
+    An agent playing perfectly, using the exact solver (utils/solver.py):
+    - It wins as fast as possible when the position is won.
+    - It draws when the position is drawn, and delays the defeat as long as possible otherwise.
+    - Among equally good moves, it picks one at random (unless deterministic).
+
+    Exact play is only practical on small boards (3x3, 4x4 with a 3-in-a-row victory).
+    On boards larger than SOLVER_TABLE_MAX_CELLS, positions missing from a saved
+    solution table are searched max_depth plies deep only: wins and losses forced
+    within that horizon are still played exactly, and the unresolved moves are
+    ranked by the heuristic (utils/transposition.py), so games never stall.
+    """
+
+    def __init__(self, deterministic=False, max_depth=PERFECT_AGENT_MAX_DEPTH):
+        """
+        Parameters:
+        - deterministic (bool): always play the first optimal move instead of a random one
+        - max_depth (int): search depth (plies) on boards larger than SOLVER_TABLE_MAX_CELLS (None: exact)
+        """
+        self.deterministic = deterministic
+        self.max_depth = max_depth
+
+    def play(self, player, gameboard, valid_moves, board_length=DEFAULT_BOARD_LENGTH, pattern_victory_length=DEFAULT_PATTERN_VICTORY_LENGTH):
+        """
+        Selects the next move for the player.
+
+        Parameters:
+        - player (int): The current player (0 or 1).
+        - gameboard (np.array or BitBoard): Current game board state.
+        - valid_moves (list or array): List of valid action indices.
+        - board_length (int): Size of the board (taken from the gameboard when possible).
+        - pattern_victory_length (int): Number of consecutive marks needed to win.
+
+        Returns:
+        - The index of the chosen action (int).
+        """
+        if isinstance(gameboard, BitBoard):
+            board_length = gameboard.lines.board_length
+            pattern_victory_length = gameboard.lines.pattern_victory_length
+            bits = gameboard.players
+        else:
+            board_length = int(np.sqrt(np.asarray(gameboard).size))
+            bits = board_bits(gameboard)
+
+        table = get_solution_table(board_length, pattern_victory_length)
+        max_depth = None if board_length * board_length <= SOLVER_TABLE_MAX_CELLS else self.max_depth
+        scores = table.move_scores_bits(bits[player], bits[1 - player], max_depth)
+        valid_moves = [int(move) for move in valid_moves if int(move) in scores]
+        best_score = max(scores[move] for move in valid_moves)
+        best_moves = [move for move in valid_moves if scores[move] == best_score]
+        if max_depth is not None and best_score == 0 and len(best_moves) > 1:
+            best_moves = self.best_heuristic_moves(player, bits, best_moves, board_length, pattern_victory_length)
+        return best_moves[0] if self.deterministic else random.choice(best_moves)
+
+    @staticmethod
+    def best_heuristic_moves(player, bits, moves, board_length, pattern_victory_length):
+        """Keep the moves leaving the best heuristic difference for the player (unresolved positions)."""
+        positions = []
+        for move in moves:
+            after = list(bits)
+            after[player] |= 1 << move
+            positions.append(tuple(after))
+        boards = bits_boards_batch(positions, board_length)
+        values = heuristic_differences(boards, player, board_length, pattern_victory_length)
+        return [move for move, value in zip(moves, values) if value == values.max()]
@@ -1,15 +1,17 @@
-from sb3_contrib import MaskablePPO
+from agents.model_registry import get_model_registry
 
 class PPOAgent:
     def __init__(self, agent_path, evaluation=False):
         """
         Initialize the PPO agent.
 
-        :param agent_path: Path to the trained PPO agent file (.zip).
+        :param agent_path: Path to the trained PPO agent file (.zip), loaded once per process
+                           and shared through the model registry.
         :param evaluation: If True, the agent will act deterministically (for evaluation only).
                            If False, the agent will use stochastic actions (for training or exploration).
         """
-        self.agent = MaskablePPO.load(agent_path)
+        self.agent_path = agent_path
+        self.agent = get_model_registry().get(agent_path)
         self.evaluation = evaluation
 
     def play(self, observation):
@@ -25,8 +27,31 @@ class PPOAgent:
 
         # Predict action based on the current observation and valid actions
         action, _ = self.agent.predict(
-            observation,
+            self.model_observation(observation),
             deterministic=self.evaluation,  # Deterministic if evaluation mode is on
             action_masks=action_mask         # Restrict predictions to valid actions
         )
         return action
+
+    def play_batch(self, observations):
+        """
+        Decide the next action of several games with a single forward pass.
+
+        :param observations: Dictionary of stacked observations (first axis = game),
+                             with the same keys as the single-game observation.
+        :return: Array with one selected action per game.
+        """
+        actions, _ = self.agent.predict(
+            self.model_observation(observations),
+            deterministic=self.evaluation,
+            action_masks=observations["action_mask"]
+        )
+        return actions
+
+    def model_observation(self, observation):
+        """
+        Keep only the observation keys the model was trained with
+        (older agents were saved before the 'is_done' key existed).
+        """
+        keys = self.agent.observation_space.spaces
+        return {key: value for key, value in observation.items() if key in keys}
@@ -1,5 +1,6 @@
 import random
 from utils.heuristics import is_winning_move
+from utils.bitboard import BitBoard
 from configs.config import *
 
 class SmartRandomAgent:
@@ -20,7 +21,7 @@ class SmartRandomAgent:
 
         Parameters:
         - player (int): The current player (0 or 1).
-        - gameboard (np.array): Current game board state.
+        - gameboard (np.array or BitBoard): Current game board state.
         - valid_moves (list or array): List of valid action indices.
         - board_length (int): Size of the board (default from config).
         - pattern_victory_length (int): Number of consecutive marks needed to win.
@@ -29,6 +30,10 @@ class SmartRandomAgent:
         - The index of the chosen action (int).
         """
 
+        # Convert once, both lookups below then work on bitboards
+        if not isinstance(gameboard, BitBoard):
+            gameboard = BitBoard.from_gameboard(gameboard, pattern_victory_length)
+
         winning_move = is_winning_move(player, gameboard, board_length, pattern_victory_length, valid_moves)
         blocking_move = is_winning_move(1 - player, gameboard, board_length, pattern_victory_length, valid_moves)
 
@@ -0,0 +1,86 @@
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Import time budgets (ms, cumulative, as reported by python -X importtime) of the
+# entry points used by the CLI and the API, and modules they must not import
+BUDGETS = {
+    "envs": 400,
+    "agents": 400,
+    "fastapi_app.main": 1500,
+}
+FORBIDDEN_MODULES = ("torch", "stable_baselines3", "sb3_contrib", "matplotlib", "PIL", "pandas")
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|\s*(\S+)")
+
+
+def import_profile(module, runs=3):
+    """
+    Import a module in fresh interpreters with -X importtime.
+
+    Returns:
+    - tuple: (best cumulative import time of the module in ms, set of imported modules)
+    """
+    best, imported = None, set()
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=PROJECT_ROOT, capture_output=True, text=True, check=True,
+        )
+        cumulative = None
+        for line in result.stderr.splitlines():
+            match = IMPORTTIME_LINE.match(line)
+            if match is None:
+                continue
+            imported.add(match.group(3))
+            if match.group(3) == module:
+                cumulative = int(match.group(2)) / 1000
+        best = cumulative if best is None else min(best, cumulative)
+    return best, imported
+
+
+def command_time(args, runs=3):
+    """Best wall time (ms) of a command run from the project root."""
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + args, cwd=PROJECT_ROOT, capture_output=True, check=True)
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the import time of the CLI and API entry points against their budget")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters per measure (best is kept)")
+    parser.add_argument("--cli-budget", type=float, default=1000, help="Budget (ms) of 'python play/game.py -m'")
+    args = parser.parse_args()
+
+    failures = []
+    for module, budget in BUDGETS.items():
+        elapsed, imported = import_profile(module, args.runs)
+        heavy = sorted(name for name in FORBIDDEN_MODULES if name in imported)
+        status = "ok" if elapsed <= budget and not heavy else "FAIL"
+        print(f"{module:<20} {elapsed:8.1f} ms (budget {budget} ms) {status}" + (f" imports {', '.join(heavy)}" if heavy else ""))
+        if status != "ok":
+            failures.append(module)
+
+    elapsed = command_time(["play/game.py", "-m"], args.runs)
+    status = "ok" if elapsed <= args.cli_budget else "FAIL"
+    print(f"{'play/game.py -m':<20} {elapsed:8.1f} ms (budget {args.cli_budget:.0f} ms) {status}")
+    if status != "ok":
+        failures.append("play/game.py -m")
+
+    if failures:
+        print(f"❌ Over budget: {', '.join(failures)}")
+        sys.exit(1)
+    print("✅ Every entry point is within its startup budget")
+
+
+if __name__ == "__main__":
+    main()
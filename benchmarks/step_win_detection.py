@@ -0,0 +1,126 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from envs import TicTacToeBaseEnv
+from configs.config import EMPTY_CELL
+from utils.bitboard import BitBoard
+from utils.heuristics import (
+    win_on_line,
+    win_on_column,
+    win_on_descending_diagonal,
+    win_on_ascending_diagonal,
+    win_from_move,
+    board_is_full,
+)
+
+
+class StringWinDetectionEnv(TicTacToeBaseEnv):
+    """
+    Reference environment reproducing the former step(): mask rebuilt from the
+    gameboard and string-based victory check. Used only to measure the gain of
+    the last-move detection on bitboards.
+    """
+
+    def valid_actions(self):
+        mask = np.zeros(self.board_length * self.board_length, dtype=np.int8)
+        mask[np.where(self.gameboard.flatten() == EMPTY_CELL)[0]] = 1
+        return mask
+
+    def step(self, action):
+        if self.valid_actions()[action] == 0:
+            raise ValueError("Invalid action: cell already occupied.")
+
+        line, column = divmod(action, self.board_length)
+        self.gameboard[line][column] = self.player
+
+        terminated = bool(
+            win_on_ascending_diagonal(self.board_length, line, column, self.player, self.gameboard, self.pattern_victory_length) or
+            win_on_descending_diagonal(self.board_length, line, column, self.player, self.gameboard, self.pattern_victory_length) or
+            win_on_line(line, self.player, self.gameboard, self.pattern_victory_length) or
+            win_on_column(column, self.player, self.gameboard, self.pattern_victory_length) or
+            board_is_full(self.gameboard)
+        )
+        self.is_done = terminated
+        self.player = 1 - self.player
+        return self.get_observation(), 0, terminated, False, {}
+
+
+def steps_per_second(env_class, board_length, pattern_victory_length, n_steps, seed=0):
+    """
+    Play random games with the given environment class and return the number of
+    step() calls per second (heuristic reward disabled, to isolate win detection).
+    """
+    random.seed(seed)
+    env = env_class(board_length=board_length, pattern_victory_length=pattern_victory_length, active_heuristic=False)
+    env.reset()
+    steps = 0
+    start = time.perf_counter()
+    while steps < n_steps:
+        valid_moves = np.where(env.valid_actions() == 1)[0]
+        _, _, terminated, _, _ = env.step(random.choice(valid_moves))
+        steps += 1
+        if terminated:
+            env.reset()
+    return steps / (time.perf_counter() - start)
+
+
+def checks_per_second(board_length, pattern_victory_length, n_checks, seed=0):
+    """
+    Compare the raw cost of the string-based check, of win_from_move and of the
+    bitboard check on the same random positions.
+    Returns (string_checks_per_sec, incremental_checks_per_sec, bitboard_checks_per_sec).
+    """
+    rng = np.random.default_rng(seed)
+    boards = rng.choice([0, 1, 3], size=(n_checks, board_length, board_length)).astype(np.int8)
+    cells = rng.integers(0, board_length, size=(n_checks, 2))
+    # The checked cell always holds the mark that was just placed
+    boards[np.arange(n_checks), cells[:, 0], cells[:, 1]] = rng.integers(0, 2, size=n_checks)
+    L, K = board_length, pattern_victory_length
+
+    start = time.perf_counter()
+    for board, (x, y) in zip(boards, cells):
+        p = int(board[x, y])
+        (win_on_ascending_diagonal(L, x, y, p, board, K) or win_on_descending_diagonal(L, x, y, p, board, K) or
+         win_on_line(x, p, board, K) or win_on_column(y, p, board, K))
+    string_rate = n_checks / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for board, (x, y) in zip(boards, cells):
+        win_from_move(L, x, y, int(board[x, y]), board, K)
+    incremental_rate = n_checks / (time.perf_counter() - start)
+
+    bitboards = [BitBoard.from_gameboard(board, K) for board in boards]
+    actions = [int(x) * L + int(y) for x, y in cells]
+    start = time.perf_counter()
+    for bitboard, board, action in zip(bitboards, boards, actions):
+        bitboard.wins_at(action, board.item(action))
+    bitboard_rate = n_checks / (time.perf_counter() - start)
+
+    return string_rate, incremental_rate, bitboard_rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark of the last-move win detection used by TicTacToeBaseEnv.step")
+    parser.add_argument("--steps", type=int, default=20000, help="Number of env steps per configuration")
+    parser.add_argument("--checks", type=int, default=20000, help="Number of isolated win checks per configuration")
+    args = parser.parse_args()
+
+    for board_length, pattern_victory_length in [(3, 3), (5, 4), (7, 5)]:
+        legacy = steps_per_second(StringWinDetectionEnv, board_length, pattern_victory_length, args.steps)
+        current = steps_per_second(TicTacToeBaseEnv, board_length, pattern_victory_length, args.steps)
+        string_rate, incremental_rate, bitboard_rate = checks_per_second(board_length, pattern_victory_length, args.checks)
+        print(f"{board_length}x{board_length}/{pattern_victory_length}: "
+              f"step() {legacy:,.0f} -> {current:,.0f} steps/s (x{current / legacy:.2f}) | "
+              f"win check strings {string_rate:,.0f}, last move {incremental_rate:,.0f}, "
+              f"bitboard {bitboard_rate:,.0f} checks/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+warnings.filterwarnings("ignore")
+
+from sb3_contrib.common.maskable.utils import get_action_masks
+
+from training.env_factory import create_subproc_env
+
+
+def steps_per_second(n_workers, opponent_pool, n_steps, seed=0, **env_kwargs):
+    """
+    Agent steps per second (summed over workers) of create_subproc_env driven by
+    random legal actions, masks fetched through the process boundary as MaskablePPO does.
+    """
+    rng = np.random.default_rng(seed)
+    env = create_subproc_env(opponent_pool, n_workers=n_workers, seed=seed, **env_kwargs)
+    env.reset()
+    n_calls = max(1, n_steps // n_workers)
+    start = time.perf_counter()
+    for _ in range(n_calls):
+        masks = get_action_masks(env).astype(bool)
+        scores = rng.random(masks.shape)
+        scores[~masks] = -1.0
+        env.step(scores.argmax(axis=1))
+    elapsed = time.perf_counter() - start
+    env.close()
+    return n_calls * n_workers / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Steps/sec of the multiprocess training env against the number of workers")
+    parser.add_argument("--steps", type=int, default=2000, help="Agent steps measured per worker count")
+    parser.add_argument("--opponents", nargs="+", default=["random", "smart_random"], help="Opponent pool")
+    parser.add_argument("--batched-opponents", action="store_true", help="Evaluate PPO opponents with an InferenceServer")
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    worker_counts = sorted({1, 2, 4, cores, 2 * cores})
+    print(f"{cores} core(s) available")
+    baseline = None
+    for n_workers in worker_counts:
+        rate = steps_per_second(n_workers, args.opponents, args.steps, batched_opponents=args.batched_opponents,
+                                review_ratio=0.0, opponent_statistics_file=None, lost_games_path=None)
+        baseline = baseline or rate
+        print(f"{n_workers:>3} worker(s): {rate:,.0f} steps/s (x{rate / baseline:.2f})")
+
+
+if __name__ == "__main__":
+    main()
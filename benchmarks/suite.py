@@ -0,0 +1,358 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from datetime import datetime
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+warnings.filterwarnings("ignore")
+
+from envs import TicTacToeBaseEnv
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Board configurations measured by default: (board_length, pattern_victory_length)
+CONFIGS = [(3, 3), (5, 4), (7, 5)]
+
+
+# ---------------------------
+# Helpers
+# ---------------------------
+def random_positions(board_length, pattern_victory_length, n_positions, seed=0):
+    """Non-terminal positions reached by random legal moves, as (env, player) snapshots."""
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < n_positions:
+        env = TicTacToeBaseEnv(board_length, pattern_victory_length, active_heuristic=False)
+        env.reset()
+        for _ in range(rng.randrange(board_length * board_length - 1)):
+            _, _, terminated, _, _ = env.step(rng.choice(np.flatnonzero(env.valid_actions())))
+            if terminated:
+                break
+        if not env.is_done:
+            positions.append(env)
+    return positions
+
+
+def agent_path(board_length, pattern_victory_length):
+    """Most recent agent of best_agents/ trained on a configuration, or None."""
+    agents_dir = os.path.join(PROJECT_ROOT, "best_agents")
+    suffix = f"_{board_length}x{board_length}_{pattern_victory_length}.zip"
+    paths = sorted(name for name in os.listdir(agents_dir) if name.endswith(suffix))
+    return os.path.join(agents_dir, paths[-1]) if paths else None
+
+
+def measure(operation, min_time, repeat):
+    """
+    Best throughput of an operation.
+
+    Parameters:
+    - operation (callable): runs a chunk of work and returns the number of operations done
+    - min_time (float): minimum duration of a run in seconds
+    - repeat (int): number of runs (the fastest is kept)
+
+    Returns:
+    - float: operations per second
+    """
+    operation()  # Warm-up (caches, lazy imports, model loading)
+    best = 0.0
+    for _ in range(repeat):
+        count, start = 0, time.perf_counter()
+        while True:
+            count += operation()
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time:
+                break
+        best = max(best, count / elapsed)
+    return best
+
+
+# ---------------------------
+# Cases
+# ---------------------------
+# Each case builds, for a board configuration, a (unit, operation) pair or None when
+# it does not apply (no trained agent for the configuration, ...)
+def env_step(board_length, pattern_victory_length, active_heuristic):
+    rng = random.Random(0)
+    env = TicTacToeBaseEnv(board_length, pattern_victory_length, active_heuristic=active_heuristic)
+    env.reset()
+
+    def operation():
+        for _ in range(100):
+            _, _, terminated, _, _ = env.step(rng.choice(np.flatnonzero(env.valid_actions())))
+            if terminated:
+                env.reset()
+        return 100
+
+    return "steps/s", operation
+
+
+def case_env_step_heuristic(board_length, pattern_victory_length):
+    return env_step(board_length, pattern_victory_length, True)
+
+
+def case_env_step_no_heuristic(board_length, pattern_victory_length):
+    return env_step(board_length, pattern_victory_length, False)
+
+
+def case_cost_function(board_length, pattern_victory_length):
+    from utils.heuristics import cost_function
+
+    positions = random_positions(board_length, pattern_victory_length, 200)
+
+    def operation():
+        for env in positions:
+            cost_function(str(env.player), str(1 - env.player), env.gameboard, board_length, pattern_victory_length, env.valid_actions())
+        return len(positions)
+
+    return "calls/s", operation
+
+
+def case_is_winning_move(board_length, pattern_victory_length):
+    from utils.heuristics import is_winning_move
+
+    positions = random_positions(board_length, pattern_victory_length, 200)
+
+    def operation():
+        for env in positions:
+            is_winning_move(env.player, env.gameboard, board_length, pattern_victory_length, env.valid_actions())
+        return len(positions)
+
+    return "calls/s", operation
+
+
+def case_smart_random_play(board_length, pattern_victory_length):
+    from agents import SmartRandomAgent
+
+    agent = SmartRandomAgent()
+    positions = random_positions(board_length, pattern_victory_length, 200)
+
+    def operation():
+        for env in positions:
+            agent.play(env.player, env.gameboard, np.flatnonzero(env.valid_actions()), board_length, pattern_victory_length)
+        return len(positions)
+
+    return "moves/s", operation
+
+
+def case_ppo_play(board_length, pattern_victory_length):
+    path = agent_path(board_length, pattern_victory_length)
+    if path is None:
+        return None
+    from agents import PPOAgent
+
+    agent = PPOAgent(path, evaluation=True)
+    observations = [env.get_observation() for env in random_positions(board_length, pattern_victory_length, 100)]
+
+    def operation():
+        for observation in observations:
+            agent.play(observation)
+        return len(observations)
+
+    return "moves/s", operation
+
+
+def case_training_episode(board_length, pattern_victory_length):
+    from envs import TicTacToeTrainingEnv
+
+    rng = random.Random(0)
+    env = TicTacToeTrainingEnv(board_length=board_length, pattern_victory_length=pattern_victory_length,
+                               opponent_pool=["random", "smart_random"])
+
+    def operation():
+        random.seed(rng.random())
+        obs, _ = env.reset()
+        terminated = truncated = False
+        while not (terminated or truncated):
+            obs, _, terminated, truncated, _ = env.step(rng.choice(np.flatnonzero(obs["action_mask"])))
+        return 1
+
+    return "episodes/s", operation
+
+
+def case_evaluate_by_opponent(board_length, pattern_victory_length):
+    import utils.evaluator as evaluator
+
+    # The evaluator plays on the training board configuration (training/config.py)
+    training_config = (evaluator.TRAINING_DEFAULT_BOARD_LENGTH, evaluator.TRAINING_DEFAULT_PATTERN_VICTORY_LENGTH)
+    path = agent_path(board_length, pattern_victory_length)
+    if path is None or (board_length, pattern_victory_length) != training_config:
+        return None
+    from agents import get_model_registry
+
+    model = get_model_registry().get(path)
+    # Lost games go to a temporary replay store instead of the training one
+    evaluator.DEFEAT_PATH = os.path.join(tempfile.mkdtemp(), "defeats.bin")
+    n_episodes = 200
+
+    def operation():
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = evaluator.evaluate_agent_by_opponent(model, ["random"], n_episodes=n_episodes, min_episodes=n_episodes, seed=0)
+        stats = results["random"]
+        return sum(stats[key] for key in stats if key.startswith(("wins", "losses", "draws")))
+
+    return "games/s", operation
+
+
+def case_api_move(board_length, pattern_victory_length):
+    from fastapi.testclient import TestClient
+    from fastapi_app.main import app
+
+    path = agent_path(board_length, pattern_victory_length)
+    if path is None:
+        agent = {"name": "Smart Random"}
+    else:
+        agent = {"name": "AI agent", "version": os.path.basename(path).split("_")[1][1:]}
+
+    client = TestClient(app)
+    session = client.post("/game/initEnv", json={"board_length": board_length, "pattern_victory_length": pattern_victory_length}).json()
+    headers = {"X-Session-Id": session["session_id"]}
+    client.post("/game/saveAgent", json={"agent": agent}, headers=headers)
+
+    def operation():
+        # One request for the agent's move and one to play it (board reset when the game is over)
+        move = client.get("/game/move", headers=headers).json()
+        client.post("/game/actionPlayed", json={"move": move}, headers=headers)
+        if client.get("/game/observation", headers=headers).json()["is_done"]:
+            client.post("/game/resetEnv", headers=headers)
+        return 1
+
+    return "moves/s", operation
+
+
+CASES = {
+    "env_step_heuristic": case_env_step_heuristic,
+    "env_step_no_heuristic": case_env_step_no_heuristic,
+    "cost_function": case_cost_function,
+    "is_winning_move": case_is_winning_move,
+    "smart_random_play": case_smart_random_play,
+    "ppo_play": case_ppo_play,
+    "training_episode": case_training_episode,
+    "evaluate_by_opponent": case_evaluate_by_opponent,
+    "api_move": case_api_move,
+}
+
+
+# ---------------------------
+# Run and compare
+# ---------------------------
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(cases, configs, min_time=0.5, repeat=3):
+    """
+    Run benchmark cases on board configurations.
+
+    Returns:
+    - dict: {"metadata": {...}, "results": {"<case>[<N>x<N>/<K>]": {"case", "board_length",
+      "pattern_victory_length", "unit", "throughput"}}}
+    """
+    results = {}
+    for name in cases:
+        for board_length, pattern_victory_length in configs:
+            key = f"{name}[{board_length}x{board_length}/{pattern_victory_length}]"
+            built = CASES[name](board_length, pattern_victory_length)
+            if built is None:
+                print(f"{key:<40} skipped (not applicable)")
+                continue
+            unit, operation = built
+            throughput = measure(operation, min_time, repeat)
+            print(f"{key:<40} {throughput:>14,.1f} {unit}")
+            results[key] = {
+                "case": name,
+                "board_length": board_length,
+                "pattern_victory_length": pattern_victory_length,
+                "unit": unit,
+                "throughput": throughput,
+            }
+
+    metadata = {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "min_time": min_time,
+        "repeat": repeat,
+    }
+    return {"metadata": metadata, "results": results}
+
+
+def compare(report, baseline, tolerance):
+    """
+    Print the throughput ratio of each result against a baseline report.
+
+    Returns:
+    - list[str]: keys slower than the baseline by more than the tolerance (fraction)
+    """
+    regressions = []
+    print(f"\nComparison with the baseline of {baseline['metadata'].get('date')} (commit {baseline['metadata'].get('commit')})")
+    for key, result in report["results"].items():
+        reference = baseline["results"].get(key)
+        if reference is None:
+            print(f"{key:<40} new")
+            continue
+        ratio = result["throughput"] / reference["throughput"]
+        status = "REGRESSION" if ratio < 1 - tolerance else ("faster" if ratio > 1 + tolerance else "ok")
+        print(f"{key:<40} x{ratio:6.2f} {status}")
+        if status == "REGRESSION":
+            regressions.append(key)
+    return regressions
+
+
+def parse_config(value):
+    """'5x5/4' or '5/4' -> (5, 4)."""
+    board, pattern = value.split("/")
+    return int(board.split("x")[0]), int(pattern)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput of the envs, heuristics, agents and API across board configurations")
+    parser.add_argument("--cases", nargs="+", choices=sorted(CASES), default=list(CASES), help="Cases to run")
+    parser.add_argument("--configs", nargs="+", type=parse_config, default=CONFIGS, help="Board configurations, e.g. 3x3/3 5x5/4")
+    parser.add_argument("--min-time", type=float, default=0.5, help="Minimum duration (s) of a measure")
+    parser.add_argument("--repeat", type=int, default=3, help="Measures per case (best is kept)")
+    parser.add_argument("-o", "--output", help="Write the results to this JSON file")
+    parser.add_argument("--compare", metavar="BASELINE", help="JSON results of a previous run to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Slowdown (fraction) reported as a regression")
+    args = parser.parse_args()
+
+    # The API and the training configuration use paths relative to the project root
+    output = os.path.abspath(args.output) if args.output else None
+    baseline_path = os.path.abspath(args.compare) if args.compare else None
+    os.chdir(PROJECT_ROOT)
+
+    report = run_suite(args.cases, args.configs, args.min_time, args.repeat)
+    if output:
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Results saved at: {output}")
+
+    if baseline_path:
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print(f"❌ Slower than the baseline: {', '.join(regressions)}")
+            sys.exit(1)
+        print("✅ No regression against the baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import argparse
+import os
+import random
+import sys
+import time
+import warnings
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+warnings.filterwarnings("ignore")
+
+from envs import TicTacToeTrainingEnv
+from envs.vec_env import TicTacToeVecEnv
+
+
+def single_env_steps_per_second(board_length, pattern_victory_length, opponent_pool, n_steps, seed=0):
+    """Agent steps per second of one TicTacToeTrainingEnv driven by random legal actions."""
+    random.seed(seed)
+    env = TicTacToeTrainingEnv(board_length=board_length, pattern_victory_length=pattern_victory_length, opponent_pool=opponent_pool)
+    obs, _ = env.reset()
+    start = time.perf_counter()
+    for _ in range(n_steps):
+        obs, _, terminated, truncated, _ = env.step(random.choice(np.where(obs["action_mask"] == 1)[0]))
+        if terminated or truncated:
+            obs, _ = env.reset()
+    return n_steps / (time.perf_counter() - start)
+
+
+def vec_env_steps_per_second(num_envs, board_length, pattern_victory_length, opponent_pool, n_steps, seed=0):
+    """Agent steps per second (summed over boards) of TicTacToeVecEnv driven by random legal actions."""
+    rng = np.random.default_rng(seed)
+    env = TicTacToeVecEnv(num_envs, board_length, pattern_victory_length, opponent_pool=opponent_pool, seed=seed)
+    env.reset()
+    n_calls = max(1, n_steps // num_envs)
+    start = time.perf_counter()
+    for _ in range(n_calls):
+        scores = rng.random((num_envs, env.n_cells))
+        scores[~env.action_masks()] = -1.0
+        env.step(scores.argmax(axis=1))
+    return n_calls * num_envs / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput of TicTacToeVecEnv against the single TicTacToeTrainingEnv")
+    parser.add_argument("-p", "--plateau", type=int, default=5, help="Board size (n x n)")
+    parser.add_argument("-w", "--win", type=int, default=4, help="Victory pattern length")
+    parser.add_argument("--steps", type=int, default=2000, help="Agent steps measured per configuration")
+    parser.add_argument("--opponents", nargs="+", default=["random", "smart_random"], help="Opponent pool")
+    args = parser.parse_args()
+
+    single = single_env_steps_per_second(args.plateau, args.win, args.opponents, args.steps)
+    print(f"TicTacToeTrainingEnv: {single:,.0f} steps/s")
+    for num_envs in (16, 64, 256):
+        vectorized = vec_env_steps_per_second(num_envs, args.plateau, args.win, args.opponents, args.steps * 10)
+        print(f"TicTacToeVecEnv N={num_envs}: {vectorized:,.0f} steps/s (x{vectorized / single:.1f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,5 @@
+import os
+
 # === Game Board Configuration ===
 
 # Size of the square board
@@ -30,3 +32,98 @@ REWARD_ALLOW_OPP_WIN = -0.6
 REWARD_CREATE_THREAT = 0.3
 # Bonus for blocking a unique winning move by the opponent
 REWARD_BLOCK_OPP_WIN = 0.2
+
+
+# === Heuristic Reward Cache ===
+
+# Maximum number of heuristic results kept in the LRU cache (0 disables it), one per symmetry class
+HEURISTIC_CACHE_SIZE = 200_000
+# Evaluate every reachable position once when the cache is created
+HEURISTIC_CACHE_PRECOMPUTE = False
+# Largest board (in cells) for which the precompute mode is allowed
+# (3x3: ~600 positions up to symmetry, instant; 4x4: several minutes)
+HEURISTIC_CACHE_PRECOMPUTE_MAX_CELLS = 16
+
+
+# === Batched Opponent Inference ===
+
+# Maximum time (seconds) the inference server waits to fill a batch after the first request.
+# Trade-off: a longer wait gives larger batches (fewer forward passes) but adds up to this delay to
+# every opponent move; the batch is answered at once when every connected client has a request in it
+INFERENCE_MAX_BATCH_WAIT = 0.002
+# Maximum number of observations evaluated in a single forward pass
+INFERENCE_MAX_BATCH_SIZE = 1024
+
+
+# === File-backed State Cache ===
+
+# Minimum time (seconds) between two modification checks of a cached file
+FILE_CACHE_CHECK_INTERVAL = 0.5
+
+
+# === Exact Solver ===
+
+# Directory of the persisted solution tables (utils/solver.py)
+SOLVER_TABLE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "solver_tables")
+# Largest board (in cells) whose full solution table is built automatically (3x3: 627 positions)
+SOLVER_TABLE_MAX_CELLS = 9
+# Search depth (plies) of PerfectAgent on larger boards, where solving every position exactly would
+# stall the games: wins and losses forced within the horizon are played exactly, the other moves are
+# ranked by the heuristic (None: always solve exactly, only practical up to 4x4 with 3 in a row)
+PERFECT_AGENT_MAX_DEPTH = 2
+
+
+# === MCTS Agent ===
+
+# Simulations per move (upper bound when a time budget is also given)
+MCTS_SIMULATIONS = 200
+# Leaves evaluated together in one policy / value forward pass
+MCTS_BATCH_SIZE = 16
+# Exploration constant of the PUCT formula
+MCTS_C_PUCT = 1.5
+# Prefix of the opponent pool entries played by an MCTSAgent ("mcts:<agent path>")
+MCTS_POOL_PREFIX = "mcts:"
+
+
+# === Game Server Sessions ===
+
+# Seconds of inactivity after which a game session expires
+SESSION_TTL = 3600
+# Maximum number of game sessions kept (least recently used evicted first)
+SESSION_MAX_COUNT = 10_000
+# Session storage: 'memory' (single process) or 'sqlite' (shared by several worker processes)
+SESSION_BACKEND = os.environ.get("MORPION_SESSION_BACKEND", "memory")
+# SQLite file of the 'sqlite' session backend
+SESSION_SQLITE_PATH = os.environ.get("MORPION_SESSION_SQLITE_PATH", "sessions.sqlite3")
+
+
+# === PPO Model Registry ===
+
+# Maximum number of PPO agents kept loaded in a process (least recently used evicted first)
+MODEL_REGISTRY_MAX_MODELS = 16
+# Maximum total size (bytes) of the loaded agents' parameters
+MODEL_REGISTRY_MAX_BYTES = 512 * 1024 * 1024
+# Load every agent of best_agents/ when the API starts
+MODEL_REGISTRY_PRELOAD = os.environ.get("MORPION_PRELOAD_AGENTS", "1") == "1"
+
+
+# === API Move Inference ===
+
+# Maximum time (seconds) a /game/move request waits for other requests of the same model
+API_INFERENCE_MAX_WAIT = 0.005
+# Maximum number of /game/move requests answered by one forward pass
+API_INFERENCE_MAX_BATCH_SIZE = 256
+
+
+# === Rendering ===
+
+# Cell width and height (pixels) of the rendered board images
+RENDER_CELL_SIZE = 64
+# Threads rendering and encoding recorded frames in the background
+RENDER_THREADS = 2
+
+
+# === Instrumentation ===
+
+# Time the training hot paths (env step, heuristic reward, opponent moves, ...), see utils/instrumentation.py
+INSTRUMENTATION_ENABLED = os.environ.get("MORPION_INSTRUMENTATION", "0") == "1"
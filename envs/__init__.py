@@ -1,4 +1,13 @@
 from .base_env import TicTacToeBaseEnv
-from .training_env import TicTacToeTrainingEnv
+from .augmentation import SymmetryAugmentation
 
-__all__ = ["TicTacToeBaseEnv", "TicTacToeTrainingEnv"]
\ No newline at end of file
+__all__ = ["TicTacToeBaseEnv", "TicTacToeTrainingEnv", "SymmetryAugmentation"]
+
+
+def __getattr__(name):
+    # The training env pulls in the agents and the training configuration (torch,
+    # stable_baselines3): it is only imported when first used
+    if name == "TicTacToeTrainingEnv":
+        from .training_env import TicTacToeTrainingEnv
+        return TicTacToeTrainingEnv
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,47 @@
+import random
+
+import gymnasium as gym
+import numpy as np
+
+from utils.symmetry import get_symmetries
+
+
+class SymmetryAugmentation(gym.Wrapper):
+    """
+    Show each episode to the agent under a random symmetry of the board.
+
+    A transform among the 8 rotations / reflections of the board is drawn at every
+    reset; the board and the action mask of every observation are transformed, and
+    the agent's actions are mapped back to the wrapped env's cells before being
+    played. The game itself (opponent moves, rewards, review games) is unchanged, so
+    the agent collects 8 times more distinct positions from the same games.
+    """
+
+    def __init__(self, env):
+        """
+        Parameters:
+        - env (TicTacToeBaseEnv): environment to wrap (possibly already wrapped)
+        """
+        super().__init__(env)
+        self.symmetries = get_symmetries(env.unwrapped.board_length)
+        self.transform = 0
+
+    def observation(self, observation):
+        observation = dict(observation)
+        observation["observation"] = self.symmetries.transform_board(observation["observation"], self.transform)
+        observation["action_mask"] = self.symmetries.transform_mask(observation["action_mask"], self.transform)
+        return observation
+
+    def valid_actions(self):
+        """Valid actions mask of the transformed board (used by mask_fn)."""
+        return self.symmetries.transform_mask(self.env.unwrapped.valid_actions(), self.transform)
+
+    def reset(self, **kwargs):
+        self.transform = random.randrange(8)
+        observation, info = self.env.reset(**kwargs)
+        return self.observation(observation), info
+
+    def step(self, action):
+        action = self.symmetries.inverse_action(action, self.transform)
+        observation, reward, terminated, truncated, info = self.env.step(action)
+        return self.observation(observation), reward, terminated, truncated, info
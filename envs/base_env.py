@@ -1,19 +1,39 @@
 import pprint
 from pathlib import Path
 import gymnasium as gym
-from matplotlib import patches
-import matplotlib.pyplot as plt
 import os
 from datetime import datetime
-from PIL import Image
 import shutil
 
 
 from configs.config import *
 from utils.heuristics import *
+from utils.bitboard import BitBoard
+from utils.line_state import LineState
+from utils.tactics import winning_cells
+from utils.instrumentation import timed
 from utils.terminal_colors import *
 
 
+class EnvSnapshot:
+    """
+    Copy of the game state of a TicTacToeBaseEnv (board, player, done flag, move stack
+    and incremental caches), filled by TicTacToeBaseEnv.snapshot.
+
+    The buffers are allocated once for the env's configuration and overwritten in
+    place by every snapshot, so a search can keep one snapshot per depth and reuse
+    them at every node instead of deep-copying the env.
+    """
+
+    def __init__(self, env):
+        self.gameboard = np.empty_like(env.gameboard)
+        self.player = 0
+        self.is_done = False
+        self.players = [0, 0]
+        self.line_state = None if env.line_state is None else LineState(env.board_length, env.pattern_victory_length)
+        self.move_stack = []
+
+
 class TicTacToeBaseEnv(gym.Env):
     """
     Base TicTacToe environment.
@@ -21,13 +41,13 @@ class TicTacToeBaseEnv(gym.Env):
     Handles:
     - Game mechanics
     - Reward calculation
-    - Rendering modes (ANSI terminal or Matplotlib images)
+    - Rendering modes (ANSI terminal, in-memory images or Matplotlib images)
 
     Metadata:
     - 'render_modes': list of available rendering modes
     """
 
-    metadata = {'render_modes': ['ansi', 'matplotlib']}
+    metadata = {'render_modes': ['ansi', 'image', 'rgb_array', 'matplotlib']}
 
     def __init__(self,
                  board_length=DEFAULT_BOARD_LENGTH,
@@ -41,7 +61,8 @@ class TicTacToeBaseEnv(gym.Env):
         Parameters:
         - board_length (int): Size of the board (NxN).
         - pattern_victory_length (int): Number of consecutive marks needed to win.
-        - render_mode (str): 'ansi' for terminal display, 'matplotlib' for image render.
+        - render_mode (str): 'ansi' for terminal display, 'image' to record frames in memory (GIF / APNG),
+          'rgb_array' to return the frame as an array, 'matplotlib' for PNG images.
         - victory_reward (float): Reward given when a player wins.
         """
 
@@ -53,10 +74,17 @@ class TicTacToeBaseEnv(gym.Env):
 
         # Game board initialized to EMPTY_CELL (usually -1 or 0)
         self.gameboard = np.full((self.board_length, self.board_length), EMPTY_CELL, dtype=np.int8)
-
-        # Rendering state (folder to save images and frame index)
+        # Bitboard mirror of the gameboard, used for move validation and win detection
+        self.bitboard = BitBoard(self.board_length, self.pattern_victory_length)
+        # Threat tallies of every line, updated with every placed mark
+        self.line_state = LineState(self.board_length, self.pattern_victory_length) if active_heuristic else None
+        # (action, player, done flag before the move) of every placed mark, undone by pop()
+        self.move_stack = []
+
+        # Rendering state (folder to save images, frame index and recorder of the 'image' mode)
         self.render_folder = None
         self.frame_index = 0
+        self.recorder = None
 
         # Gym environment spaces
         self.action_space = gym.spaces.Discrete(board_length * board_length)
@@ -82,6 +110,10 @@ class TicTacToeBaseEnv(gym.Env):
     def set_gameboard(self, gameboard):
         """Set the current gameboard state."""
         self.gameboard = gameboard
+        self.bitboard = BitBoard.from_gameboard(gameboard, self.pattern_victory_length)
+        if self.line_state is not None:
+            self.line_state.set_gameboard(gameboard)
+        self.move_stack = []
 
     def get_gameboard(self):
         """Return a copy of the current gameboard."""
@@ -95,9 +127,122 @@ class TicTacToeBaseEnv(gym.Env):
         Output:
         - mask (np.array, shape=(board_length*board_length,)): 1 if cell empty, 0 otherwise
         """
-        mask = np.zeros(self.board_length * self.board_length, dtype=np.int8)
-        mask[np.where(self.gameboard.flatten() == EMPTY_CELL)[0]] = 1
-        return mask
+        return self.bitboard.valid_actions()
+
+    def place_mark(self, action, player):
+        """
+        Put a player's mark on a cell, keeping the gameboard and the bitboard in sync.
+
+        Parameters:
+        - action (int): index of the cell (0..board_length*board_length-1)
+        - player (int): player owning the mark (0 or 1)
+        """
+        line, column = divmod(action, self.board_length)
+        self.gameboard[line][column] = player
+        self.bitboard.place(action, player)
+        if self.line_state is not None:
+            self.line_state.place(action, player)
+        self.move_stack.append((action, player, self.is_done))
+
+    def winning_cells(self, player):
+        """
+        Bitmask of the empty cells where a mark of the player wins at once: read from the
+        line state when it is kept, otherwise computed from the windows of the bitboard.
+        """
+        if self.line_state is not None:
+            return self.line_state.winning_cells(player)
+        return winning_cells(self.bitboard.players[player], self.bitboard.lines) & self.bitboard.empty
+
+    # ---------- Lookahead ----------
+    def push(self, action):
+        """
+        Play the current player's mark without computing any reward, for search and
+        what-if analysis (undone by pop()).
+
+        Parameters:
+        - action (int): index of the cell (0..board_length*board_length-1)
+
+        Returns:
+        - terminated (bool): True if the move wins or fills the board
+
+        Raises ValueError if the game is already over (pop() the last move first).
+        """
+        if self.is_done:
+            raise ValueError("❌ The game is over: no move can be pushed on a terminal position.")
+        if not self.bitboard.is_empty(action):
+            raise ValueError("Invalid action: cell already occupied.")
+
+        self.place_mark(action, self.player)
+        if self.bitboard.wins_at(action, self.player) or self.bitboard.is_full():
+            self.is_done = True
+        self.player = 1 - self.player
+        return self.is_done
+
+    def pop(self):
+        """
+        Undo the last placed mark (by step(), push() or place_mark()), restoring the
+        board, the player to move, the done flag and the incremental caches.
+
+        Returns:
+        - action (int): the cell that was cleared
+        """
+        if not self.move_stack:
+            raise ValueError("❌ No move to undo.")
+        action, player, is_done = self.move_stack.pop()
+
+        line, column = divmod(action, self.board_length)
+        self.gameboard[line][column] = EMPTY_CELL
+        self.bitboard.remove(action)
+        if self.line_state is not None:
+            self.line_state.remove(action)
+        self.player = player
+        self.is_done = is_done
+        return action
+
+    def snapshot(self, buffer=None):
+        """
+        Save the game state.
+
+        Parameters:
+        - buffer (EnvSnapshot): snapshot of this env to overwrite (None allocates a new one)
+
+        Returns:
+        - EnvSnapshot: the saved state, to give to restore()
+        """
+        snapshot = EnvSnapshot(self) if buffer is None else buffer
+        np.copyto(snapshot.gameboard, self.gameboard)
+        snapshot.player = self.player
+        snapshot.is_done = self.is_done
+        snapshot.players[:] = self.bitboard.players
+        if self.line_state is not None:
+            snapshot.line_state.copy_from(self.line_state)
+        snapshot.move_stack[:] = self.move_stack
+        return snapshot
+
+    def restore(self, snapshot):
+        """Restore a game state saved by snapshot() (the snapshot stays valid and reusable)."""
+        np.copyto(self.gameboard, snapshot.gameboard)
+        self.player = snapshot.player
+        self.is_done = snapshot.is_done
+        self.bitboard.players[:] = snapshot.players
+        if self.line_state is not None:
+            self.line_state.copy_from(snapshot.line_state)
+        self.move_stack[:] = snapshot.move_stack
+
+    @timed("env.heuristic_reward")
+    def heuristic_reward(self):
+        """
+        Return cost_function for the player who just moved (active_heuristic envs only).
+
+        The opponent's immediate win check and the heuristic points are read from the
+        window counts and threat tallies of the incrementally maintained line state.
+        """
+        # Like cost_function, the moves checked are the entries of the valid actions mask:
+        # 1 while an empty cell remains, 0 once a cell is occupied
+        authorized_moves = [move for move, cells in ((1, self.bitboard.empty), (0, self.bitboard.occupied)) if cells]
+        if any(self.line_state.completes_window(1 - self.player, move) for move in authorized_moves):
+            return REWARD_ALLOW_OPP_WIN
+        return self.line_state.heuristic_points(self.player) - self.line_state.heuristic_points(1 - self.player)
 
     def get_observation(self):
         """
@@ -125,9 +270,14 @@ class TicTacToeBaseEnv(gym.Env):
         """
         self.player = 0
         self.gameboard = np.full((self.board_length, self.board_length), EMPTY_CELL, dtype=np.int8)
+        self.bitboard.reset()
+        if self.line_state is not None:
+            self.line_state.reset()
+        self.move_stack = []
         self.is_done = False
         return self.get_observation(), {}
 
+    @timed("env.step")
     def step(self, action):
         """
         Apply a player's action to the board.
@@ -146,34 +296,23 @@ class TicTacToeBaseEnv(gym.Env):
         reward = 0
 
         # Validate action
-        if self.valid_actions()[action] == 0:
+        if not self.bitboard.is_empty(action):
             raise ValueError("Invalid action: cell already occupied.")
 
-        # Map 1D action to 2D board coordinates
-        line, column = divmod(action, self.board_length)
-        self.gameboard[line][column] = self.player
-
-        # Check for victory
-        if (
-                win_on_ascending_diagonal(self.board_length, line, column, self.player, self.gameboard, self.pattern_victory_length) or
-                win_on_descending_diagonal(self.board_length, line, column, self.player, self.gameboard, self.pattern_victory_length) or
-                win_on_line(line, self.player, self.gameboard, self.pattern_victory_length) or
-                win_on_column(column, self.player, self.gameboard, self.pattern_victory_length)
-        ):
+        self.place_mark(action, self.player)
+
+        # Check for victory (only the lines passing through the placed cell can have changed)
+        if self.bitboard.wins_at(action, self.player):
             reward = self.victory_reward
             terminated = True
             self.is_done = True
-        elif board_is_full(self.gameboard):
+        elif self.bitboard.is_full():
             reward = 0
             terminated = True
             self.is_done = True
         else:
             if self.active_heuristic:
-                reward = cost_function(
-                    str(self.player), str(1 - self.player),
-                    self.gameboard, self.board_length,
-                    self.pattern_victory_length, self.valid_actions()
-                )
+                reward = self.heuristic_reward()
 
         self.player = 1 - self.player  # Switch player
         return self.get_observation(), reward, terminated, False, {}
@@ -193,20 +332,13 @@ class TicTacToeBaseEnv(gym.Env):
         Returns:
         - str: path of saved image
         """
-        # Folder setup for saving frames
-        project_root = Path(__file__).resolve().parent.parent
-        base_folder = project_root / "gameboard_images"
-        base_folder.mkdir(exist_ok=True)
-        if self.render_folder is None:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            folder_name = f"game_{self.board_length}_{self.pattern_victory_length}_{timestamp}"
-            self.render_folder = base_folder / folder_name
-            self.render_folder.mkdir(exist_ok=True)
-            self.frame_index = 0
+        # Imported on first use: matplotlib is only needed to render images
+        from matplotlib import patches
+        import matplotlib.pyplot as plt
 
         # Path for current frame
         filename = f"frame_{self.frame_index:03}.png"
-        save_path = self.render_folder / filename
+        save_path = self.get_render_folder() / filename
         self.frame_index += 1
 
         left_name = self.format_name(player1_type)
@@ -241,21 +373,72 @@ class TicTacToeBaseEnv(gym.Env):
         plt.close()
         return str(save_path)
 
+    def render_image(self, action=None, player1_type=None, player2_type=None):
+        """
+        Record the board as a frame of the game animation.
+
+        Frames are rendered in the background by utils/renderer.py and kept in memory
+        until create_gif_from_folder encodes them (no PNG written per frame).
+
+        Parameters:
+        - action (int): last action performed (optional)
+        - player1_type (str): name/type of player 1
+        - player2_type (str): name/type of player 2
+        """
+        from utils.renderer import FrameRecorder
+
+        if self.recorder is None:
+            self.recorder = FrameRecorder(self.board_length)
+        self.recorder.add(self.gameboard, self.format_name(player1_type), self.format_name(player2_type))
+
+    def render_rgb_array(self, player1_type=None, player2_type=None):
+        """
+        Render the board as an image.
+
+        Returns:
+        - np.ndarray: (H, W, 3) uint8 RGB image
+        """
+        from utils.renderer import get_board_renderer
+
+        renderer = get_board_renderer(self.board_length)
+        frame = renderer.render(self.gameboard, self.format_name(player1_type), self.format_name(player2_type))
+        return renderer.to_rgb(frame)
+
+    def get_render_folder(self):
+        """Folder of the saved images of this env (gameboard_images/game_<N>_<K>_<timestamp>), created on first use."""
+        if self.render_folder is None:
+            project_root = Path(__file__).resolve().parent.parent
+            base_folder = project_root / "gameboard_images"
+            base_folder.mkdir(exist_ok=True)
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            folder_name = f"game_{self.board_length}_{self.pattern_victory_length}_{timestamp}"
+            self.render_folder = base_folder / folder_name
+            self.render_folder.mkdir(exist_ok=True)
+            self.frame_index = 0
+        return self.render_folder
+
 
 
     def render(self, action=None, player1_type=None, player2_type=None):
         """
         Main render function.
 
-        Chooses the rendering mode ('ansi' or 'matplotlib').
+        Chooses the rendering mode ('ansi', 'image', 'rgb_array' or 'matplotlib').
 
         Parameters:
         - action (int): last action (optional)
         - player1_type (str)
         - player2_type (str)
+
+        Returns:
+        - np.ndarray: the RGB image in 'rgb_array' mode, else None
         """
         if self.render_mode == "ansi":
             self._render_ansi(action)
+        elif self.render_mode == "image":
+            self.render_image(action=action, player1_type=player1_type, player2_type=player2_type)
+        elif self.render_mode == "rgb_array":
+            return self.render_rgb_array(player1_type=player1_type, player2_type=player2_type)
         elif self.render_mode == "matplotlib":
             self.render_matplotlib(action=action, player1_type=player1_type, player2_type=player2_type)
         else:
@@ -325,17 +508,24 @@ class TicTacToeBaseEnv(gym.Env):
 
     def create_gif_from_folder(self, gif_name="game.gif", duration=500):
         """
-        Create a GIF from saved PNG frames.
+        Create a GIF from the recorded frames ('image' mode) or the saved PNG frames ('matplotlib' mode).
 
         Parameters:
-        - gif_name (str): filename for the GIF
+        - gif_name (str): filename for the GIF (a .png name writes an animated PNG from recorded frames)
         - duration (int): duration per frame in ms
 
         Returns:
         - str: path to saved GIF
         """
+        if self.recorder is not None and len(self.recorder):
+            gif_path = self.recorder.save(os.path.join(self.get_render_folder(), gif_name), duration).result()
+            print(f"✅ GIF saved at: {gif_path}")
+            return gif_path
+
+        from PIL import Image
+
         images = []
-        files = sorted([f for f in os.listdir(self.render_folder) if f.endswith(".png")])
+        files = sorted([f for f in os.listdir(self.get_render_folder()) if f.endswith(".png")])
 
         for file in files:
             image_path = os.path.join(self.render_folder, file)
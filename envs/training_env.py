@@ -1,14 +1,76 @@
 import json
 import random
 
-from agents import RandomAgent, SmartRandomAgent, PPOAgent
+from agents import RandomAgent, SmartRandomAgent, PPOAgent, PerfectAgent, MCTSAgent, RemotePPOAgent
 from envs.base_env import *
+from utils.file_cache import get_file_cache, load_json_file
+from utils.instrumentation import get_instrumentation, timed
+from utils.replay_store import get_replay_store
 from training.config import (
     TRAINING_DEFAULT_BOARD_LENGTH,
     TRAINING_DEFAULT_PATTERN_VICTORY_LENGTH
 )
 
 
+def load_opponent_agents(opponent_pool, inference_client=None):
+    """
+    Instantiate the opponents of a pool.
+    - RandomAgent, SmartRandomAgent and PerfectAgent ("perfect") are instantiated directly
+      (PerfectAgent searches PERFECT_AGENT_MAX_DEPTH plies only beyond SOLVER_TABLE_MAX_CELLS cells)
+    - MCTSAgent ("mcts:<agent path>") searches with a PPO agent file as policy / value
+    - PPOAgent loaded from .zip agent file, or RemotePPOAgent when an
+      inference_client is given (moves computed by an InferenceServer)
+    Returns a dict of opponent instances keyed by pool entry.
+    """
+    agents = {}
+    for opponent in opponent_pool:
+        if opponent == "random":
+            agents["random"] = RandomAgent()
+        elif opponent == "smart_random":
+            agents["smart_random"] = SmartRandomAgent()
+        elif opponent == "perfect":
+            agents["perfect"] = PerfectAgent()
+        elif opponent.startswith(MCTS_POOL_PREFIX) and os.path.exists(opponent[len(MCTS_POOL_PREFIX):]):
+            agents[opponent] = MCTSAgent(opponent[len(MCTS_POOL_PREFIX):], deterministic=False)
+        elif opponent.endswith(".zip") and os.path.exists(opponent):
+            if inference_client is not None:
+                agents[opponent] = RemotePPOAgent(opponent, inference_client)
+            else:
+                agents[opponent] = PPOAgent(agent_path=opponent)
+    return agents
+
+
+def opponent_probabilities(opponents, opponent_statistics):
+    """
+    Calculate opponent selection probabilities.
+    - 80% equally distributed among all opponents
+    - 20% distributed proportionally to opponent's defeat rate
+    Returns a normalized dictionary of probabilities.
+    """
+    probs = {}
+    n = len(opponents)
+
+    # Equal portion (80%)
+    equal_share = 0.8 / n
+
+    # Total defeat rate for proportional portion (20%)
+    total_defeat = sum(opponent_statistics.get(opponent, {"defeat_rate": 1.0})["defeat_rate"]
+                       for opponent in opponents)
+
+    # Compute total probabilities
+    for opponent in opponents:
+        defeat_rate = opponent_statistics.get(opponent, {"defeat_rate": 1.0})["defeat_rate"]
+        proportional_share = 0.2 * (defeat_rate / total_defeat) if total_defeat > 0 else 0
+        probs[opponent] = equal_share + proportional_share
+
+    # Normalize probabilities
+    total = sum(probs.values())
+    for k in probs:
+        probs[k] /= total
+
+    return probs
+
+
 class TicTacToeTrainingEnv(TicTacToeBaseEnv):
     """
     Extended TicTacToe environment for training RL agents.
@@ -28,7 +90,8 @@ class TicTacToeTrainingEnv(TicTacToeBaseEnv):
                  first_play_rate=DEFAULT_FIRST_PLAY_RATE,
                  lost_games_path=None,
                  review_ratio=DEFAULT_REVIEW_RATIO,
-                 opponent_statistics_file=None):
+                 opponent_statistics_file=None,
+                 inference_client=None):
         """
         Initialize the training environment.
 
@@ -40,14 +103,16 @@ class TicTacToeTrainingEnv(TicTacToeBaseEnv):
         - opponent_pool (list[str]): list of opponent types or agent paths
         - evaluation (bool): if True, logs agent and opponent moves
         - first_play_rate (float): probability that the agent plays first
-        - lost_games_path (str): JSON file path containing past lost games
+        - lost_games_path (str): replay store file containing past lost games (see utils/replay_store.py)
         - review_ratio (float): probability of replaying a lost game
         - opponent_statistics_file (str): JSON file path with opponent statistics
+        - inference_client (InferenceClient): if set, PPO opponents are evaluated in batches by an InferenceServer
         """
         super().__init__(board_length, pattern_victory_length, render_mode, victory_reward)
 
         # Opponent configuration
         self.opponent_pool = opponent_pool if opponent_pool else ["random"]
+        self.inference_client = inference_client
         self.opponent_agents = self.preload_opponents(self.opponent_pool)  # Preload opponent instances
         self.opponent_agent = None  # Current opponent for the episode
         self.opponent_blows = []    # Track opponent moves for evaluation
@@ -58,55 +123,44 @@ class TicTacToeTrainingEnv(TicTacToeBaseEnv):
         self.evaluation = evaluation
         self.first_play_rate = first_play_rate
         self.lost_games_path = lost_games_path
+        self.lost_games = get_replay_store(lost_games_path, board_length) if lost_games_path is not None else None
         self.review_ratio = review_ratio
 
         # Opponent probability weighting based on statistics
         self.opponent_statistics_file = opponent_statistics_file
-        self.opponent_statistics = self.load_opponent_statistics(self.opponent_statistics_file)
-        self.opponent_probabilities = self.calculate_opponent_probabilities()
+        self.opponent_statistics_generation = None
+        self.refresh_opponent_probabilities()
 
     # ---------------------------
     # Opponent statistics
     # ---------------------------
     def load_opponent_statistics(self, filepath):
         """
-        Load opponent statistics from JSON file.
-        Returns empty dict if file does not exist.
+        Load opponent statistics from JSON file (through the process-wide file cache,
+        the file is only parsed again when it changes on disk).
+        Returns empty dict if file does not exist, and the generation of the loaded content.
         """
-        if filepath is None or not os.path.exists(filepath):
-            return {}
-        with open(filepath, "r") as f:
-            return json.load(f)
+        if filepath is None:
+            return {}, 0
+        return get_file_cache().get(filepath, load_json_file, default={})
 
-    def calculate_opponent_probabilities(self):
+    def refresh_opponent_probabilities(self):
         """
-        Calculate opponent selection probabilities.
-        - 80% equally distributed among all opponents
-        - 20% distributed proportionally to opponent's defeat rate
-        Returns a normalized dictionary of probabilities.
+        Reload the opponent statistics and recompute the selection probabilities,
+        only when the statistics file changed since the last call.
         """
-        probs = {}
-        n = len(self.opponent_agents)
+        statistics, generation = self.load_opponent_statistics(self.opponent_statistics_file)
+        if generation != self.opponent_statistics_generation:
+            self.opponent_statistics = statistics
+            self.opponent_statistics_generation = generation
+            self.opponent_probabilities = self.calculate_opponent_probabilities()
 
-        # Equal portion (80%)
-        equal_share = 0.8 / n
-
-        # Total defeat rate for proportional portion (20%)
-        total_defeat = sum(self.opponent_statistics.get(opponent, {"defeat_rate": 1.0})["defeat_rate"]
-                           for opponent in self.opponent_agents)
-
-        # Compute total probabilities
-        for opponent in self.opponent_agents:
-            defeat_rate = self.opponent_statistics.get(opponent, {"defeat_rate": 1.0})["defeat_rate"]
-            proportional_share = 0.2 * (defeat_rate / total_defeat) if total_defeat > 0 else 0
-            probs[opponent] = equal_share + proportional_share
-
-        # Normalize probabilities
-        total = sum(probs.values())
-        for k in probs:
-            probs[k] /= total
-
-        return probs
+    def calculate_opponent_probabilities(self):
+        """
+        Calculate opponent selection probabilities from the loaded statistics
+        (see opponent_probabilities).
+        """
+        return opponent_probabilities(self.opponent_agents, self.opponent_statistics)
 
     def choose_opponent(self):
         """
@@ -120,19 +174,9 @@ class TicTacToeTrainingEnv(TicTacToeBaseEnv):
     def preload_opponents(self, opponent_pool):
         """
         Preload opponent agents to avoid repeated disk access.
-        - RandomAgent and SmartRandomAgent are instantiated directly
-        - PPOAgent loaded from .zip agent file
-        Returns a dict of opponent instances.
+        Returns a dict of opponent instances (see load_opponent_agents).
         """
-        agents = {}
-        for opponent in opponent_pool:
-            if opponent == "random":
-                agents["random"] = RandomAgent()
-            elif opponent == "smart_random":
-                agents["smart_random"] = SmartRandomAgent()
-            elif opponent.endswith(".zip") and os.path.exists(opponent):
-                agents[opponent] = PPOAgent(agent_path=opponent)
-        return agents
+        return load_opponent_agents(opponent_pool, self.inference_client)
 
     # ---------------------------
     # Environment control
@@ -146,38 +190,26 @@ class TicTacToeTrainingEnv(TicTacToeBaseEnv):
         Returns initial observation and info.
         """
         obs, info = super().reset(seed, options)
+        get_instrumentation().count("env.episodes")
 
         # Choose opponent
         chosen_opponent = self.choose_opponent()
         self.opponent_agent = self.opponent_agents[chosen_opponent]
-        self.opponent_statistics = self.load_opponent_statistics(self.opponent_statistics_file)
-        self.opponent_probabilities = self.calculate_opponent_probabilities()
+        self.refresh_opponent_probabilities()
 
         # Tracking variables
         self.number_turn = 0
-        self.retrieve_lost_games = []
         self.opponent_blows = []
         self.agent_blows = []
 
-        # -----------------------------
-        # Load past losing games
-        # -----------------------------
-        if self.review_ratio > 0 and self.lost_games_path is not None:
-            try:
-                with open(self.lost_games_path, "r") as file:
-                    data = json.load(file)
-                    for _, value in data.items():
-                        self.retrieve_lost_games.append([
-                            value["player"],
-                            value["opponent_moves"]
-                        ])
-            except FileNotFoundError:
-                pass
-
         # -----------------------------
         # Decide between normal or review game
         # -----------------------------
-        if random.random() >= self.review_ratio or not self.retrieve_lost_games:
+        lost_game_chosen = None
+        if random.random() < self.review_ratio and self.lost_games is not None:
+            lost_game_chosen = self.lost_games.sample(random.randrange)
+
+        if lost_game_chosen is None:
             # Normal game start
             self.draw = random.random()
             self.turn = 0 if self.draw <= self.first_play_rate else 1
@@ -196,43 +228,43 @@ class TicTacToeTrainingEnv(TicTacToeBaseEnv):
         # -----------------------------
         # Start from a past losing position
         # -----------------------------
-        lost_game_chosen = random.choice(self.retrieve_lost_games)
         self.player = lost_game_chosen[0]
-        self.opponent_load_blows = lost_game_chosen[1].copy()
-        self.opponent_load_blows_original = lost_game_chosen[1]
+        self.opponent_load_blows = lost_game_chosen[1]
+        self.opponent_load_blows_original = lost_game_chosen[1].copy()
 
         # Apply first move if agent is player 1
         if self.player == 1 and self.opponent_load_blows:
-            line, column = divmod(self.opponent_load_blows.pop(0), self.board_length)
-            self.gameboard[line][column] = 0
+            self.place_mark(self.opponent_load_blows.pop(0), 0)
 
         self.first_to_play = (self.player == 0)
         return self.get_observation(), {}
 
+    @timed("env.opponent_action")
     def get_opponent_action(self):
         """
         Return opponent's move based on its type:
-        - PPOAgent uses its play() method with observation
-        - RandomAgent or SmartRandomAgent uses board info and valid moves
+        - PPOAgent / RemotePPOAgent use their play() method with observation
+        - RandomAgent, SmartRandomAgent, PerfectAgent or MCTSAgent uses board info and valid moves
         Raises ValueError if opponent agent invalid.
         """
         valid_moves = np.where(self.valid_actions() == 1)[0]
 
         if hasattr(self.opponent_agent, "play"):
-            if hasattr(self.opponent_agent, "agent"):  # PPOAgent
+            if isinstance(self.opponent_agent, (PPOAgent, RemotePPOAgent)):
                 obs = self.get_observation()
                 return self.opponent_agent.play(obs)
-            else:  # Random or SmartRandom
+            else:  # Random, SmartRandom, Perfect or MCTS
                 return self.opponent_agent.play(
                     board_length=TRAINING_DEFAULT_BOARD_LENGTH,
                     pattern_victory_length=TRAINING_DEFAULT_PATTERN_VICTORY_LENGTH,
                     player=self.player,
-                    gameboard=self.gameboard,
+                    gameboard=self.bitboard,
                     valid_moves=valid_moves
                 )
 
         raise ValueError("❌ Invalid opponent agent!")
 
+    @timed("env.training_step")
     def step(self, action):
         """
         Process agent action and opponent action sequentially.
@@ -297,3 +329,10 @@ class TicTacToeTrainingEnv(TicTacToeBaseEnv):
             return obs_opponent, final_reward, terminated_opponent, truncated_opponent, info_agent
 
         return obs_opponent, reward_agent, False, False, _
+
+    def instrumentation_snapshot(self, reset=True):
+        """
+        Measures of utils/instrumentation.py in the process of this env, read by
+        training/callbacks.py through SubprocVecEnv.env_method.
+        """
+        return get_instrumentation().snapshot(reset)
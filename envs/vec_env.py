@@ -0,0 +1,282 @@
+import json
+import os
+
+import numpy as np
+from stable_baselines3.common.vec_env import VecEnv
+
+from agents import RandomAgent, SmartRandomAgent, PPOAgent, PerfectAgent, MCTSAgent
+from utils.bitboard import BitBoard
+from configs.config import *
+from envs.base_env import TicTacToeBaseEnv
+from envs.training_env import load_opponent_agents, opponent_probabilities
+from utils.heuristics_vectorized import get_vectorized_heuristic
+from utils.transposition import heuristic_differences
+
+
+class TicTacToeVecEnv(VecEnv):
+    """
+    Native vectorized version of TicTacToeTrainingEnv.
+
+    N boards are held in a single (N, board_length * board_length) int8 array and
+    every step applies N agent actions, checks N wins, computes N heuristic rewards,
+    plays N opponent moves and builds N action masks with array operations.
+    PPO opponents are queried once per checkpoint per step on the stacked
+    observations of the boards they play on.
+
+    Implements the Stable-Baselines3 VecEnv interface and action_masks(), so it
+    can be given directly to MaskablePPO. Finished boards are reset automatically
+    and their last observation is stored in infos[i]["terminal_observation"].
+    Review mode (replaying lost games) is not supported.
+    """
+
+    def __init__(self,
+                 num_envs,
+                 board_length=DEFAULT_BOARD_LENGTH,
+                 pattern_victory_length=DEFAULT_PATTERN_VICTORY_LENGTH,
+                 victory_reward=REWARD_VICTORY,
+                 opponent_pool=None,
+                 first_play_rate=DEFAULT_FIRST_PLAY_RATE,
+                 opponent_statistics_file=None,
+                 active_heuristic=True,
+                 seed=None):
+        """
+        Initialize the vectorized training environment.
+
+        Parameters:
+        - num_envs (int): number of boards played in parallel
+        - board_length (int): size of the board (NxN)
+        - pattern_victory_length (int): number of consecutive marks to win
+        - victory_reward (float): reward for winning the game
+        - opponent_pool (list[str]): list of opponent types or agent paths
+        - first_play_rate (float): probability that the agent plays first
+        - opponent_statistics_file (str): JSON file path with opponent statistics
+        - active_heuristic (bool): add the cost_function reward after non-terminal agent moves
+        - seed (int): seed of the random generator
+        """
+        self.board_length = board_length
+        self.pattern_victory_length = pattern_victory_length
+        self.n_cells = board_length * board_length
+        self.victory_reward = victory_reward
+        self.first_play_rate = first_play_rate
+        self.active_heuristic = active_heuristic
+        self.render_mode = None
+        self.rng = np.random.default_rng(seed)
+
+        # Same spaces as the single-board environments
+        spaces_env = TicTacToeBaseEnv(board_length, pattern_victory_length, active_heuristic=False)
+        super().__init__(num_envs, spaces_env.observation_space, spaces_env.action_space)
+
+        # Opponents
+        self.opponent_pool = opponent_pool if opponent_pool else ["random"]
+        self.opponent_agents = load_opponent_agents(self.opponent_pool)
+        self.opponent_names = list(self.opponent_agents.keys())
+        statistics = {}
+        if opponent_statistics_file is not None and os.path.exists(opponent_statistics_file):
+            with open(opponent_statistics_file, "r") as f:
+                statistics = json.load(f)
+        probabilities = opponent_probabilities(self.opponent_agents, statistics)
+        self.opponent_weights = np.array([probabilities[name] for name in self.opponent_names])
+
+        # Winning windows and cell membership, shared with the vectorized heuristic
+        self.heuristic = get_vectorized_heuristic(board_length, pattern_victory_length)
+        self.windows = self.heuristic.win_windows
+        self.window_membership = np.zeros((len(self.windows), self.n_cells), dtype=np.int64)
+        self.window_membership[np.arange(len(self.windows))[:, None], self.windows] = 1
+        through_cell = [np.where(self.window_membership[:, cell])[0] for cell in range(self.n_cells)]
+        width = max(len(ids) for ids in through_cell)
+        self.windows_through_cell = np.full((self.n_cells, width), -1, dtype=np.int64)
+        for cell, ids in enumerate(through_cell):
+            self.windows_through_cell[cell, :len(ids)] = ids
+
+        # Game state
+        self.boards = np.full((num_envs, self.n_cells), EMPTY_CELL, dtype=np.int8)
+        self.players = np.zeros(num_envs, dtype=np.int64)
+        self.is_done = np.zeros(num_envs, dtype=bool)
+        self.opponents = np.zeros(num_envs, dtype=np.int64)
+        self.first_to_play = np.ones(num_envs, dtype=bool)
+        self.actions = None
+
+    # ---------------------------
+    # Board operations
+    # ---------------------------
+    def action_masks(self):
+        """Return the (N, board_length * board_length) boolean mask of empty cells."""
+        return self.boards == EMPTY_CELL
+
+    def _observations(self, indices=None):
+        """Build the stacked observation dictionary of the selected boards."""
+        indices = slice(None) if indices is None else indices
+        boards = self.boards[indices]
+        return {
+            "observation": boards.reshape(-1, self.board_length, self.board_length).copy(),
+            "action_mask": (boards == EMPTY_CELL).astype(np.float32),
+            "current_player": self.players[indices].astype(np.float32),
+            "is_done": self.is_done[indices].astype(np.float32),
+        }
+
+    def _play(self, indices, actions):
+        """
+        Place the marks of the players to move on the selected boards.
+
+        Returns:
+        - won (np.ndarray): True where the move completes a winning window
+        - full (np.ndarray): True where the board is now full
+        """
+        players = self.players[indices]
+        self.boards[indices, actions] = players
+
+        window_ids = self.windows_through_cell[actions]
+        cells = self.windows[np.maximum(window_ids, 0)]
+        owned = self.boards[indices[:, None, None], cells] == players[:, None, None]
+        won = (owned.all(axis=2) & (window_ids >= 0)).any(axis=1)
+        full = ~(self.boards[indices] == EMPTY_CELL).any(axis=1)
+        return won, full
+
+    def _heuristic_rewards(self, indices):
+        """
+        Batched cost_function of the selected boards for the players who just moved:
+        the heuristic difference is read from the shared cache (utils/transposition.py),
+        the opponent's immediate win check is done on every board.
+        """
+        boards = self.boards[indices]
+        players = self.players[indices]
+        masks = (boards == EMPTY_CELL).astype(np.int8)
+        opponent_wins = self.heuristic.immediate_wins(boards, 1 - players, masks)
+        differences = heuristic_differences(boards, players, self.board_length, self.pattern_victory_length)
+        return np.where(opponent_wins, REWARD_ALLOW_OPP_WIN, differences)
+
+    def _immediate_wins(self, indices, players):
+        """Return the (n, cells) mask of empty cells that win at once for the given players."""
+        boards = self.boards[indices]
+        in_windows = boards[:, self.windows]
+        owned = (in_windows == players[:, None, None]).sum(axis=2)
+        empty = (in_windows == EMPTY_CELL).sum(axis=2)
+        one_move_left = ((owned == self.pattern_victory_length - 1) & (empty == 1)).astype(np.int64)
+        return (one_move_left @ self.window_membership > 0) & (boards == EMPTY_CELL)
+
+    def _random_moves(self, indices):
+        """Pick a uniformly random empty cell on each selected board."""
+        scores = self.rng.random((len(indices), self.n_cells))
+        scores[self.boards[indices] != EMPTY_CELL] = -1.0
+        return scores.argmax(axis=1)
+
+    def _smart_random_moves(self, indices):
+        """SmartRandomAgent on each selected board: win, else block, else random."""
+        players = self.players[indices]
+        moves = self._random_moves(indices)
+        blocking = self._immediate_wins(indices, 1 - players)
+        winning = self._immediate_wins(indices, players)
+        # Lowest winning / blocking cell, as is_winning_move scans moves in increasing order
+        moves = np.where(blocking.any(axis=1), blocking.argmax(axis=1), moves)
+        moves = np.where(winning.any(axis=1), winning.argmax(axis=1), moves)
+        return moves
+
+    def _board_move(self, agent, index):
+        """PerfectAgent / MCTSAgent move on one board (solution table lookups and searches are not vectorized)."""
+        board = BitBoard.from_gameboard(self.boards[index].reshape(self.board_length, self.board_length), self.pattern_victory_length)
+        return agent.play(self.players[index], board, np.flatnonzero(self.boards[index] == EMPTY_CELL))
+
+    def _opponent_moves(self, indices):
+        """Return one opponent move per selected board, batching PPO opponents."""
+        moves = np.zeros(len(indices), dtype=np.int64)
+        opponents = self.opponents[indices]
+        for opponent_id in np.unique(opponents):
+            selected = opponents == opponent_id
+            boards = indices[selected]
+            agent = self.opponent_agents[self.opponent_names[opponent_id]]
+            if isinstance(agent, PPOAgent):
+                moves[selected] = agent.play_batch(self._observations(boards))
+            elif isinstance(agent, SmartRandomAgent):
+                moves[selected] = self._smart_random_moves(boards)
+            elif isinstance(agent, RandomAgent):
+                moves[selected] = self._random_moves(boards)
+            elif isinstance(agent, (PerfectAgent, MCTSAgent)):
+                moves[selected] = [self._board_move(agent, board) for board in boards]
+            else:
+                raise ValueError("❌ Invalid opponent agent!")
+        return moves
+
+    def _reset_boards(self, indices):
+        """Start new games on the selected boards (opponent plays first when needed)."""
+        self.boards[indices] = EMPTY_CELL
+        self.players[indices] = 0
+        self.is_done[indices] = False
+        self.opponents[indices] = self.rng.choice(len(self.opponent_names), size=len(indices), p=self.opponent_weights)
+        self.first_to_play[indices] = self.rng.random(len(indices)) <= self.first_play_rate
+
+        opening = indices[~self.first_to_play[indices]]
+        if len(opening):
+            self._play(opening, self._opponent_moves(opening))
+            self.players[opening] = 1
+
+    # ---------------------------
+    # VecEnv interface
+    # ---------------------------
+    def reset(self):
+        seeds = [seed for seed in self._seeds if seed is not None]
+        if seeds:
+            self.rng = np.random.default_rng(seeds)
+        self._reset_seeds()
+        self._reset_options()
+        self._reset_boards(np.arange(self.num_envs))
+        return self._observations()
+
+    def step_async(self, actions):
+        self.actions = np.asarray(actions, dtype=np.int64).reshape(self.num_envs)
+
+    def step_wait(self):
+        actions = self.actions
+        all_envs = np.arange(self.num_envs)
+        if (self.boards[all_envs, actions] != EMPTY_CELL).any():
+            raise ValueError("Invalid action: cell already occupied.")
+
+        rewards = np.zeros(self.num_envs, dtype=np.float32)
+        dones = np.zeros(self.num_envs, dtype=bool)
+
+        # Agent's turn
+        won, full = self._play(all_envs, actions)
+        rewards[won] = self.victory_reward
+        dones |= won | full
+
+        ongoing = all_envs[~dones]
+        if self.active_heuristic and len(ongoing):
+            rewards[ongoing] = self._heuristic_rewards(ongoing)
+        self.players = 1 - self.players
+
+        # Opponent's turn
+        if len(ongoing):
+            won, full = self._play(ongoing, self._opponent_moves(ongoing))
+            rewards[ongoing[won]] = -self.victory_reward
+            rewards[ongoing[full & ~won]] = 0.0
+            dones[ongoing[won | full]] = True
+            self.players[ongoing] = 1 - self.players[ongoing]
+
+        self.is_done[:] = dones
+        infos = [{} for _ in range(self.num_envs)]
+        finished = all_envs[dones]
+        if len(finished):
+            terminal = self._observations(finished)
+            for k, i in enumerate(finished):
+                infos[i]["terminal_observation"] = {key: value[k] for key, value in terminal.items()}
+            self._reset_boards(finished)
+
+        return self._observations(), rewards, dones, infos
+
+    def close(self):
+        pass
+
+    def get_attr(self, attr_name, indices=None):
+        return [getattr(self, attr_name)] * len(list(self._get_indices(indices)))
+
+    def set_attr(self, attr_name, value, indices=None):
+        setattr(self, attr_name, value)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        indices = list(self._get_indices(indices))
+        if method_name == "action_masks":
+            return list(self.action_masks()[indices])
+        result = getattr(self, method_name)(*method_args, **method_kwargs)
+        return [result] * len(indices)
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False] * len(list(self._get_indices(indices)))
@@ -1,8 +1,13 @@
-from fastapi import FastAPI
+import os
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from agents import PPOAgent, RandomAgent, SmartRandomAgent
-from agents.human import Human
-from envs import TicTacToeBaseEnv
+from fastapi.responses import JSONResponse
+from agents import get_model_registry
+from configs.config import MODEL_REGISTRY_PRELOAD
+from utils.policy_export import find_exported_policy
+from fastapi_app.services.inference_queue import InferenceQueues
+from fastapi_app.services.session_store import SessionNotFound, create_session_store
 from .routers import game
 app = FastAPI()
 
@@ -20,8 +25,30 @@ app.add_middleware(
 )
 
 
-app.state.env: TicTacToeBaseEnv | None  = None
-app.state.agent: PPOAgent | RandomAgent | SmartRandomAgent | Human | None = None
-app.state.game_mode: str |  None = None
+# Games of every player, keyed by the session ID returned by /game/initEnv
+app.state.sessions = create_session_store()
+# Micro-batched PPO move inference, one queue per loaded model
+app.state.inference_queues = InferenceQueues()
+
+
+@app.on_event("startup")
+def preload_agents():
+    # Load the agents once at startup instead of during the first games. Agents with
+    # an exported policy are served by FastPolicyAgent (their model is only needed for MCTS)
+    if MODEL_REGISTRY_PRELOAD and os.path.isdir("best_agents"):
+        for name in sorted(os.listdir("best_agents")):
+            agent_path = os.path.join("best_agents", name)
+            if name.endswith(".zip") and find_exported_policy(agent_path) is None:
+                get_model_registry().get(agent_path)
+
+
+@app.on_event("shutdown")
+def stop_inference_queues():
+    app.state.inference_queues.close()
+
+
+@app.exception_handler(SessionNotFound)
+def session_not_found_handler(request: Request, exc: SessionNotFound):
+    return JSONResponse(status_code=404, content={"message": "Session not found or expired"})
 
 app.include_router(game.router, prefix="/game")
@@ -1,4 +1,8 @@
-from fastapi import APIRouter, Request
+from typing import Annotated
+
+from fastapi import APIRouter, Header, Request
+
+from agents import get_model_registry
 
 from fastapi_app.models.agent_model import GameModeConfigs, AgentConfigs
 from fastapi_app.models.env_model import EnvConfigs, ActionPlayed
@@ -7,34 +11,50 @@ from fastapi_app.services.env_service import init_env, observation, action_playe
 
 router = APIRouter()
 
+# Session ID returned by /initEnv, sent back by the client with every other request
+SessionId = Annotated[str, Header(alias="X-Session-Id")]
+
 @router.post("/initEnv")
 def init_env_route(configs: EnvConfigs, request: Request):
     return init_env(request.app, configs)
 
 @router.post("/initGameMode")
-def init_game_mode_route(request: Request, configs: GameModeConfigs):
-    return init_game_mode(request.app, configs)
+def init_game_mode_route(request: Request, configs: GameModeConfigs, session_id: SessionId):
+    return init_game_mode(request.app, session_id, configs)
 
 @router.post("/actionPlayed")
-def action_played_(request: Request, action: ActionPlayed):
-    return action_played(request.app, action)
+def action_played_(request: Request, action: ActionPlayed, session_id: SessionId):
+    return action_played(request.app, session_id, action)
 
 @router.post("/saveAgent")
-def save_agent_(request: Request, agent: AgentConfigs):
-    return save_agent(request.app, agent)
+def save_agent_(request: Request, agent: AgentConfigs, session_id: SessionId):
+    return save_agent(request.app, session_id, agent)
 
 @router.post("/resetEnv")
-def reset_(request: Request,):
-    return reset(request.app)
+def reset_(request: Request, session_id: SessionId):
+    return reset(request.app, session_id)
 
 @router.get("/observation")
-def get_observation_route(request: Request):
-    return observation(request.app)
+def get_observation_route(request: Request, session_id: SessionId):
+    return observation(request.app, session_id)
 
 @router.get("/opponents")
-def get_available_opponents_route(request: Request):
-    return get_available_opponents(request.app)
+def get_available_opponents_route(request: Request, session_id: SessionId):
+    return get_available_opponents(request.app, session_id)
 
 @router.get("/move")
-def get_agent_move_(request: Request):
-    return get_agent_move(request.app)
\ No newline at end of file
+async def get_agent_move_(request: Request, session_id: SessionId):
+    return await get_agent_move(request.app, session_id)
+
+@router.get("/inferenceMetrics")
+def get_inference_metrics_route(request: Request):
+    return request.app.state.inference_queues.stats()
+
+@router.get("/modelRegistry")
+def get_model_registry_route():
+    return get_model_registry().stats()
+
+@router.delete("/session")
+def delete_session_route(request: Request, session_id: SessionId):
+    request.app.state.sessions.delete(session_id)
+    return {"message": "Success"}
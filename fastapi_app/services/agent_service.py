@@ -2,26 +2,31 @@ import os
 
 import numpy as np
 from fastapi import Path
-from agents import PPOAgent, RandomAgent, SmartRandomAgent
+from fastapi.concurrency import run_in_threadpool
+import agents
+from agents import RandomAgent, SmartRandomAgent, FastPolicyAgent
 from typing import Annotated
 import re
 
 from fastapi_app.models.agent_model import GameModeConfigs, AgentConfigs
+from utils.policy_export import find_exported_policy
 
 
-def init_game_mode(app, game_mode: GameModeConfigs) :
-    if app.state.game_mode is not None:
-        return{
-            "message": "Game mode already initialized",
-        }
-    app.state.game_mode = game_mode.mode
+def init_game_mode(app, session_id, game_mode: GameModeConfigs) :
+    with app.state.sessions.open(session_id) as session:
+        if session.game_mode is not None:
+            return{
+                "message": "Game mode already initialized",
+            }
+        session.game_mode = game_mode.mode
     return {
         "message": "Game mode initialized => Game mode : {}".format(game_mode.mode),
     }
 
-def get_available_opponents(app):
-    board_size = app.state.env.board_length
-    pattern_vl = app.state.env.pattern_victory_length
+def get_available_opponents(app, session_id):
+    with app.state.sessions.open(session_id) as session:
+        board_size = session.board_length
+        pattern_vl = session.pattern_victory_length
     agents_dir = "best_agents"
     if not os.path.exists(agents_dir):
         raise AssertionError("Agent dir not found")
@@ -37,40 +42,74 @@ def get_available_opponents(app):
         if match:
             version = match.groups()[0]
             opponents.append({"name" : f"AI agent version {version}", "version": f"{version}"})
+            opponents.append({"name" : f"AI agent version {version} + MCTS", "version": f"{version}", "mcts": True})
 
     return opponents
 
-def save_agent(app, agent_config:AgentConfigs):
-    agent = agent_config.agent
-    env = app.state.env
+def build_agent(agent, board_length, pattern_victory_length):
+    """Instantiate the agent described by a saved agent configuration."""
     if agent["name"] == "Random":
-        app.state.agent = RandomAgent()
+        return RandomAgent()
     elif agent["name"] == "Smart Random":
-        app.state.agent = SmartRandomAgent()
+        return SmartRandomAgent()
     else:
-        agent_path = f"best_agents/agent_v{agent['version']}_{env.board_length}x{env.board_length}_{env.victory_pattern_length}.zip"
-        app.state.agent = PPOAgent(agent_path)
-
-
-def get_agent_move(app):
-    agent = app.state.agent
-    env = app.state.env
-    valid_moves = np.where(env.valid_actions() == 1)[0]
-
-    if isinstance(agent, RandomAgent):
-        return int(agent.play(valid_moves=valid_moves))
-
-    elif isinstance(agent, SmartRandomAgent):
-        return int(agent.play(
-            player=env.player,
-            gameboard=env.gameboard,
-            valid_moves=valid_moves,
-            board_length=env.board_length,
-            pattern_victory_length=env.pattern_victory_length,
-        ))
-
-    elif isinstance(agent, PPOAgent):
-        obs = env.get_observation()
-        return int(agent.play(obs))
-    else:
-        raise AssertionError("Agent not implemented")
\ No newline at end of file
+        agent_path = f"best_agents/agent_v{agent['version']}_{board_length}x{board_length}_{pattern_victory_length}.zip"
+        if agent.get("mcts"):
+            return agents.MCTSAgent(agent_path)
+        exported_path = find_exported_policy(agent_path)
+        return FastPolicyAgent(exported_path) if exported_path is not None else agents.PPOAgent(agent_path)
+
+def save_agent(app, session_id, agent_config:AgentConfigs):
+    with app.state.sessions.open(session_id) as session:
+        session.agent_config = agent_config.agent
+        session.agent = build_agent(agent_config.agent, session.board_length, session.pattern_victory_length)
+
+
+def agent_move_request(app, session_id):
+    """
+    Read the session (under its lock) and compute the move of a board-based agent.
+
+    Returns:
+    - tuple: (move, None), or (None, (agent, observation)) for a PPO agent whose
+      move is computed by the app's inference queues
+    """
+    with app.state.sessions.open(session_id) as session:
+        if session.agent is None and session.agent_config is not None:
+            # Session read back from a persistent backend: rebuild its agent
+            session.agent = build_agent(session.agent_config, session.board_length, session.pattern_victory_length)
+        agent = session.agent
+        env = session.env
+        valid_moves = np.where(env.valid_actions() == 1)[0]
+
+        if isinstance(agent, RandomAgent):
+            return int(agent.play(valid_moves=valid_moves)), None
+
+        elif isinstance(agent, FastPolicyAgent):
+            return int(agent.play(env.get_observation())), None
+
+        # Torch-backed agents are checked last: agents.MCTSAgent / agents.PPOAgent are
+        # imported on first access, which has already happened if the agent is one of them
+        elif isinstance(agent, SmartRandomAgent) or isinstance(agent, agents.MCTSAgent):
+            return int(agent.play(
+                player=env.player,
+                gameboard=env.gameboard,
+                valid_moves=valid_moves,
+                board_length=env.board_length,
+                pattern_victory_length=env.pattern_victory_length,
+            )), None
+
+        elif isinstance(agent, agents.PPOAgent):
+            obs = env.get_observation()
+            return None, (agent, obs)
+        else:
+            raise AssertionError("Agent not implemented")
+
+
+async def get_agent_move(app, session_id):
+    # Session locks and tree searches run in the threadpool, PPO moves are batched
+    # with the concurrent requests of the same model: torch never blocks the event loop
+    move, request = await run_in_threadpool(agent_move_request, app, session_id)
+    if request is None:
+        return move
+    agent, obs = request
+    return await app.state.inference_queues.predict(agent, obs)
@@ -1,47 +1,41 @@
-from envs import TicTacToeBaseEnv
 from fastapi_app.models.env_model import EnvConfigs, ActionPlayed
 
 
-def observation(app):
-    if app.state.env is None:
-        return None
-    obs = app.state.env.get_observation()
-    return {
-        "observation": obs["observation"].tolist(),
-        "action_mask": obs["action_mask"].tolist(),
-        "current_player" : obs["current_player"].item(),
-        "is_done": obs["is_done"].item(),
-        "board_size": app.state.env.board_length,
-    }
+def observation(app, session_id):
+    with app.state.sessions.open(session_id) as session:
+        env = session.env
+        obs = env.get_observation()
+        return {
+            "observation": obs["observation"].tolist(),
+            "action_mask": obs["action_mask"].tolist(),
+            "current_player" : obs["current_player"].item(),
+            "is_done": obs["is_done"].item(),
+            "board_size": env.board_length,
+        }
 
 def init_env(app, configs: EnvConfigs):
 
-    app.state.env = TicTacToeBaseEnv(board_length=configs.board_length,
-                                     pattern_victory_length=configs.pattern_victory_length,
-                                     active_heuristic=False
-                           )
+    session = app.state.sessions.create(board_length=configs.board_length,
+                                        pattern_victory_length=configs.pattern_victory_length)
     return {
         "message": "Success",
+        "session_id": session.session_id,
         **configs.model_dump(),
-        "gameboard": app.state.env.gameboard.tolist()
+        "gameboard": session.env.gameboard.tolist()
     }
 
-def action_played(app, action: ActionPlayed):
+def action_played(app, session_id, action: ActionPlayed):
 
-    if app.state.env is None:
-        return{
-            "message": "Env not initialized",
-        }
-    app.state.env.step(action.move)
+    with app.state.sessions.open(session_id) as session:
+        session.play(action.move)
     return {
         "message": "Success",
         "move played": action.move,
     }
 
-def reset(app):
-    if app.state.env is not None:
-        app.state.env.reset()
-        return {
-            "message": "Success",
-        }
-    return {"message": "Reset impossible"}
\ No newline at end of file
+def reset(app, session_id):
+    with app.state.sessions.open(session_id) as session:
+        session.reset()
+    return {
+        "message": "Success",
+    }
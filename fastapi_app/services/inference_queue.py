@@ -0,0 +1,129 @@
+import asyncio
+import os
+
+import numpy as np
+
+from configs.config import API_INFERENCE_MAX_WAIT, API_INFERENCE_MAX_BATCH_SIZE
+
+
+class InferenceQueue:
+    """
+    Asyncio micro-batching queue of one PPO model.
+
+    Move requests wait at most max_wait seconds after the first request of a batch
+    (or until max_batch_size requests are gathered), then the whole batch is scored
+    with a single torch.no_grad forward pass run in a worker thread, so the event
+    loop is never blocked by torch. Each request's future receives its action, or
+    the exception of its batch when the batch cannot be scored.
+
+    The queue only keeps the agent path: the model is taken from the model registry
+    for every batch, so a model evicted from the registry is not kept in memory.
+    """
+
+    def __init__(self, agent_path, deterministic, max_wait=API_INFERENCE_MAX_WAIT, max_batch_size=API_INFERENCE_MAX_BATCH_SIZE):
+        """
+        Parameters:
+        - agent_path (str): PPO checkpoint (.zip) answering the requests
+        - deterministic (bool): take the most likely actions instead of sampling
+        - max_wait (float): seconds waited to fill a batch after its first request
+        - max_batch_size (int): maximum number of requests per forward pass
+        """
+        self.agent_path = agent_path
+        self.deterministic = deterministic
+        self.max_wait = max_wait
+        self.max_batch_size = max_batch_size
+        self.queue = asyncio.Queue()
+        self.task = None
+
+        # Counters
+        self.n_batches = 0
+        self.n_requests = 0
+
+    async def predict(self, observation):
+        """Queue one observation and wait for its action."""
+        if self.task is None:
+            self.task = asyncio.get_running_loop().create_task(self.serve_forever())
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((observation, future))
+        return await future
+
+    async def next_batch(self):
+        """Wait for a first request, then gather requests until max_wait has elapsed or the batch is full."""
+        batch = [await self.queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    def forward(self, observations):
+        """Stack the observations of a batch and score them with one forward pass (run in a worker thread)."""
+        from agents.inference_server import policy_actions
+        from agents.ppo_agent import PPOAgent
+
+        stacked = {
+            key: np.stack([observation[key] for observation in observations])
+            for key in observations[0]
+        }
+        agent = PPOAgent(self.agent_path, evaluation=self.deterministic)
+        return policy_actions(agent, stacked, self.deterministic)
+
+    async def serve_forever(self):
+        while True:
+            batch = await self.next_batch()
+            self.n_batches += 1
+            self.n_requests += len(batch)
+            try:
+                actions = await asyncio.to_thread(self.forward, [observation for observation, _ in batch])
+            except Exception as error:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(error)
+                continue
+            for (_, future), action in zip(batch, actions.tolist()):
+                if not future.done():
+                    future.set_result(int(action))
+
+    def close(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    def stats(self):
+        return {
+            "batches": self.n_batches,
+            "requests": self.n_requests,
+            "mean_batch_size": self.n_requests / self.n_batches if self.n_batches else 0.0,
+        }
+
+
+class InferenceQueues:
+    """One InferenceQueue per agent file (and action mode), created on first use."""
+
+    def __init__(self, max_wait=API_INFERENCE_MAX_WAIT, max_batch_size=API_INFERENCE_MAX_BATCH_SIZE):
+        self.max_wait = max_wait
+        self.max_batch_size = max_batch_size
+        self.queues = {}
+
+    async def predict(self, agent, observation):
+        """Action of a PPOAgent for one observation, batched with the concurrent requests of the same model."""
+        # Agents of the same file share their model through the model registry
+        key = (os.path.abspath(agent.agent_path), agent.evaluation)
+        if key not in self.queues:
+            self.queues[key] = InferenceQueue(agent.agent_path, agent.evaluation, self.max_wait, self.max_batch_size)
+        return await self.queues[key].predict(observation)
+
+    def close(self):
+        for queue in self.queues.values():
+            queue.close()
+        self.queues = {}
+
+    def stats(self):
+        return [{"agent_path": queue.agent_path, "deterministic": queue.deterministic, **queue.stats()}
+                for queue in self.queues.values()]
@@ -0,0 +1,276 @@
+import json
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from envs import TicTacToeBaseEnv
+from configs.config import SESSION_TTL, SESSION_MAX_COUNT, SESSION_BACKEND, SESSION_SQLITE_PATH
+
+
+class SessionNotFound(KeyError):
+    """Unknown or expired session ID."""
+
+
+class GameSession:
+    """
+    State of one player's game.
+
+    The persisted state is compact: the board configuration, the moves played so far,
+    the game mode and the chosen agent configuration. The environment and the agent
+    are runtime objects rebuilt from it when needed (e.g. after being read back from a
+    SQLite backend) and kept on the session while it stays in memory.
+    """
+
+    __slots__ = ("session_id", "board_length", "pattern_victory_length", "moves", "game_mode", "agent_config",
+                 "_env", "agent")
+
+    def __init__(self, session_id, board_length, pattern_victory_length, moves=None, game_mode=None, agent_config=None):
+        self.session_id = session_id
+        self.board_length = board_length
+        self.pattern_victory_length = pattern_victory_length
+        self.moves = list(moves) if moves else []
+        self.game_mode = game_mode
+        self.agent_config = agent_config
+        self._env = None
+        self.agent = None  # agent instance, built lazily from agent_config
+
+    @property
+    def env(self):
+        """Environment of the game, rebuilt by replaying the moves when missing."""
+        if self._env is None:
+            env = TicTacToeBaseEnv(board_length=self.board_length,
+                                   pattern_victory_length=self.pattern_victory_length,
+                                   active_heuristic=False)
+            for move in self.moves:
+                env.step(move)
+            self._env = env
+        return self._env
+
+    def play(self, move):
+        """Play a move on the environment and record it."""
+        self.env.step(move)
+        self.moves.append(int(move))
+
+    def reset(self):
+        self.env.reset()
+        self.moves = []
+
+    def to_record(self):
+        return json.dumps({
+            "board_length": self.board_length,
+            "pattern_victory_length": self.pattern_victory_length,
+            "moves": self.moves,
+            "game_mode": self.game_mode,
+            "agent_config": self.agent_config,
+        })
+
+    @classmethod
+    def from_record(cls, session_id, record):
+        return cls(session_id, **json.loads(record))
+
+
+# ---------------------------
+# Backends
+# ---------------------------
+class MemoryBackend:
+    """
+    Sessions kept as objects in this process, ordered by last access (LRU).
+    Environments and agents stay attached to their session between requests.
+    Every operation runs under one lock, as requests are served by a thread pool.
+    """
+
+    def __init__(self):
+        self.sessions = OrderedDict()  # session_id -> (session, expires_at)
+        self.lock = threading.Lock()
+
+    def get(self, session_id, now):
+        with self.lock:
+            entry = self.sessions.get(session_id)
+            if entry is None:
+                return None
+            if entry[1] < now:
+                del self.sessions[session_id]
+                return None
+            return entry[0]
+
+    def put(self, session, expires_at):
+        with self.lock:
+            self.sessions[session.session_id] = (session, expires_at)
+            self.sessions.move_to_end(session.session_id)
+
+    def renew(self, session, expires_at):
+        """Save a session back only if it is still stored (not deleted or evicted meanwhile)."""
+        with self.lock:
+            if session.session_id not in self.sessions:
+                return False
+            self.sessions[session.session_id] = (session, expires_at)
+            self.sessions.move_to_end(session.session_id)
+            return True
+
+    def delete(self, session_id):
+        with self.lock:
+            self.sessions.pop(session_id, None)
+
+    def evict(self, now, max_count):
+        """Drop expired sessions, then the least recently used ones beyond max_count."""
+        evicted = []
+        with self.lock:
+            while self.sessions:
+                session_id, (_, expires_at) = next(iter(self.sessions.items()))
+                if expires_at >= now and len(self.sessions) <= max_count:
+                    break
+                del self.sessions[session_id]
+                evicted.append(session_id)
+        return evicted
+
+    def __len__(self):
+        with self.lock:
+            return len(self.sessions)
+
+
+class SQLiteBackend:
+    """
+    Sessions persisted as compact JSON records in a SQLite file, shared by every
+    worker process of the server. Environments are rebuilt from the moves on read.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.local = threading.local()
+        with self.connection() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "session_id TEXT PRIMARY KEY, record TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS sessions_expiry ON sessions (expires_at)")
+
+    def connection(self):
+        # sqlite3 connections cannot be shared between threads
+        if getattr(self.local, "connection", None) is None:
+            self.local.connection = sqlite3.connect(self.path, timeout=10)
+            self.local.connection.execute("PRAGMA journal_mode=WAL")
+        return self.local.connection
+
+    def get(self, session_id, now):
+        row = self.connection().execute(
+            "SELECT record FROM sessions WHERE session_id = ? AND expires_at >= ?", (session_id, now)
+        ).fetchone()
+        return None if row is None else GameSession.from_record(session_id, row[0])
+
+    def put(self, session, expires_at):
+        with self.connection() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, record, expires_at) VALUES (?, ?, ?)",
+                (session.session_id, session.to_record(), expires_at)
+            )
+
+    def renew(self, session, expires_at):
+        """Save a session back only if it is still stored (not deleted or evicted meanwhile)."""
+        with self.connection() as connection:
+            cursor = connection.execute(
+                "UPDATE sessions SET record = ?, expires_at = ? WHERE session_id = ?",
+                (session.to_record(), expires_at, session.session_id)
+            )
+        return cursor.rowcount > 0
+
+    def delete(self, session_id):
+        with self.connection() as connection:
+            connection.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def evict(self, now, max_count):
+        """Drop expired sessions, then the ones expiring first beyond max_count."""
+        with self.connection() as connection:
+            connection.execute("DELETE FROM sessions WHERE expires_at < ?", (now,))
+            connection.execute(
+                "DELETE FROM sessions WHERE session_id IN ("
+                "SELECT session_id FROM sessions ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+                (max_count,)
+            )
+        return []
+
+    def __len__(self):
+        return self.connection().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+
+# ---------------------------
+# Store
+# ---------------------------
+class SessionStore:
+    """
+    Session-scoped games of the API.
+
+    Every session expires ttl seconds after its last use, and at most max_count
+    sessions are kept (least recently used evicted first). Requests of the same
+    session are serialized by a per-session lock, requests of different sessions
+    run concurrently.
+    """
+
+    def __init__(self, backend=None, ttl=SESSION_TTL, max_count=SESSION_MAX_COUNT):
+        """
+        Parameters:
+        - backend (MemoryBackend or SQLiteBackend): session storage (in memory by default)
+        - ttl (float): seconds of inactivity before a session expires
+        - max_count (int): maximum number of sessions kept
+        """
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.ttl = ttl
+        self.max_count = max_count
+        self.store_lock = threading.Lock()
+        self.session_locks = {}
+
+    def create(self, board_length, pattern_victory_length):
+        """Start a new game and return its session."""
+        session = GameSession(secrets.token_urlsafe(16), board_length, pattern_victory_length)
+        now = time.time()
+        with self.store_lock:
+            for session_id in self.backend.evict(now, self.max_count - 1):
+                self.session_locks.pop(session_id, None)
+            self.backend.put(session, now + self.ttl)
+        return session
+
+    def lock(self, session_id):
+        with self.store_lock:
+            if session_id not in self.session_locks:
+                self.session_locks[session_id] = threading.Lock()
+            return self.session_locks[session_id]
+
+    @contextmanager
+    def open(self, session_id):
+        """
+        Hold a session for the duration of a request: the session is locked, yielded,
+        then saved back with a renewed expiry, unless it was deleted or evicted meanwhile.
+
+        Raises:
+        - SessionNotFound: unknown or expired session
+        """
+        with self.lock(session_id):
+            session = self.backend.get(session_id, time.time())
+            if session is None:
+                with self.store_lock:
+                    self.session_locks.pop(session_id, None)
+                raise SessionNotFound(session_id)
+            yield session
+            if not self.backend.renew(session, time.time() + self.ttl):
+                with self.store_lock:
+                    self.session_locks.pop(session_id, None)
+
+    def delete(self, session_id):
+        with self.lock(session_id):
+            self.backend.delete(session_id)
+        with self.store_lock:
+            self.session_locks.pop(session_id, None)
+
+    def __len__(self):
+        return len(self.backend)
+
+
+def create_session_store(backend=SESSION_BACKEND, sqlite_path=SESSION_SQLITE_PATH):
+    """Build the SessionStore of the configured backend ('memory' or 'sqlite')."""
+    if backend == "memory":
+        return SessionStore(MemoryBackend())
+    if backend == "sqlite":
+        return SessionStore(SQLiteBackend(sqlite_path))
+    raise ValueError(f"❌ Unknown session backend: {backend}")
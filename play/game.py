@@ -15,9 +15,12 @@ from rich.text import Text
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from envs import TicTacToeBaseEnv
-from agents.ppo_agent import PPOAgent
+import agents
 from agents.random_agent import RandomAgent
 from agents.smart_random_agent import SmartRandomAgent
+from agents.perfect_agent import PerfectAgent
+from agents.fast_policy_agent import FastPolicyAgent
+from utils.policy_export import find_exported_policy
 from agents.human import Human
 
 console = Console()
@@ -26,16 +29,19 @@ console = Console()
 def load_agent(agent_type, version=None, board_length=None, victory_pattern_length=None):
     """
     Load the appropriate agent:
-    - "random", "smart_random", "human"
+    - "random", "smart_random", "perfect", "human"
     - "agent": requires version and board_length
+    - "mcts": tree search guided by an agent, same requirements as "agent"
     """
     if agent_type == "random":
         return RandomAgent()
     elif agent_type == "smart_random":
         return SmartRandomAgent()
+    elif agent_type == "perfect":
+        return PerfectAgent()
     elif agent_type == "human":
         return Human()
-    elif agent_type == "agent":
+    elif agent_type in ("agent", "mcts"):
         if version is None or board_length is None:
             console.print(
                 Panel.fit("❌ Missing version or board size for agent.", style="bold red")
@@ -58,7 +64,13 @@ def load_agent(agent_type, version=None, board_length=None, victory_pattern_leng
                 )
             )
             sys.exit(1)
-        return PPOAgent(agent_path)
+        if agent_type == "mcts":
+            return agents.MCTSAgent(agent_path)
+        # Exported policy: NumPy forward pass, no stable_baselines3 model to load
+        exported_path = find_exported_policy(agent_path)
+        if exported_path is not None:
+            return FastPolicyAgent(exported_path)
+        return agents.PPOAgent(agent_path)
     else:
         console.print(
             Panel.fit(f"❌ Unknown agent type: {agent_type}", style="bold red")
@@ -78,7 +90,12 @@ def get_action(env, agent, board_length, victory_pattern_length):
     elif isinstance(agent, RandomAgent):
         return agent.play(valid_moves=valid_moves)
 
-    elif isinstance(agent, SmartRandomAgent):
+    elif isinstance(agent, FastPolicyAgent):
+        obs = env.get_observation()
+        return agent.play(obs)
+
+    # agents.MCTSAgent / agents.PPOAgent (torch) are imported on first access
+    elif isinstance(agent, (SmartRandomAgent, PerfectAgent)) or isinstance(agent, agents.MCTSAgent):
         return agent.play(
             player=env.player,
             gameboard=env.gameboard,
@@ -87,7 +104,7 @@ def get_action(env, agent, board_length, victory_pattern_length):
             pattern_victory_length=victory_pattern_length,
         )
 
-    elif isinstance(agent, PPOAgent):
+    elif isinstance(agent, agents.PPOAgent):
         obs = env.get_observation()
         return agent.play(obs)
 
@@ -258,14 +275,14 @@ def parse_args():
     parser.add_argument("-w", "--win", type=int, help="Victory pattern length")
 
     parser.add_argument("-f", "--first", type=str,
-                        choices=["agent", "random", "smart_random", "human"],
+                        choices=["agent", "mcts", "random", "smart_random", "perfect", "human"],
                         help="First player type")
     parser.add_argument("-s", "--second", type=str,
-                        choices=["agent", "random", "smart_random", "human"],
+                        choices=["agent", "mcts", "random", "smart_random", "perfect", "human"],
                         help="Second player type")
 
-    parser.add_argument("-vf", "--version_first", type=int, help="Version for first player if agent")
-    parser.add_argument("-vs", "--version_second", type=int, help="Version for second player if agent")
+    parser.add_argument("-vf", "--version_first", type=int, help="Version for first player if agent or mcts")
+    parser.add_argument("-vs", "--version_second", type=int, help="Version for second player if agent or mcts")
 
     parser.add_argument("-m", "--agents", action="store_true", help="List available PPO agents")
 
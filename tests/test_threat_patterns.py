@@ -0,0 +1,188 @@
+import os
+import random
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import utils.heuristics as heuristics
+from configs.config import EMPTY_CELL
+from utils.bitboard import get_winning_lines
+from utils.heuristics import (
+    contains_all_semi_opened_threats,
+    contains_dangerous_semi_opened_threats,
+    contains_opened_threats,
+    cost_function,
+    heuristic_points_calcul,
+    pattern_,
+    won_in_next_move,
+)
+from utils.line_state import LineState
+from utils.tactics import winning_cells
+
+# Board configurations checked: (board_length, pattern_victory_length)
+CONFIGS = [(3, 3), (5, 4), (7, 5), (9, 5)]
+PLAYERS = [("0", "1"), ("1", "0")]
+
+
+# ---------------------------
+# Reference implementations (pattern_() tables searched with str.find, pattern by pattern)
+# ---------------------------
+def reference_semi_opened_threats(segment, threat_length, playerId, opponentId, pattern_victory_length):
+    patterns, wall_blocked, _ = pattern_(playerId, threat_length, opponentId, pattern_victory_length)
+
+    pattern_find_on_the_left = False
+    pattern_find_on_the_right = False
+    total_count = 0
+    for pattern in patterns:
+        start = 0
+        while True:
+            start = segment.find(pattern, start)
+            if start == -1:
+                break
+            total_count += 1
+            if start == 0:
+                pattern_find_on_the_left = True
+            if start + len(pattern) == len(segment):
+                pattern_find_on_the_right = True
+            start += 1
+
+    if not pattern_find_on_the_left:
+        for pattern in wall_blocked:
+            if pattern[0] == playerId and segment.startswith(pattern):
+                total_count += 1
+                if len(pattern) == len(segment):
+                    return total_count
+                break
+
+    if not pattern_find_on_the_right:
+        for pattern in wall_blocked:
+            if pattern[-1] == playerId and segment.endswith(pattern):
+                total_count += 1
+                break
+
+    return total_count
+
+
+def reference_dangerous_semi_opened_threats(segment, threat_length, playerId, opponentId, pattern_victory_length):
+    _, _, dangerous_patterns = pattern_(playerId, threat_length, opponentId, pattern_victory_length)
+
+    total_count = 0
+    for pattern in dangerous_patterns:
+        start = 0
+        while True:
+            start = segment.find(pattern, start)
+            if start == -1:
+                break
+            total_count += 1
+            start += 1
+    return total_count
+
+
+def reference_opened_threats(segment, threat_length, playerId):
+    pattern = "3" + playerId * threat_length + "3"
+    count = 0
+    start = 0
+    while True:
+        start = segment.find(pattern, start)
+        if start == -1:
+            return count
+        count += 1
+        start += len(pattern) - 2
+
+
+def reference_is_winning_move(playerId, board, size, pattern_victory_length, authorized_moves):
+    for move in authorized_moves:
+        result = won_in_next_move(playerId, board.copy(), size, pattern_victory_length, move)
+        if result is not None:
+            return result
+    return None
+
+
+# ---------------------------
+# Helpers
+# ---------------------------
+def random_segments(board_length, n_segments, seed):
+    rng = random.Random(seed)
+    return ["".join(rng.choice("0133") for _ in range(rng.randint(1, board_length))) for _ in range(n_segments)]
+
+
+def random_boards(board_length, n_boards, seed):
+    """Boards reached by random legal moves (0 alternating with 1), with their valid actions mask."""
+    rng = random.Random(seed)
+    boards = []
+    for _ in range(n_boards):
+        board = np.full(board_length * board_length, EMPTY_CELL, dtype=np.int8)
+        cells = rng.sample(range(board.size), rng.randrange(board.size))
+        for turn, cell in enumerate(cells):
+            board[cell] = turn % 2
+        mask = (board == EMPTY_CELL).astype(np.int8)
+        boards.append((board.reshape(board_length, board_length), mask))
+    return boards
+
+
+# ---------------------------
+# Tests
+# ---------------------------
+@pytest.mark.parametrize("board_length,pattern_victory_length", CONFIGS)
+@pytest.mark.parametrize("playerId,opponentId", PLAYERS)
+def test_segment_counts_match_reference(board_length, pattern_victory_length, playerId, opponentId):
+    for segment in random_segments(board_length, 500, seed=board_length):
+        for threat_length in (pattern_victory_length - 2, pattern_victory_length - 1):
+            assert contains_all_semi_opened_threats(segment, threat_length, playerId, opponentId, pattern_victory_length) \
+                == reference_semi_opened_threats(segment, threat_length, playerId, opponentId, pattern_victory_length), segment
+            assert contains_dangerous_semi_opened_threats(segment, threat_length, playerId, opponentId, pattern_victory_length) \
+                == reference_dangerous_semi_opened_threats(segment, threat_length, playerId, opponentId, pattern_victory_length), segment
+            assert contains_opened_threats(segment, threat_length, playerId) \
+                == reference_opened_threats(segment, threat_length, playerId), segment
+
+
+@pytest.mark.parametrize("board_length,pattern_victory_length", CONFIGS)
+def test_cost_function_matches_reference(monkeypatch, board_length, pattern_victory_length):
+    boards = random_boards(board_length, 100, seed=board_length)
+    expected = []
+    with monkeypatch.context() as patch:
+        patch.setattr(heuristics, "contains_all_semi_opened_threats", reference_semi_opened_threats)
+        patch.setattr(heuristics, "contains_dangerous_semi_opened_threats", reference_dangerous_semi_opened_threats)
+        patch.setattr(heuristics, "is_winning_move", reference_is_winning_move)
+        for board, mask in boards:
+            expected.append([cost_function(playerId, opponentId, board, board_length, pattern_victory_length, mask)
+                             for playerId, opponentId in PLAYERS])
+
+    for (board, mask), reference in zip(boards, expected):
+        assert [cost_function(playerId, opponentId, board, board_length, pattern_victory_length, mask)
+                for playerId, opponentId in PLAYERS] == reference, board
+
+
+@pytest.mark.parametrize("board_length,pattern_victory_length", CONFIGS)
+def test_line_state_matches_board_scan(board_length, pattern_victory_length):
+    rng = random.Random(board_length)
+    lines = get_winning_lines(board_length, pattern_victory_length)
+    state = LineState(board_length, pattern_victory_length)
+    board = np.full(board_length * board_length, EMPTY_CELL, dtype=np.int8)
+    placed = []
+    for _ in range(300):
+        # Random marks placed and removed in any order
+        if placed and (rng.random() < 0.3 or len(placed) == board.size):
+            cell = placed.pop(rng.randrange(len(placed)))
+            state.remove(cell)
+            board[cell] = EMPTY_CELL
+        else:
+            cell = rng.choice(np.flatnonzero(board == EMPTY_CELL).tolist())
+            player = rng.randrange(2)
+            state.place(cell, player)
+            board[cell] = player
+            placed.append(cell)
+
+        gameboard = board.reshape(board_length, board_length)
+        empty = sum(1 << int(cell) for cell in np.flatnonzero(board == EMPTY_CELL))
+        for playerId, opponentId in PLAYERS:
+            player = int(playerId)
+            assert state.heuristic_points(player) \
+                == heuristic_points_calcul(playerId, opponentId, gameboard, board_length, pattern_victory_length), gameboard
+            bits = sum(1 << int(cell) for cell in np.flatnonzero(board == player))
+            cells = winning_cells(bits, lines)
+            if cells != lines.full_mask:  # No complete window yet
+                assert state.winning_cells(player) == cells & empty, gameboard
@@ -0,0 +1,63 @@
+import time
+
+from stable_baselines3.common.callbacks import BaseCallback
+from stable_baselines3.common.vec_env import SubprocVecEnv
+
+from utils.instrumentation import get_instrumentation
+
+
+class InstrumentationCallback(BaseCallback):
+    """
+    Split agent.learn between rollout collection and PPO updates, and report the
+    measures of utils/instrumentation.py to the SB3 logger.
+
+    The timers of SubprocVecEnv workers (env steps, heuristic rewards, opponent
+    moves) are gathered into this process at the end of each rollout. Timers are
+    logged as cumulative seconds under "instrumentation/<name>_s" and counters under
+    "instrumentation/<name>".
+    """
+
+    def __init__(self, verbose=0):
+        super().__init__(verbose)
+        self.instrumentation = get_instrumentation()
+        self.training_start = None
+        self.rollout_start = None
+        self.update_start = None
+
+    def _on_training_start(self):
+        self.training_start = time.perf_counter_ns()
+
+    def _on_rollout_start(self):
+        self.rollout_start = time.perf_counter_ns()
+        if self.update_start is not None:
+            self.instrumentation.add_time("ppo.update", self.rollout_start - self.update_start)
+            self.update_start = None
+
+    def _on_step(self):
+        return True
+
+    def _on_rollout_end(self):
+        self.update_start = time.perf_counter_ns()
+        self.instrumentation.add_time("ppo.rollout", self.update_start - self.rollout_start)
+        self.collect_workers()
+        self.record()
+
+    def _on_training_end(self):
+        end = time.perf_counter_ns()
+        if self.update_start is not None:
+            self.instrumentation.add_time("ppo.update", end - self.update_start)
+            self.update_start = None
+        self.instrumentation.add_time("ppo.learn", end - self.training_start)
+        self.record()
+
+    def collect_workers(self):
+        """Merge the measures of the worker processes (their env runs in another process)."""
+        if isinstance(self.training_env, SubprocVecEnv):
+            for snapshot in self.training_env.env_method("instrumentation_snapshot", True):
+                self.instrumentation.merge(snapshot)
+
+    def record(self):
+        for name, (calls, total_ns) in self.instrumentation.timers.items():
+            self.logger.record(f"instrumentation/{name}_s", total_ns / 1e9)
+        for name, count in self.instrumentation.counters.items():
+            self.logger.record(f"instrumentation/{name}", count)
@@ -11,6 +11,8 @@ TRAINING_DEFAULT_PATTERN_VICTORY_LENGTH = 4
 TRAINING_DEFAULT_BOARD_LENGTH = 5
 TRAINING_DEFAULT_FIRST_PLAY_RATE = 0.3
 TRAINING_DEFAULT_REVIEW_RATIO = 0.1
+# Rollout worker processes (1 = single in-process environment)
+TRAINING_N_WORKERS = 1
 
 
 # ==============================
@@ -36,7 +38,13 @@ os.makedirs(AGENTS_DIR, exist_ok=True)
 # Path to statistics file
 BEST_STATS_PATH = os.path.join(AGENTS_DIR, "opponent_stats.json")
 ALL_STATS_PATH = os.path.join(AGENTS_DIR, "opponent_all_stats.json")
-DEFEAT_PATH = os.path.join(AGENTS_DIR, "defeated_games.json")
+# Binary replay store of lost games (see utils/replay_store.py)
+DEFEAT_PATH = os.path.join(AGENTS_DIR, "defeated_games.bin")
+# Per-segment timing summaries (written when MORPION_INSTRUMENTATION=1, see utils/instrumentation.py)
+INSTRUMENTATION_PATH = os.path.join(AGENTS_DIR, "instrumentation.json")
+# Training segment run under cProfile (None: no profiling) and its profile file
+PROFILE_SEGMENT = None
+PROFILE_PATH = os.path.join(AGENTS_DIR, "segment.prof")
 
 
 # ==============================
@@ -55,6 +63,9 @@ START_ENT_COEF = 0.02  # Initial entropy coefficient
 CHECKPOINT_INTERVAL = 10000  # Number of steps between checkpoints
 IMPROVEMENT_THRESHOLD = 0.03  # Threshold to consider an improvement
 TOTAL_STEPS = 20000  # Total training steps
+EVALUATION_BATCH_SIZE = 256  # Games played simultaneously by the evaluator
+EVALUATION_CI_HALF_WIDTH = 0.01  # Stop evaluating once the 95% CI of the defeat rate is within +/- 1%
+EVALUATION_MIN_EPISODES = 200  # Minimum episodes per opponent before early stopping
 
 # Learning rate schedule (exponential decay)
 LR_SCHEDULE = exp_decay(3e-4, 1e-5)
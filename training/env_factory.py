@@ -0,0 +1,108 @@
+import os
+
+import torch as th
+from sb3_contrib.common.wrappers import ActionMasker
+from stable_baselines3.common.monitor import Monitor
+from stable_baselines3.common.utils import set_random_seed
+from stable_baselines3.common.vec_env import SubprocVecEnv, DummyVecEnv
+
+from agents import InferenceServer
+from configs.config import INFERENCE_MAX_BATCH_WAIT
+from envs import TicTacToeTrainingEnv, SymmetryAugmentation
+from utils.action_mask_ import mask_fn
+from training.config import (
+    TRAINING_DEFAULT_BOARD_LENGTH,
+    TRAINING_DEFAULT_PATTERN_VICTORY_LENGTH,
+    TRAINING_DEFAULT_FIRST_PLAY_RATE,
+    TRAINING_DEFAULT_REVIEW_RATIO,
+    DEFEAT_PATH,
+    BEST_STATS_PATH,
+)
+
+
+def make_training_env(opponent_pool, rank=0, seed=0, augment_symmetries=False, **env_kwargs):
+    """
+    Return a function building one masked TicTacToeTrainingEnv worker.
+
+    The environment (and every PPO checkpoint of its opponent pool) is created
+    inside the worker process when the function is called, so nothing heavy has to be
+    pickled across the process boundary. Each worker seeds `random`, NumPy and torch
+    with seed + rank, otherwise forked workers would replay the same games.
+    With augment_symmetries, each episode is shown to the agent under a random
+    rotation / reflection of the board (SymmetryAugmentation).
+
+    Parameters:
+    - opponent_pool (list[str]): list of opponent types or agent paths
+    - rank (int): index of the worker
+    - seed (int): base seed
+    - augment_symmetries (bool): wrap the env in SymmetryAugmentation
+    - env_kwargs: extra TicTacToeTrainingEnv arguments (override the training defaults)
+    """
+    kwargs = dict(
+        board_length=TRAINING_DEFAULT_BOARD_LENGTH,
+        pattern_victory_length=TRAINING_DEFAULT_PATTERN_VICTORY_LENGTH,
+        first_play_rate=TRAINING_DEFAULT_FIRST_PLAY_RATE,
+        lost_games_path=DEFEAT_PATH,
+        review_ratio=TRAINING_DEFAULT_REVIEW_RATIO,
+        opponent_statistics_file=BEST_STATS_PATH,
+    )
+    kwargs.update(env_kwargs)
+
+    def _init():
+        set_random_seed(seed + rank)
+        # One worker per core: avoid torch oversubscribing the CPU for opponent inference
+        th.set_num_threads(1)
+        env = TicTacToeTrainingEnv(opponent_pool=opponent_pool, **kwargs)
+        if augment_symmetries:
+            env = SymmetryAugmentation(env)
+        # mask_fn reads valid_actions() on the wrapped env, so the Monitor goes outside
+        return Monitor(ActionMasker(env, mask_fn))
+
+    return _init
+
+
+def create_subproc_env(opponent_pool,
+                       n_workers=None,
+                       seed=0,
+                       start_method=None,
+                       batched_opponents=False,
+                       max_batch_wait=INFERENCE_MAX_BATCH_WAIT,
+                       **env_kwargs):
+    """
+    Build a SubprocVecEnv of n_workers TicTacToeTrainingEnv processes for MaskablePPO.
+
+    ActionMasker.action_masks is reached through SubprocVecEnv.env_method, so the
+    masks cross the process boundary. With n_workers == 1 a DummyVecEnv is returned
+    instead (no process to spawn).
+
+    With batched_opponents, the PPO opponents of the pool are loaded once in this
+    process by an InferenceServer (available as env.inference_server) and every
+    worker sends its opponent observations to it, so that the moves requested by
+    all workers during a tick are computed with one forward pass per checkpoint.
+
+    Parameters:
+    - opponent_pool (list[str]): list of opponent types or agent paths
+    - n_workers (int): number of worker processes (defaults to the number of cores)
+    - seed (int): base seed, worker k uses seed + k
+    - start_method (str): multiprocessing start method ('fork', 'forkserver', 'spawn')
+    - batched_opponents (bool): evaluate PPO opponents in the main process with an InferenceServer
+    - max_batch_wait (float): seconds the server waits to fill a batch
+    - env_kwargs: extra TicTacToeTrainingEnv arguments
+    """
+    n_workers = n_workers or os.cpu_count() or 1
+    if n_workers == 1:
+        return DummyVecEnv([make_training_env(opponent_pool, 0, seed, **env_kwargs)])
+
+    server = None
+    agent_paths = [opponent for opponent in opponent_pool if opponent.endswith(".zip") and os.path.exists(opponent)]
+    if batched_opponents and agent_paths:
+        server = InferenceServer(agent_paths, max_batch_wait=max_batch_wait).start()
+
+    env_fns = [
+        make_training_env(opponent_pool, rank, seed, inference_client=server.client() if server else None, **env_kwargs)
+        for rank in range(n_workers)
+    ]
+    env = SubprocVecEnv(env_fns, start_method=start_method)
+    if server is not None:
+        env.inference_server = server
+    return env
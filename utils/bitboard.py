@@ -0,0 +1,216 @@
+from functools import lru_cache
+
+import numpy as np
+
+from configs.config import EMPTY_CELL
+from utils.tactics import first_winning_move, winning_cells
+
+
+class WinningLines:
+    """
+    Precomputed winning-line masks for one (board_length, pattern_victory_length) configuration.
+
+    Cell (line, column) is mapped to bit number line * board_length + column, which is
+    also the action index used by the environments.
+
+    Attributes:
+    - all_lines (tuple[int]): one mask per window of pattern_victory_length aligned cells
+      (rows, columns, descending and ascending diagonals)
+    - lines_through_cell (tuple[tuple[int]]): for every cell, the masks of the windows containing it
+    - cell_bits (tuple[int]): 1 << action for every action
+    - full_mask (int): mask with every cell of the board set
+    """
+
+    def __init__(self, board_length, pattern_victory_length):
+        self.board_length = board_length
+        self.pattern_victory_length = pattern_victory_length
+        self.n_cells = board_length * board_length
+        self.n_bytes = (self.n_cells + 7) // 8
+        self.cell_bits = tuple(1 << action for action in range(self.n_cells))
+        self.full_mask = (1 << self.n_cells) - 1
+
+        lines = []
+        through_cell = [[] for _ in range(self.n_cells)]
+        # Directions: row, column, descending diagonal, ascending diagonal
+        for dx, dy in ((0, 1), (1, 0), (1, 1), (1, -1)):
+            for x in range(board_length):
+                for y in range(board_length):
+                    end_x = x + dx * (pattern_victory_length - 1)
+                    end_y = y + dy * (pattern_victory_length - 1)
+                    if not (0 <= end_x < board_length and 0 <= end_y < board_length):
+                        continue
+                    cells = [(x + dx * k) * board_length + (y + dy * k) for k in range(pattern_victory_length)]
+                    mask = 0
+                    for cell in cells:
+                        mask |= 1 << cell
+                    lines.append(mask)
+                    for cell in cells:
+                        through_cell[cell].append(mask)
+
+        self.all_lines = tuple(lines)
+        self.lines_through_cell = tuple(tuple(cell_lines) for cell_lines in through_cell)
+
+
+@lru_cache(maxsize=None)
+def get_winning_lines(board_length, pattern_victory_length):
+    """Return the (cached) WinningLines tables for a board configuration."""
+    return WinningLines(board_length, pattern_victory_length)
+
+
+def bits_to_mask(bits, lines):
+    """
+    Convert an integer bitboard into a flat np.int8 array (1 where the bit is set).
+
+    Args:
+        bits (int): Bitboard to convert.
+        lines (WinningLines): Tables of the board configuration.
+
+    Returns:
+        np.ndarray: Array of shape (board_length * board_length,).
+    """
+    raw = np.frombuffer(bits.to_bytes(lines.n_bytes, "little"), dtype=np.uint8)
+    return np.unpackbits(raw, bitorder="little")[:lines.n_cells].view(np.int8)
+
+
+def has_win(bits, lines):
+    """Return True if the bitboard fully covers at least one winning line."""
+    for line in lines.all_lines:
+        if bits & line == line:
+            return True
+    return False
+
+
+def wins_through(bits, action, lines):
+    """Return True if the bitboard fully covers a winning line passing through the action's cell."""
+    for line in lines.lines_through_cell[action]:
+        if bits & line == line:
+            return True
+    return False
+
+
+class BitBoard:
+    """
+    Compact game state: one integer bitboard per player.
+
+    Shared by the environments, the heuristics and the agents to make move
+    validation, win detection and full-board checks cheap bit operations.
+    """
+
+    def __init__(self, board_length, pattern_victory_length):
+        """
+        Initialize an empty board.
+
+        Parameters:
+        - board_length (int): Size of the board (NxN).
+        - pattern_victory_length (int): Number of consecutive marks needed to win.
+        """
+        self.board_length = board_length
+        self.pattern_victory_length = pattern_victory_length
+        self.lines = get_winning_lines(board_length, pattern_victory_length)
+        self.players = [0, 0]
+
+    @classmethod
+    def from_gameboard(cls, gameboard, pattern_victory_length):
+        """
+        Build a BitBoard from an NxN gameboard filled with 0, 1 and EMPTY_CELL.
+
+        Parameters:
+        - gameboard (np.ndarray): The game board.
+        - pattern_victory_length (int): Number of consecutive marks needed to win.
+        """
+        gameboard = np.asarray(gameboard)
+        bitboard = cls(gameboard.shape[0], pattern_victory_length)
+        flat = gameboard.ravel()
+        for player in (0, 1):
+            packed = np.packbits(flat == player, bitorder="little")
+            bitboard.players[player] = int.from_bytes(packed.tobytes(), "little")
+        return bitboard
+
+    def reset(self):
+        """Empty the board."""
+        self.players = [0, 0]
+
+    def copy(self):
+        """Return an independent copy of the board."""
+        clone = BitBoard.__new__(BitBoard)
+        clone.board_length = self.board_length
+        clone.pattern_victory_length = self.pattern_victory_length
+        clone.lines = self.lines
+        clone.players = self.players.copy()
+        return clone
+
+    # ---------- Queries ----------
+    @property
+    def occupied(self):
+        """Bitboard of all non-empty cells."""
+        return self.players[0] | self.players[1]
+
+    @property
+    def empty(self):
+        """Bitboard of all empty cells."""
+        return self.lines.full_mask & ~(self.players[0] | self.players[1])
+
+    def is_empty(self, action):
+        """Return True if the cell of the action is empty."""
+        return not (self.players[0] | self.players[1]) >> int(action) & 1
+
+    def is_full(self):
+        """Return True if no empty cell remains."""
+        return (self.players[0] | self.players[1]) == self.lines.full_mask
+
+    def valid_actions(self):
+        """Return the binary np.int8 mask of empty cells (same layout as TicTacToeBaseEnv.valid_actions)."""
+        return bits_to_mask(self.empty, self.lines)
+
+    def valid_moves(self):
+        """Return the list of empty cell indices, in increasing order."""
+        empty = self.empty
+        moves = []
+        while empty:
+            low_bit = empty & -empty
+            moves.append(low_bit.bit_length() - 1)
+            empty ^= low_bit
+        return moves
+
+    def wins_at(self, action, player):
+        """Return True if the player's marks complete a winning line through the action's cell."""
+        return wins_through(self.players[int(player)], int(action), self.lines)
+
+    def has_win(self, player):
+        """Return True if the player owns a full winning line anywhere on the board."""
+        return has_win(self.players[int(player)], self.lines)
+
+    def winning_move(self, player, moves):
+        """
+        Return the first move that would give the player a winning line, or None.
+
+        Same semantics as utils.heuristics.is_winning_move: the mark is placed on the
+        move's cell whatever it contains, and any winning line on the resulting board counts.
+
+        Parameters:
+        - player (int or str): Player to test (0 or 1).
+        - moves (iterable[int]): Candidate cell indices.
+        """
+        return first_winning_move(self.players[int(player)], self.lines, moves)
+
+    def winning_cells(self, player):
+        """Bitmask of the cells where a mark of the player completes a winning line (see utils.tactics.winning_cells)."""
+        return winning_cells(self.players[int(player)], self.lines)
+
+    # ---------- Updates ----------
+    def place(self, action, player):
+        """Put the player's mark on the action's cell (the cell must be empty)."""
+        self.players[int(player)] |= self.lines.cell_bits[int(action)]
+
+    def remove(self, action):
+        """Clear the action's cell."""
+        keep = ~self.lines.cell_bits[int(action)]
+        self.players[0] &= keep
+        self.players[1] &= keep
+
+    def to_gameboard(self):
+        """Return the equivalent NxN np.int8 gameboard."""
+        board = np.full(self.lines.n_cells, EMPTY_CELL, dtype=np.int8)
+        for player in (0, 1):
+            board[bits_to_mask(self.players[player], self.lines).astype(bool)] = player
+        return board.reshape(self.board_length, self.board_length)
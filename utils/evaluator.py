@@ -1,133 +1,348 @@
-import json
-from collections import deque
-from envs import TicTacToeTrainingEnv
-from utils.action_mask_ import mask_fn
+import math
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from configs.config import EMPTY_CELL
+from envs.vec_env import TicTacToeVecEnv
+from utils.replay_store import get_replay_store
+from utils.instrumentation import timed
 from training.config import *
 
 
-def evaluate_agent_by_opponent(agent, opponent_pool, n_episodes=1000):
+# -------------------------------
+# Confidence intervals
+# -------------------------------
+def wilson_interval(k, n, z=1.96):
     """
-    Evaluate a given agent against a pool of opponents.
+    Wilson score interval of a binomial proportion.
+
+    Args:
+        k: Number of successes (e.g. defeats).
+        n: Number of trials.
+        z: Normal quantile (1.96 for 95%).
+
+    Returns:
+        (lower, upper) bounds.
+    """
+    if n == 0:
+        return 0.0, 1.0
+    p = k / n
+    denominator = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / denominator
+    half_width = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denominator
+    return max(0.0, center - half_width), min(1.0, center + half_width)
+
 
-    Lost games are stored in a JSON file, keeping a maximum of 20 games.
-    Each run deletes previous defeats and only stores the new ones.
+def _binomial_cdf(k, n, p):
+    """P(X <= k) for X ~ Binomial(n, p), summed in log space."""
+    if p <= 0.0:
+        return 1.0
+    if p >= 1.0:
+        return 1.0 if k >= n else 0.0
+    log_p, log_q = math.log(p), math.log1p(-p)
+    return min(1.0, sum(
+        math.exp(math.lgamma(n + 1) - math.lgamma(i + 1) - math.lgamma(n - i + 1) + i * log_p + (n - i) * log_q)
+        for i in range(k + 1)
+    ))
+
+
+def clopper_pearson_interval(k, n, alpha=0.05):
+    """
+    Exact (Clopper-Pearson) interval of a binomial proportion, found by bisection
+    on the binomial CDF.
 
     Args:
-        agent: The RL agent to evaluate.
-        opponent_pool: List of opponents (strings or PPO agent paths).
-        n_episodes: Number of episodes per opponent (default: 1000).
+        k: Number of successes (e.g. defeats).
+        n: Number of trials.
+        alpha: 1 - confidence level.
 
     Returns:
-        Dictionary with results per opponent including wins, losses, draws, and defeat/victory rates.
+        (lower, upper) bounds.
     """
+    if n == 0:
+        return 0.0, 1.0
 
-    # Keep track of defeated games (max 20)
-    MAX_SAVED_DEFEATS = 5
-    registered = 0
-    defeated_games = deque(maxlen=MAX_SAVED_DEFEATS)
+    def bisect(predicate):
+        low, high = 0.0, 1.0
+        for _ in range(50):
+            middle = (low + high) / 2
+            if predicate(middle):
+                high = middle
+            else:
+                low = middle
+        return (low + high) / 2
 
-    results = {}
+    lower = 0.0 if k == 0 else bisect(lambda p: 1 - _binomial_cdf(k - 1, n, p) >= alpha / 2)
+    upper = 1.0 if k == n else bisect(lambda p: _binomial_cdf(k, n, p) <= alpha / 2)
+    return lower, upper
 
-    for opponent in opponent_pool:
-        # Create two environments: agent plays first and agent plays second
-        env_first = TicTacToeTrainingEnv(
-            opponent_pool=[opponent],
-            board_length=TRAINING_DEFAULT_BOARD_LENGTH,
-            pattern_victory_length=TRAINING_DEFAULT_PATTERN_VICTORY_LENGTH,
-            evaluation=True,
-            first_play_rate=0.0,
-            lost_games_path=DEFEAT_PATH,
-            review_ratio=0.0,
-            opponent_statistics_file=BEST_STATS_PATH,
-        )
 
-        env_second = TicTacToeTrainingEnv(
-            opponent_pool=[opponent],
+CONFIDENCE_INTERVALS = {
+    "wilson": wilson_interval,
+    "clopper_pearson": lambda k, n: clopper_pearson_interval(k, n),
+}
+
+
+# -------------------------------
+# Batched games
+# -------------------------------
+def _model_observation(agent, observations):
+    """Keep only the observation keys the agent was trained with."""
+    keys = agent.observation_space.spaces
+    return {key: value for key, value in observations.items() if key in keys}
+
+
+def play_batch_games(agent, env):
+    """
+    Play the first game of every board of a TicTacToeVecEnv, with one
+    agent.predict call on the stacked observations per move.
+
+    Args:
+        agent: The RL agent (MaskablePPO).
+        env: TicTacToeVecEnv (boards reset automatically, later games are ignored).
+
+    Returns:
+        List of (outcome, first_to_play, opponent_moves, agent_moves) per board,
+        outcome being 1 (win), -1 (defeat) or 0 (draw).
+    """
+    observations = env.reset()
+    n_boards = env.num_envs
+    first_to_play = env.first_to_play.copy()
+    opponent_moves = [np.flatnonzero(env.boards[i] != EMPTY_CELL).tolist() for i in range(n_boards)]
+    agent_moves = [[] for _ in range(n_boards)]
+    outcomes = np.zeros(n_boards, dtype=np.int64)
+    finished = np.zeros(n_boards, dtype=bool)
+
+    while not finished.all():
+        actions, _ = agent.predict(_model_observation(agent, observations), deterministic=True, action_masks=env.action_masks())
+        before = env.boards.copy()
+        observations, rewards, dones, infos = env.step(actions)
+
+        for i in np.flatnonzero(~finished):
+            action = int(actions[i])
+            after = infos[i]["terminal_observation"]["observation"].ravel() if dones[i] else env.boards[i]
+            agent_moves[i].append(action)
+            # The other cell that changed is the opponent's answer
+            opponent_moves[i].extend(cell for cell in np.flatnonzero(after != before[i]).tolist() if cell != action)
+            if dones[i]:
+                finished[i] = True
+                outcomes[i] = np.sign(rewards[i])
+
+    return [(int(outcomes[i]), bool(first_to_play[i]), opponent_moves[i], agent_moves[i]) for i in range(n_boards)]
+
+
+def evaluate_against_opponent(agent, opponent, n_episodes=1000, batch_size=EVALUATION_BATCH_SIZE,
+                              ci_half_width=EVALUATION_CI_HALF_WIDTH, min_episodes=EVALUATION_MIN_EPISODES,
+                              ci_method="wilson", seed=None):
+    """
+    Evaluate an agent against a single opponent, half of the games playing second.
+
+    Games are played by batches of batch_size boards (half on each side). Once
+    min_episodes games have been played, evaluation stops as soon as the confidence
+    interval of the defeat rate is narrower than +/- ci_half_width.
+
+    Args:
+        agent: The RL agent (MaskablePPO).
+        opponent: Opponent name or PPO agent path.
+        n_episodes: Maximum number of episodes.
+        batch_size: Number of games played simultaneously.
+        ci_half_width: Target half width of the defeat rate interval (None disables early stopping).
+        min_episodes: Minimum number of episodes before early stopping.
+        ci_method: "wilson" or "clopper_pearson".
+        seed: Seed of the opponents' random moves.
+
+    Returns:
+        (results, lost_games): results with the evaluate_agent_by_opponent schema and
+        the lost games as (player, opponent_moves, agent_moves).
+    """
+    interval = CONFIDENCE_INTERVALS[ci_method]
+
+    # Fewer episodes for deterministic opponents
+    if opponent not in ["random", "smart_random"]:
+        n_episodes = 2
+
+    # Agent plays second in the first half of the episodes, first in the second half
+    remaining = {False: n_episodes // 2, True: n_episodes - n_episodes // 2}
+    per_side = max(1, min(batch_size // 2, max(remaining.values())))
+    envs = {
+        first: TicTacToeVecEnv(
+            per_side,
             board_length=TRAINING_DEFAULT_BOARD_LENGTH,
             pattern_victory_length=TRAINING_DEFAULT_PATTERN_VICTORY_LENGTH,
-            evaluation=True,
-            first_play_rate=1.0,
-            lost_games_path=DEFEAT_PATH,
-            review_ratio=0.0,
-            opponent_statistics_file=BEST_STATS_PATH,
+            opponent_pool=[opponent],
+            first_play_rate=1.0 if first else 0.0,
+            active_heuristic=False,
+            seed=None if seed is None else seed + int(first),
         )
+        for first in (False, True)
+    }
 
-        # Initialize counters
-        wins_first = losses_first = draws_first = 0
-        wins_second = losses_second = draws_second = 0
-
-        # Fewer episodes for deterministic opponents
-        episodes_for_current = n_episodes
-        if opponent not in ["random", "smart_random"]:
-            episodes_for_current = 2
-
-        # Run episodes
-        for i in range(episodes_for_current):
-            env = env_first if i < episodes_for_current // 2 else env_second
-            obs, _ = env.reset()
-            done = False
-
-            # Play one episode
-            while not done:
-                action, _ = agent.predict(obs, deterministic=True, action_masks=mask_fn(env))
-                obs, reward, terminated, truncated, _ = env.step(action)
-                done = terminated or truncated
-
-            # Record a lost game
-            if reward == -env.victory_reward:
-                registered += 1
-                if registered < 5:
-                    defeated_games.append({
-                        f"game_lost_{len(defeated_games)+1}": {
-                            "player": env.player,
-                            "opponent": opponent,
-                            "opponent_moves": [int(move) for move in env.opponent_blows],
-                            "agent_moves": [int(move) for move in env.agent_blows]
-                        }
-                    })
-
-                if env.first_to_play:
-                    losses_first += 1
-                else:
-                    losses_second += 1
-
-            # Record wins and draws
-            elif reward > 0:
-                if env.first_to_play:
-                    wins_first += 1
-                else:
-                    wins_second += 1
-            else:
-                if env.first_to_play:
-                    draws_first += 1
-                else:
-                    draws_second += 1
+    counts = {(first, outcome): 0 for first in (False, True) for outcome in (-1, 0, 1)}
+    lost_games = []
+    played = 0
+    while remaining[False] + remaining[True] > 0:
+        for first in (False, True):
+            n_games = min(per_side, remaining[first])
+            if n_games == 0:
+                continue
+            for outcome, _, opponent_moves, agent_moves in play_batch_games(agent, envs[first])[:n_games]:
+                counts[first, outcome] += 1
+                if outcome == -1:
+                    lost_games.append((0 if first else 1, opponent_moves, agent_moves))
+            remaining[first] -= n_games
+            played += n_games
 
-        # Save results per opponent
-        results[opponent] = {
-            "wins_play_first": wins_first,
-            "wins_play_second": wins_second,
-            "losses_play_first": losses_first,
-            "losses_play_second": losses_second,
-            "draws_play_first": draws_first,
-            "draws_play_second": draws_second,
-            "defeat_rate": (losses_first + losses_second) / episodes_for_current,
-            "victory_rate": (wins_first + wins_second) / episodes_for_current
-        }
+        if ci_half_width is not None and played >= min_episodes:
+            losses = counts[False, -1] + counts[True, -1]
+            lower, upper = interval(losses, played)
+            if (upper - lower) / 2 <= ci_half_width:
+                break
+
+    results = {
+        "wins_play_first": counts[True, 1],
+        "wins_play_second": counts[False, 1],
+        "losses_play_first": counts[True, -1],
+        "losses_play_second": counts[False, -1],
+        "draws_play_first": counts[True, 0],
+        "draws_play_second": counts[False, 0],
+        "defeat_rate": (counts[True, -1] + counts[False, -1]) / played,
+        "victory_rate": (counts[True, 1] + counts[False, 1]) / played
+    }
+    return results, lost_games
+
+
+def _evaluate_job(agent_path, opponent, kwargs):
+    """Process pool job: load the agent and evaluate it against one opponent."""
+    import torch as th
+    from agents import get_model_registry
+
+    th.set_num_threads(1)
+    # Pool workers run several jobs: the agent is loaded once per worker
+    return evaluate_against_opponent(get_model_registry().get(agent_path), opponent, **kwargs)
+
+
+@timed("evaluate_agent_by_opponent")
+def evaluate_agent_by_opponent(agent, opponent_pool, n_episodes=1000, n_jobs=1, **kwargs):
+    """
+    Evaluate a given agent against a pool of opponents.
+
+    Games are played by batches (see evaluate_against_opponent), stopping early once
+    the 95% confidence interval of the defeat rate is tight enough. With n_jobs > 1
+    the opponents are spread over a process pool (the agent is saved to a temporary
+    file and loaded by each worker).
+
+    Lost games are appended to the binary replay store at DEFEAT_PATH
+    (deduplicated, the store keeps its most recent games).
+
+    Args:
+        agent: The RL agent to evaluate.
+        opponent_pool: List of opponents (strings or PPO agent paths).
+        n_episodes: Maximum number of episodes per opponent (default: 1000).
+        n_jobs: Number of worker processes.
+        **kwargs: batch_size, ci_half_width, min_episodes, ci_method, seed (see evaluate_against_opponent).
+
+    Returns:
+        Dictionary with results per opponent including wins, losses, draws, and defeat/victory rates.
+    """
+    kwargs["n_episodes"] = n_episodes
+    n_jobs = min(n_jobs, len(opponent_pool))
+
+    if n_jobs > 1:
+        with tempfile.TemporaryDirectory() as directory:
+            agent_path = os.path.join(directory, "evaluated_agent.zip")
+            agent.save(agent_path)
+            with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+                futures = [executor.submit(_evaluate_job, agent_path, opponent, kwargs) for opponent in opponent_pool]
+                outputs = [future.result() for future in futures]
+    else:
+        outputs = [evaluate_against_opponent(agent, opponent, **kwargs) for opponent in opponent_pool]
 
-        stats = results[opponent]
+    results = {}
+    defeated_games = []
+    for opponent, (stats, lost_games) in zip(opponent_pool, outputs):
+        results[opponent] = stats
+        defeated_games.extend(lost_games)
+
+        episodes = sum(stats[key] for key in stats if key.startswith(("wins", "losses", "draws")))
+        losses = stats["losses_play_first"] + stats["losses_play_second"]
+        lower, upper = wilson_interval(losses, episodes)
         print(f"Opponent: {opponent}")
-        print(f"Defeat rate: {stats['defeat_rate']:.2%}")
+        print(f"Defeat rate: {stats['defeat_rate']:.2%} (95% CI [{lower:.2%}, {upper:.2%}], {episodes} episodes)")
         print(f"Losses (play first): {stats['losses_play_first']}")
         print(f"Losses (play second): {stats['losses_play_second']}")
 
     # -------------------------------
-    # Save up to 20 new defeated games
+    # Append the new defeated games
     # -------------------------------
-    import os
-    os.makedirs(os.path.dirname(DEFEAT_PATH), exist_ok=True)
+    get_replay_store(DEFEAT_PATH, TRAINING_DEFAULT_BOARD_LENGTH).append(defeated_games)
+
+    return results
+
+
+def evaluate_regret(agent, opponent_pool, n_episodes=200, batch_size=EVALUATION_BATCH_SIZE, seed=None):
+    """
+    Measure how far the agent's moves are from perfect play (exact solver,
+    utils/solver.py), against a pool of opponents. Only practical on boards the
+    solver handles (3x3, 4x4 with a 3-in-a-row victory).
+
+    The regret of a move is the game outcome it gives away: 0 for an optimal move,
+    1 for win -> draw or draw -> loss, 2 for win -> loss.
 
-    with open(DEFEAT_PATH, "w") as f:
-        json.dump({k: v for d in defeated_games for k, v in d.items()}, f, indent=4)
+    Args:
+        agent: The RL agent (MaskablePPO).
+        opponent_pool: List of opponents (strings or PPO agent paths).
+        n_episodes: Number of episodes per opponent, half of them playing second.
+        batch_size: Number of games played simultaneously.
+        seed: Seed of the opponents' random moves.
+
+    Returns:
+        Dictionary per opponent with the mean regret per move, the rate of
+        suboptimal moves and the number of moves evaluated.
+    """
+    from utils.solver import get_solution_table
 
+    table = get_solution_table(TRAINING_DEFAULT_BOARD_LENGTH, TRAINING_DEFAULT_PATTERN_VICTORY_LENGTH)
+    n_cells = TRAINING_DEFAULT_BOARD_LENGTH * TRAINING_DEFAULT_BOARD_LENGTH
+    results = {}
+
+    for opponent in opponent_pool:
+        regrets = []
+        for first in (False, True):
+            n_games = n_episodes // 2 if not first else n_episodes - n_episodes // 2
+            env = TicTacToeVecEnv(
+                max(1, min(batch_size, n_games)),
+                board_length=TRAINING_DEFAULT_BOARD_LENGTH,
+                pattern_victory_length=TRAINING_DEFAULT_PATTERN_VICTORY_LENGTH,
+                opponent_pool=[opponent],
+                first_play_rate=1.0 if first else 0.0,
+                active_heuristic=False,
+                seed=None if seed is None else seed + int(first),
+            )
+            while n_games > 0:
+                games = play_batch_games(agent, env)[:n_games]
+                n_games -= len(games)
+                for _, first_to_play, opponent_moves, agent_moves in games:
+                    # Replay the game, scoring every agent move
+                    board = np.full(n_cells, EMPTY_CELL, dtype=np.int8)
+                    agent_player = 0 if first_to_play else 1
+                    opponent_iter, agent_iter = iter(opponent_moves), iter(agent_moves)
+                    player = 0
+                    for _ in range(len(opponent_moves) + len(agent_moves)):
+                        if player == agent_player:
+                            action = next(agent_iter)
+                            regrets.append(table.regret(board, action, player))
+                        else:
+                            action = next(opponent_iter)
+                        board[action] = player
+                        player = 1 - player
+
+        regrets = np.array(regrets)
+        results[opponent] = {
+            "mean_regret": float(regrets.mean()) if len(regrets) else 0.0,
+            "suboptimal_move_rate": float((regrets > 0).mean()) if len(regrets) else 0.0,
+            "moves": int(len(regrets)),
+        }
     return results
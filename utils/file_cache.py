@@ -0,0 +1,146 @@
+import json
+import os
+import threading
+import time
+
+from configs.config import FILE_CACHE_CHECK_INTERVAL
+from utils.instrumentation import get_instrumentation
+
+
+class CachedFile:
+    """Parsed content of one file, with the stat signature it was loaded from."""
+
+    def __init__(self):
+        self.signature = None   # (mtime_ns, size) of the loaded file, None if missing
+        self.value = None
+        self.generation = 0     # incremented on every (re)load
+        self.checked_at = None  # time of the last modification check
+
+
+class FileStateCache:
+    """
+    Cache of parsed files, reloaded only when a file changes on disk.
+
+    Each entry remembers the (mtime, size) of the file it was parsed from. A lookup
+    stats the file at most once every check_interval seconds and parses it again
+    only if that signature changed. Every reload increments the entry's generation
+    number, so callers can recompute derived values (e.g. opponent probabilities)
+    only when the generation moves.
+
+    Hits, reloads and stat() calls are also counted as "file_cache.*" instrumentation
+    counters (utils/instrumentation.py), which are merged across the SubprocVecEnv
+    workers and logged by training.callbacks.InstrumentationCallback.
+    """
+
+    def __init__(self, check_interval=FILE_CACHE_CHECK_INTERVAL):
+        """
+        Parameters:
+        - check_interval (float): minimum seconds between two stat() calls per file (0 = every lookup)
+        """
+        self.check_interval = check_interval
+        self.entries = {}
+        self.lock = threading.Lock()
+
+        # Metrics
+        self.hits = 0
+        self.reloads = 0
+        self.stat_calls = 0
+        self.instrumentation = get_instrumentation()
+
+    def get(self, path, loader, default=None):
+        """
+        Return the parsed content of a file and its generation number.
+
+        Parameters:
+        - path (str): file path
+        - loader (callable): function parsing an open text file
+        - default: value returned while the file does not exist
+
+        Returns:
+        - tuple: (value, generation)
+        """
+        key = (os.path.abspath(path), loader)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                entry = self.entries[key] = CachedFile()
+
+            now = time.monotonic()
+            if entry.checked_at is not None and now - entry.checked_at < self.check_interval:
+                self.hit()
+                return entry.value if entry.signature else default, entry.generation
+
+            entry.checked_at = now
+            self.stat_calls += 1
+            self.instrumentation.count("file_cache.stat_calls")
+            try:
+                stat = os.stat(path)
+                signature = (stat.st_mtime_ns, stat.st_size)
+            except FileNotFoundError:
+                signature = None
+
+            if signature == entry.signature and entry.generation > 0:
+                self.hit()
+            elif signature is None:
+                self.reload()
+                entry.signature = None
+                entry.value = None
+                entry.generation += 1
+            else:
+                try:
+                    with open(path, "r") as f:
+                        value = loader(f)
+                except (ValueError, FileNotFoundError):
+                    # File being rewritten: keep the previous content and retry on the next check
+                    entry.checked_at = None
+                    self.hit()
+                else:
+                    self.reload()
+                    entry.signature = signature
+                    entry.value = value
+                    entry.generation += 1
+
+            return entry.value if entry.signature else default, entry.generation
+
+    def hit(self):
+        self.hits += 1
+        self.instrumentation.count("file_cache.hits")
+
+    def reload(self):
+        self.reloads += 1
+        self.instrumentation.count("file_cache.reloads")
+
+    def invalidate(self, path=None):
+        """Force the next lookup of a file (or of every file) to check it again."""
+        with self.lock:
+            for (entry_path, _), entry in self.entries.items():
+                if path is None or entry_path == os.path.abspath(path):
+                    entry.checked_at = None
+                    entry.signature = None
+
+    def stats(self):
+        """Return hit / reload counters."""
+        lookups = self.hits + self.reloads
+        return {
+            "hits": self.hits,
+            "reloads": self.reloads,
+            "stat_calls": self.stat_calls,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "files": len(self.entries),
+        }
+
+
+_file_cache = None
+
+
+def get_file_cache():
+    """Return the process-wide FileStateCache shared by every environment."""
+    global _file_cache
+    if _file_cache is None:
+        _file_cache = FileStateCache()
+    return _file_cache
+
+
+def load_json_file(f):
+    """Loader of FileStateCache.get for JSON files."""
+    return json.load(f)
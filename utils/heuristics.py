@@ -1,5 +1,9 @@
+from functools import lru_cache
+
 import numpy as np
-from configs.config import REWARD_CREATE_THREAT, REWARD_ALLOW_OPP_WIN
+from configs.config import REWARD_CREATE_THREAT, REWARD_ALLOW_OPP_WIN, EMPTY_CELL
+from utils.bitboard import BitBoard
+from utils.instrumentation import timed
 
 def win_on_line(number_line, pattern, board, pattern_length):
     """
@@ -111,6 +115,67 @@ def win_on_ascending_diagonal(length, x, y, pattern, board, pattern_length):
     return str(pattern) * pattern_length in diagonal
 
 
+# Directions checked from the last placed cell: row, column, descending and ascending diagonals
+WIN_DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+
+def count_in_direction(board, length, x, y, dx, dy, pattern):
+    """
+    Count consecutive cells holding a player's pattern, starting next to (x, y)
+    and walking in the direction (dx, dy). The cell (x, y) itself is not counted.
+
+    Args:
+        board (np.ndarray): The game board.
+        length (int): Board size (length x length).
+        x (int): Row index of the starting cell.
+        y (int): Column index of the starting cell.
+        dx (int): Row step of the direction.
+        dy (int): Column step of the direction.
+        pattern (int): Player pattern to count.
+
+    Returns:
+        int: Number of consecutive cells equal to the pattern.
+    """
+    count = 0
+    i, j = x + dx, y + dy
+    while 0 <= i < length and 0 <= j < length and board.item(i, j) == pattern:
+        count += 1
+        i += dx
+        j += dy
+    return count
+
+
+def win_from_move(length, x, y, pattern, board, pattern_length):
+    """
+    Check whether the mark placed on (x, y) completes a winning sequence.
+
+    Counts outward from the placed cell in the four directions only, without
+    building any string. Since the board had no winning sequence before the move,
+    this is equivalent to calling win_on_line, win_on_column,
+    win_on_descending_diagonal and win_on_ascending_diagonal on (x, y).
+
+    Args:
+        length (int): Board size (length x length).
+        x (int): Row index of the placed cell.
+        y (int): Column index of the placed cell.
+        pattern (int): Player pattern to check.
+        board (np.ndarray): The game board.
+        pattern_length (int): The required consecutive pattern length to win.
+
+    Returns:
+        bool: True if the move creates a winning sequence, else False.
+    """
+    pattern = int(pattern)
+    for dx, dy in WIN_DIRECTIONS:
+        aligned = 1 + count_in_direction(board, length, x, y, dx, dy, pattern)
+        if aligned >= pattern_length:
+            return True
+        aligned += count_in_direction(board, length, x, y, -dx, -dy, pattern)
+        if aligned >= pattern_length:
+            return True
+    return False
+
+
 def board_is_full(board):
     """
     Check if the board is completely filled (no empty cells).
@@ -121,8 +186,7 @@ def board_is_full(board):
     Returns:
         bool: True if the board has no empty cells, False otherwise.
     """
-    # EMPTY_CELL is 3, so ensure no cell equals 3
-    return all(all(int(cell) != 3 for cell in row) for row in board)
+    return not np.any(np.asarray(board) == EMPTY_CELL)
 
 
 
@@ -376,6 +440,42 @@ def pattern_(playerId, length, opponentId, pattern_victory_length):
     return filtered_permutations, wall_blocked, ["".join(threat) for threat in filtered_permutations_specials]
 
 
+class ThreatPatterns:
+    """
+    Precompiled semi-opened threat tables for one (playerId, threat_length, opponentId,
+    pattern_victory_length) configuration, built once from pattern_().
+
+    Patterns are stored in dictionaries grouped by length and mapped to their
+    multiplicity (pattern_ may return the same string twice, each occurrence counts),
+    so a segment is matched against every pattern in a single pass over its start positions.
+    """
+
+    def __init__(self, playerId, threat_length, opponentId, pattern_victory_length):
+        patterns, wall_blocked, dangerous_patterns = pattern_(playerId, threat_length, opponentId, pattern_victory_length)
+
+        self.semi_opened = self._group_by_length(patterns)
+        self.dangerous = self._group_by_length(dangerous_patterns)
+
+        # Wall-blocked patterns usable at the start / at the end of a segment, in pattern_ order
+        self.wall_blocked_left = tuple(pattern for pattern in wall_blocked if pattern[0] == playerId)
+        self.wall_blocked_right = tuple(pattern for pattern in wall_blocked if pattern[-1] == playerId)
+
+    @staticmethod
+    def _group_by_length(patterns):
+        """Return a tuple of (length, {pattern: multiplicity}) pairs."""
+        tables = {}
+        for pattern in patterns:
+            table = tables.setdefault(len(pattern), {})
+            table[pattern] = table.get(pattern, 0) + 1
+        return tuple(sorted(tables.items()))
+
+
+@lru_cache(maxsize=None)
+def get_threat_patterns(playerId, threat_length, opponentId, pattern_victory_length):
+    """Return the (cached) ThreatPatterns tables for a threat configuration."""
+    return ThreatPatterns(playerId, threat_length, opponentId, pattern_victory_length)
+
+
 def contains_all_semi_opened_threats(segment, threat_length, playerId, opponentId, pattern_victory_length):
     """
     Counts how many semi-opened threat patterns are contained in a given board segment (string).
@@ -390,44 +490,42 @@ def contains_all_semi_opened_threats(segment, threat_length, playerId, opponentI
     Returns:
         int: Total count of detected semi-opened threat patterns in the segment.
     """
-    # Generate all semi-opened threat patterns and wall-blocked patterns
-    patterns, wall_blocked, _ = pattern_(playerId, threat_length, opponentId, pattern_victory_length)
+    # Semi-opened threat patterns and wall-blocked patterns, compiled once per configuration
+    patterns = get_threat_patterns(playerId, threat_length, opponentId, pattern_victory_length)
 
     pattern_find_on_the_left = False
     pattern_find_on_the_right = False
 
     total_count = 0
+    segment_length = len(segment)
 
-    # Search for each pattern in the segment
-    for pattern in patterns:
-        start = 0
-        while True:
-            start = segment.find(pattern, start)
-            if start == -1:
-                break
-            total_count += 1
+    # Single pass over the segment: look up the window starting at each position
+    for length, table in patterns.semi_opened:
+        for start in range(segment_length - length + 1):
+            occurrences = table.get(segment[start:start + length])
+            if occurrences is None:
+                continue
+            total_count += occurrences
 
             # Check if pattern is at the start of the segment
             if start == 0:
                 pattern_find_on_the_left = True
             # Check if pattern is at the end of the segment
-            if start + len(pattern) == len(segment):
+            if start + length == segment_length:
                 pattern_find_on_the_right = True
 
-            start += 1  # Advance to avoid infinite loop
-
     # Additional checks for wall-blocked patterns if no pattern found at segment edges
     if not pattern_find_on_the_left:
-        for pattern in wall_blocked:
-            if pattern[0] == playerId and segment.startswith(pattern):
+        for pattern in patterns.wall_blocked_left:
+            if segment.startswith(pattern):
                 total_count += 1
-                if len(pattern) == len(segment):
+                if len(pattern) == segment_length:
                     return total_count
                 break
 
     if not pattern_find_on_the_right:
-        for pattern in wall_blocked:
-            if pattern[-1] == playerId and segment.endswith(pattern):
+        for pattern in patterns.wall_blocked_right:
+            if segment.endswith(pattern):
                 total_count += 1
                 break
 
@@ -448,20 +546,15 @@ def contains_dangerous_semi_opened_threats(segment, threat_length, playerId, opp
     Returns:
         int: Total count of dangerous semi-opened threats found in the segment.
     """
-    # Retrieve only the dangerous semi-opened threat patterns from pattern_ function
-    _, _, dangerous_pattern = pattern_(playerId, threat_length, opponentId, pattern_victory_length)
+    # Dangerous semi-opened threat patterns, compiled once per configuration
+    patterns = get_threat_patterns(playerId, threat_length, opponentId, pattern_victory_length)
 
     total_count = 0
 
-    # Search for each dangerous pattern within the segment string
-    for pattern in dangerous_pattern:
-        start = 0
-        while True:
-            start = segment.find(pattern, start)
-            if start == -1:
-                break
-            total_count += 1
-            start += 1  # Advance index to avoid infinite loops
+    # Single pass over the segment: look up the window starting at each position
+    for length, table in patterns.dangerous:
+        for start in range(len(segment) - length + 1):
+            total_count += table.get(segment[start:start + length], 0)
 
     return total_count
 
@@ -725,12 +818,14 @@ def is_winning_move(playerId, board, size, pattern_victory_length, authorized_mo
     """
     Iterates over authorized moves to check if any move leads to an immediate win.
     Returns the winning move if found, else None.
+
+    The board can be given as a np.ndarray or as a BitBoard; the winning cells are
+    found in a single pass over the winning windows (utils/tactics.py) instead of
+    copying the board for each move.
     """
-    for move in authorized_moves:
-        result = won_in_next_move(playerId, board.copy(), size, pattern_victory_length, move)
-        if result is not None:
-            return result
-    return None
+    if not isinstance(board, BitBoard):
+        board = BitBoard.from_gameboard(board, pattern_victory_length)
+    return board.winning_move(playerId, authorized_moves)
 
 
 # -------------------------------------- HEURISTIC -----------------------------------------
@@ -768,6 +863,49 @@ def heuristic_points_calcul(playerId, opponentId, board, size, length_victory_pa
     return score
 
 
+def contains_opened_threats(segment, threat_length, playerId):
+    """
+    Counts opened threats (empty cell + consecutive player marks + empty cell) in a board
+    segment, scanning like number_of_opened_threats.
+    """
+    pattern = "3" + playerId * threat_length + "3"
+    count = 0
+    start = 0
+    while True:
+        start = segment.find(pattern, start)
+        if start == -1:
+            return count
+        count += 1
+        start += len(pattern) - 2
+
+
+def threat_points(counts, size):
+    """
+    heuristic_points_calcul from the threat tallies summed over every line of the
+    board (semi-opened, dangerous semi-opened and opened threats of length K - 2, then
+    of length K - 1, see utils.line_state), with the same weights and summation order.
+    """
+    semi_2, dangerous_2, opened_2, semi_1, dangerous_1, opened_1 = counts
+    score = 0
+    if size == 3:
+        score += (
+                0.05 * semi_2 +
+                0.05 * opened_2 +
+                0.075 * semi_1
+        )
+    else:
+        score += (
+                0.05 * semi_2 +
+                0.06 * dangerous_2 +
+                0.05 * opened_2 +
+                0.075 * semi_1 +
+                0.09 * dangerous_1 +
+                0.15 * opened_1
+        )
+    return score
+
+
+@timed("cost_function")
 def cost_function(playerId, opponentId, board, size, length_victory_pattern, authorized_moves):
     """
     Compute a heuristic reward or penalty for the current board state.
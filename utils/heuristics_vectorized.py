@@ -0,0 +1,326 @@
+from functools import lru_cache
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from configs.config import REWARD_ALLOW_OPP_WIN
+from utils.heuristics import get_threat_patterns
+
+# Value written in the padding cells of lines shorter than the board (never matches a pattern)
+OFF_BOARD = 9
+# Each cell is encoded on 4 bits when a window is turned into an integer code
+CODE_BASE = 16
+
+
+def encode_pattern(pattern):
+    """Encode a pattern string into the integer code used for windows of the same length."""
+    code = 0
+    for k, symbol in enumerate(pattern):
+        code += int(symbol) * CODE_BASE ** k
+    return code
+
+
+def _pattern_table(patterns):
+    """
+    Turn a {pattern: multiplicity} dictionary into sorted code / multiplicity arrays
+    usable with np.searchsorted.
+    """
+    codes = np.array([encode_pattern(pattern) for pattern in patterns], dtype=np.int64)
+    multiplicities = np.array(list(patterns.values()), dtype=np.int64)
+    order = np.argsort(codes)
+    return codes[order], multiplicities[order]
+
+
+class VectorizedHeuristic:
+    """
+    NumPy evaluator equivalent to heuristic_points_calcul and cost_function.
+
+    Every row, column and diagonal of the board is gathered at once through
+    precomputed index arrays (lines shorter than the board are padded with OFF_BOARD),
+    then every pattern width is matched with sliding_window_view and array comparisons
+    instead of string building. Boards are processed in batches of shape (K, N, N).
+    """
+
+    def __init__(self, board_length, pattern_victory_length):
+        """
+        Precompute the line index arrays for a board configuration.
+
+        Parameters:
+        - board_length (int): Size of the board (NxN).
+        - pattern_victory_length (int): Number of consecutive marks needed to win.
+        """
+        self.board_length = board_length
+        self.pattern_victory_length = pattern_victory_length
+        self.n_cells = board_length * board_length
+
+        # Lines in the same order and orientation as the string based heuristics
+        lines = [[x * board_length + y for y in range(board_length)] for x in range(board_length)]
+        lines += [[x * board_length + y for x in range(board_length)] for y in range(board_length)]
+        for x in range(board_length):
+            lines.append([(x + k) * board_length + k for k in range(board_length - x)])
+        for y in range(1, board_length):
+            lines.append([k * board_length + y + k for k in range(board_length - y)])
+        for x in range(board_length):
+            lines.append([(x - k) * board_length + k for k in range(x + 1)])
+        for y in range(1, board_length):
+            lines.append([(board_length - 1 - k) * board_length + y + k for k in range(board_length - y)])
+
+        # Padding points to an extra OFF_BOARD cell appended to each flattened board
+        self.line_lengths = np.array([len(line) for line in lines], dtype=np.int64)
+        self.line_indices = np.full((len(lines), board_length), self.n_cells, dtype=np.int64)
+        for i, line in enumerate(lines):
+            self.line_indices[i, :len(line)] = line
+
+        # Windows of pattern_victory_length cells, used for the immediate win check
+        windows = []
+        for line in lines:
+            for start in range(len(line) - pattern_victory_length + 1):
+                windows.append(line[start:start + pattern_victory_length])
+        self.win_windows = np.array(windows, dtype=np.int64).reshape(-1, pattern_victory_length)
+
+        self._threat_tables = {}
+
+    # ---------- Pattern tables ----------
+    def _tables(self, player, threat_length):
+        """Return the encoded pattern tables of a (player, threat_length) configuration."""
+        key = (player, threat_length)
+        if key not in self._threat_tables:
+            playerId, opponentId = str(player), str(1 - player)
+            patterns = get_threat_patterns(playerId, threat_length, opponentId, self.pattern_victory_length)
+            opened = "3" + playerId * threat_length + "3"
+            self._threat_tables[key] = {
+                "opened": (len(opened), _pattern_table({opened: 1})),
+                "semi_opened": [(length, _pattern_table(table)) for length, table in patterns.semi_opened],
+                "dangerous": [(length, _pattern_table(table)) for length, table in patterns.dangerous],
+                "wall_left": [(len(pattern), encode_pattern(pattern)) for pattern in patterns.wall_blocked_left],
+                "wall_right": [(len(pattern), encode_pattern(pattern)) for pattern in patterns.wall_blocked_right],
+            }
+        return self._threat_tables[key]
+
+    # ---------- Window extraction ----------
+    def gather_lines(self, boards):
+        """
+        Gather every line of a batch of boards.
+
+        Parameters:
+        - boards (np.ndarray): shape (K, N, N) or (N, N)
+
+        Returns:
+        - np.ndarray: shape (K, n_lines, N), padded with OFF_BOARD
+        """
+        boards = np.asarray(boards).reshape(-1, self.n_cells).astype(np.int64)
+        padded = np.concatenate([boards, np.full((boards.shape[0], 1), OFF_BOARD, dtype=np.int64)], axis=1)
+        return padded[:, self.line_indices]
+
+    def window_codes(self, lines, width):
+        """
+        Encode every window of a given width as an integer.
+
+        Returns:
+        - np.ndarray: shape (K, n_lines, N - width + 1), or None if width > N
+        """
+        if width > self.board_length:
+            return None
+        powers = CODE_BASE ** np.arange(width, dtype=np.int64)
+        return sliding_window_view(lines, width, axis=2) @ powers
+
+    @staticmethod
+    def _match(codes, table):
+        """Return the multiplicity of the pattern matched by each window (0 if none)."""
+        pattern_codes, multiplicities = table
+        positions = np.minimum(np.searchsorted(pattern_codes, codes), len(pattern_codes) - 1)
+        return np.where(pattern_codes[positions] == codes, multiplicities[positions], 0)
+
+    def _window_at(self, lines, width, positions):
+        """
+        Encode the window of a given width starting at a per-line position.
+        Windows that do not fit on the line get the code -1.
+        """
+        valid = (positions >= 0) & (positions + width <= self.board_length)
+        offsets = np.clip(positions, 0, self.board_length - width)[:, None] + np.arange(width)
+        cells = np.take_along_axis(lines, np.broadcast_to(offsets, lines.shape[:1] + offsets.shape), axis=2)
+        codes = cells @ (CODE_BASE ** np.arange(width, dtype=np.int64))
+        return np.where(valid, codes, -1)
+
+    # ---------- Threat counting ----------
+    def opened_threats(self, lines, player, threat_length):
+        """Number of opened threats per board (see number_of_opened_threats)."""
+        width, table = self._tables(player, threat_length)["opened"]
+        codes = self.window_codes(lines, width)
+        if codes is None:
+            return np.zeros(lines.shape[0], dtype=np.int64)
+        return self._match(codes, table).sum(axis=(1, 2))
+
+    def dangerous_semi_opened_threats(self, lines, player, threat_length):
+        """Number of dangerous semi-opened threats per board (see number_of_dangerous_semi_opened_threats)."""
+        count = np.zeros(lines.shape[0], dtype=np.int64)
+        for width, table in self._tables(player, threat_length)["dangerous"]:
+            codes = self.window_codes(lines, width)
+            if codes is not None:
+                count += self._match(codes, table).sum(axis=(1, 2))
+        return count
+
+    def semi_opened_threats(self, lines, player, threat_length):
+        """Number of semi-opened threats per board (see number_of_semi_opened_threats)."""
+        tables = self._tables(player, threat_length)
+        n_boards, n_lines = lines.shape[:2]
+
+        count = np.zeros((n_boards, n_lines), dtype=np.int64)
+        found_left = np.zeros((n_boards, n_lines), dtype=bool)
+        found_right = np.zeros((n_boards, n_lines), dtype=bool)
+
+        for width, table in tables["semi_opened"]:
+            codes = self.window_codes(lines, width)
+            if codes is None:
+                continue
+            matches = self._match(codes, table)
+            count += matches.sum(axis=2)
+            found_left |= matches[:, :, 0] > 0
+            # Last window of each line (lines shorter than the pattern have none)
+            end = self.line_lengths - width
+            last = np.broadcast_to(np.clip(end, 0, None)[None, :, None], (n_boards, n_lines, 1))
+            found_right |= (end >= 0) & (np.take_along_axis(matches, last, axis=2)[:, :, 0] > 0)
+
+        # Wall-blocked patterns at the start of a line (first match in pattern_ order wins)
+        wall_left = np.zeros((n_boards, n_lines), dtype=bool)
+        whole_line = np.zeros((n_boards, n_lines), dtype=bool)
+        for width, code in tables["wall_left"]:
+            if width > self.board_length:
+                continue
+            matched = self._window_at(lines, width, np.zeros(n_lines, dtype=np.int64)) == code
+            whole_line |= matched & ~wall_left & (width == self.line_lengths)
+            wall_left |= matched
+
+        wall_right = np.zeros((n_boards, n_lines), dtype=bool)
+        for width, code in tables["wall_right"]:
+            if width > self.board_length:
+                continue
+            wall_right |= self._window_at(lines, width, self.line_lengths - width) == code
+
+        left_added = wall_left & ~found_left
+        count += left_added
+        count += wall_right & ~found_right & ~(left_added & whole_line)
+        return count.sum(axis=1)
+
+    # ---------- Scores ----------
+    def _points_for_player(self, lines, player):
+        """heuristic_points_calcul for a fixed player on every board of the batch."""
+        K = self.pattern_victory_length
+        score = 0
+        if self.board_length == 3:
+            score += (
+                    0.05 * self.semi_opened_threats(lines, player, K - 2) +
+                    0.05 * self.opened_threats(lines, player, K - 2) +
+                    0.075 * self.semi_opened_threats(lines, player, K - 1)
+            )
+        else:
+            score += (
+                    0.05 * self.semi_opened_threats(lines, player, K - 2) +
+                    0.06 * self.dangerous_semi_opened_threats(lines, player, K - 2) +
+                    0.05 * self.opened_threats(lines, player, K - 2) +
+                    0.075 * self.semi_opened_threats(lines, player, K - 1) +
+                    0.09 * self.dangerous_semi_opened_threats(lines, player, K - 1) +
+                    0.15 * self.opened_threats(lines, player, K - 1)
+            )
+        return score
+
+    def heuristic_points(self, boards, player_ids):
+        """
+        Batched heuristic_points_calcul (the opponent is always the other player).
+
+        Parameters:
+        - boards (np.ndarray): shape (K, N, N)
+        - player_ids (int or np.ndarray): player scored on each board, scalar or shape (K,)
+
+        Returns:
+        - np.ndarray: float64 scores of shape (K,)
+        """
+        lines = self.gather_lines(boards)
+        player_ids = np.broadcast_to(np.asarray(player_ids, dtype=np.int64), lines.shape[:1])
+        scores = np.zeros(lines.shape[0], dtype=np.float64)
+        for player in (0, 1):
+            selected = player_ids == player
+            if selected.any():
+                scores[selected] = self._points_for_player(lines[selected], player)
+        return scores
+
+    def immediate_wins(self, boards, player_ids, authorized_moves):
+        """
+        Batched `is_winning_move(...) is not None`.
+
+        Parameters:
+        - boards (np.ndarray): shape (K, N, N)
+        - player_ids (int or np.ndarray): player tested on each board, scalar or shape (K,)
+        - authorized_moves (np.ndarray): candidate moves of each board, shape (K, M)
+
+        Returns:
+        - np.ndarray: bool array of shape (K,)
+        """
+        flat = np.asarray(boards).reshape(-1, self.n_cells)
+        player_ids = np.broadcast_to(np.asarray(player_ids, dtype=np.int64), flat.shape[:1])
+        authorized_moves = np.asarray(authorized_moves, dtype=np.int64).reshape(flat.shape[0], -1)
+
+        owned = flat == player_ids[:, None]
+        owned_in_window = owned[:, self.win_windows].sum(axis=2)
+
+        wins = np.zeros(flat.shape[0], dtype=bool)
+        # Same semantics as is_winning_move: the mark is placed whatever the cell contains
+        for move in np.unique(authorized_moves):
+            candidates = (authorized_moves == move).any(axis=1)
+            in_window = (self.win_windows == move).any(axis=1)
+            gain = in_window[None, :] & ~owned[:, move][:, None]
+            wins |= candidates & (owned_in_window + gain == self.pattern_victory_length).any(axis=1)
+        return wins
+
+    def cost(self, boards, player_ids, authorized_moves):
+        """
+        Batched cost_function: REWARD_ALLOW_OPP_WIN when the opponent has an immediate
+        win among authorized_moves, otherwise player points minus opponent points.
+
+        Parameters:
+        - boards (np.ndarray): shape (K, N, N)
+        - player_ids (int or np.ndarray): player that just moved on each board, scalar or shape (K,)
+        - authorized_moves (np.ndarray): candidate moves of each board, shape (K, M)
+
+        Returns:
+        - np.ndarray: float64 rewards of shape (K,)
+        """
+        boards = np.asarray(boards).reshape(-1, self.board_length, self.board_length)
+        player_ids = np.broadcast_to(np.asarray(player_ids, dtype=np.int64), boards.shape[:1])
+        opponent_wins = self.immediate_wins(boards, 1 - player_ids, authorized_moves)
+        reward = self.heuristic_points(boards, player_ids) - self.heuristic_points(boards, 1 - player_ids)
+        return np.where(opponent_wins, REWARD_ALLOW_OPP_WIN, reward)
+
+
+@lru_cache(maxsize=None)
+def get_vectorized_heuristic(board_length, pattern_victory_length):
+    """Return the (cached) VectorizedHeuristic of a board configuration."""
+    return VectorizedHeuristic(board_length, pattern_victory_length)
+
+
+def heuristic_points_batch(boards, player_ids, size, length_victory_pattern):
+    """
+    Score K boards at once, see VectorizedHeuristic.heuristic_points.
+    """
+    return get_vectorized_heuristic(size, length_victory_pattern).heuristic_points(boards, player_ids)
+
+
+def cost_function_batch(boards, player_ids, size, length_victory_pattern, authorized_moves):
+    """
+    Compute the heuristic reward of K boards at once, see VectorizedHeuristic.cost.
+    """
+    return get_vectorized_heuristic(size, length_victory_pattern).cost(boards, player_ids, authorized_moves)
+
+
+def heuristic_points_calcul_vectorized(playerId, opponentId, board, size, length_victory_pattern):
+    """
+    Drop-in replacement of heuristic_points_calcul for a single board.
+    """
+    return float(heuristic_points_batch(board, int(playerId), size, length_victory_pattern)[0])
+
+
+def cost_function_vectorized(playerId, opponentId, board, size, length_victory_pattern, authorized_moves):
+    """
+    Drop-in replacement of cost_function for a single board.
+    """
+    return float(cost_function_batch(board, int(playerId), size, length_victory_pattern, [authorized_moves])[0])
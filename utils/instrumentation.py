@@ -0,0 +1,163 @@
+import functools
+import json
+import os
+import time
+from contextlib import contextmanager
+
+from configs.config import INSTRUMENTATION_ENABLED
+
+
+class Instrumentation:
+    """
+    Low-overhead timers and counters of the training hot paths.
+
+    Timers accumulate (calls, total nanoseconds) per name and are inclusive: the
+    time of a step includes its heuristic reward and opponent move. Measures are kept
+    per process; the worker processes of a SubprocVecEnv are gathered through
+    env_method("instrumentation_snapshot") (see training/callbacks.py). When disabled,
+    an instrumented function costs a flag check.
+    """
+
+    def __init__(self, enabled=INSTRUMENTATION_ENABLED):
+        self.enabled = enabled
+        self.timers = {}    # name -> [calls, total_ns]
+        self.counters = {}  # name -> count
+
+    def enable(self, enabled=True):
+        """Turn measures on or off (inherited by worker processes started afterwards)."""
+        self.enabled = enabled
+        os.environ["MORPION_INSTRUMENTATION"] = "1" if enabled else "0"
+
+    def add_time(self, name, elapsed_ns, calls=1):
+        timer = self.timers.get(name)
+        if timer is None:
+            self.timers[name] = [calls, elapsed_ns]
+        else:
+            timer[0] += calls
+            timer[1] += elapsed_ns
+
+    def count(self, name, n=1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    @contextmanager
+    def section(self, name):
+        """Time a block of code."""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter_ns() - start)
+
+    def snapshot(self, reset=False):
+        """Copy of the measures ({"timers": {name: [calls, total_ns]}, "counters": {...}})."""
+        snapshot = {"timers": {name: list(timer) for name, timer in self.timers.items()},
+                    "counters": dict(self.counters)}
+        if reset:
+            self.reset()
+        return snapshot
+
+    def merge(self, snapshot):
+        """Add the measures of another process."""
+        for name, (calls, total_ns) in snapshot["timers"].items():
+            self.add_time(name, total_ns, calls)
+        for name, count in snapshot["counters"].items():
+            self.counters[name] = self.counters.get(name, 0) + count
+
+    def reset(self):
+        self.timers = {}
+        self.counters = {}
+
+    def summary(self, wall_time=None):
+        """
+        Readable measures.
+
+        Parameters:
+        - wall_time (float): duration of the measured period in seconds, to express each timer as a share of it
+
+        Returns:
+        - dict: {"timers": {name: {"calls", "total_s", "mean_us"[, "share"]}}, "counters": {...}}
+        """
+        timers = {}
+        for name, (calls, total_ns) in sorted(self.timers.items(), key=lambda item: -item[1][1]):
+            timers[name] = {
+                "calls": calls,
+                "total_s": total_ns / 1e9,
+                "mean_us": total_ns / calls / 1e3 if calls else 0.0,
+            }
+            if wall_time:
+                timers[name]["share"] = total_ns / 1e9 / wall_time
+        summary = {"timers": timers, "counters": dict(self.counters)}
+        if wall_time is not None:
+            summary["wall_time_s"] = wall_time
+        return summary
+
+
+_instrumentation = Instrumentation()
+
+
+def get_instrumentation():
+    """Return the process-wide Instrumentation."""
+    return _instrumentation
+
+
+def timed(name):
+    """Decorator timing every call of a function under name (when instrumentation is enabled)."""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _instrumentation.enabled:
+                return function(*args, **kwargs)
+            start = time.perf_counter_ns()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                _instrumentation.add_time(name, time.perf_counter_ns() - start)
+        return wrapper
+    return decorator
+
+
+def save_summary(path, summary, label=None):
+    """
+    Append a summary to a JSON file of summaries (list, one entry per training segment).
+
+    Parameters:
+    - path (str): JSON file
+    - summary (dict): see Instrumentation.summary
+    - label (str): name of the measured period (e.g. "agent_v3 segment 2")
+    """
+    summaries = []
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            summaries = json.load(f)
+    summaries.append({"label": label, **summary})
+    with open(path, "w") as f:
+        json.dump(summaries, f, indent=4)
+
+
+@contextmanager
+def profile_segment(path=None):
+    """
+    Run a block under cProfile (this process only: with a SubprocVecEnv the env
+    steps run in the workers).
+
+    Parameters:
+    - path (str): file receiving the profile (pstats format, e.g. for snakeviz);
+      None prints the 30 most expensive functions instead
+    """
+    import cProfile
+    import pstats
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        if path is None:
+            pstats.Stats(profiler).sort_stats("cumulative").print_stats(30)
+        else:
+            profiler.dump_stats(path)
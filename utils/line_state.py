@@ -0,0 +1,348 @@
+from functools import lru_cache
+
+from configs.config import EMPTY_CELL
+from utils.heuristics import (
+    contains_all_semi_opened_threats,
+    contains_dangerous_semi_opened_threats,
+    contains_opened_threats,
+    get_threat_patterns,
+    threat_points,
+)
+
+PLAYER_SYMBOLS = ("0", "1")
+EMPTY_SYMBOL = "3"
+
+# Bits of each tally in a packed value (see LineTables.pack)
+COUNT_BITS = 20
+COUNT_MASK = (1 << COUNT_BITS) - 1
+
+
+class LineTables:
+    """
+    Precomputed line and window tables of one (board_length, pattern_victory_length) configuration.
+
+    Attributes:
+    - lines (list[list[int]]): cells of every full line, in the order and orientation
+      of the string heuristics (rows, columns, descending then ascending diagonals)
+    - cell_lines (tuple[tuple[tuple[int, int]]]): for every cell, the (line, position) of the 4 lines through it
+    - windows (list[tuple[int]]): cells of every winning window (K consecutive cells of a line)
+    - cell_windows (tuple[tuple[int]]): for every cell, the windows through it
+    - width (int): length of the longest threat pattern
+
+    Every threat pattern is at most width cells long, so the threat tallies of a line
+    are the sum of the tallies of the patterns starting at each of its positions
+    (a function of the next width cells only), plus the wall-blocked patterns of both
+    edges (a function of the first / last width cells). Lines no longer than width are
+    tallied whole. The tallies of these short strings are kept in dictionaries, whose
+    size is bounded by the 3^width strings of the configuration, as packed integers
+    holding both players' tallies.
+    """
+
+    def __init__(self, board_length, pattern_victory_length):
+        self.board_length = board_length
+        self.pattern_victory_length = pattern_victory_length
+        self.n_cells = board_length * board_length
+        n, k = board_length, pattern_victory_length
+
+        lines = [[x * n + y for y in range(n)] for x in range(n)]
+        lines += [[x * n + y for x in range(n)] for y in range(n)]
+        lines += [[(x + k) * n + k for k in range(n - x)] for x in range(n)]
+        lines += [[k * n + y + k for k in range(n - y)] for y in range(1, n)]
+        lines += [[(x - k) * n + k for k in range(x + 1)] for x in range(n)]
+        lines += [[(n - 1 - k) * n + y + k for k in range(n - y)] for y in range(1, n)]
+        self.lines = lines
+
+        cell_lines = [[] for _ in range(self.n_cells)]
+        for index, cells in enumerate(lines):
+            for position, cell in enumerate(cells):
+                cell_lines[cell].append((index, position))
+        self.cell_lines = tuple(tuple(entries) for entries in cell_lines)
+
+        self.windows = [tuple(cells[start:start + k]) for cells in lines for start in range(len(cells) - k + 1)]
+        cell_windows = [[] for _ in range(self.n_cells)]
+        for index, cells in enumerate(self.windows):
+            for cell in cells:
+                cell_windows[cell].append(index)
+        self.cell_windows = tuple(tuple(entries) for entries in cell_windows)
+
+        # Threat patterns of both players, for threats of length K - 2 then K - 1
+        self.threat_lengths = (k - 2, k - 1)
+        self.patterns = tuple(
+            tuple(get_threat_patterns(PLAYER_SYMBOLS[player], length, PLAYER_SYMBOLS[1 - player], k)
+                  for length in self.threat_lengths)
+            for player in (0, 1)
+        )
+        self.opened_patterns = tuple(
+            tuple(EMPTY_SYMBOL + PLAYER_SYMBOLS[player] * length + EMPTY_SYMBOL for length in self.threat_lengths)
+            for player in (0, 1)
+        )
+        self.width = max(
+            [length for patterns in self.patterns[0] for length, _ in patterns.semi_opened + patterns.dangerous]
+            + [len(pattern) for patterns in self.patterns[0] for pattern in patterns.wall_blocked_left]
+            + [len(pattern) for pattern in self.opened_patterns[0]]
+        )
+
+        # Packed tallies of short strings, see pack
+        self.start_values = {}
+        self.left_values = {}
+        self.right_values = {}
+        self.short_line_values = {}
+
+        # Threat tallies of the empty board
+        self.empty_total = sum(self.line_value(EMPTY_SYMBOL * len(cells)) for cells in lines)
+
+    # ---------- Packed tallies ----------
+    @staticmethod
+    def pack(counts):
+        """
+        Pack the 6 tallies of player 0 then the 6 of player 1 in one integer
+        (COUNT_BITS bits each), so that tallies are summed with integer additions.
+        """
+        value = 0
+        for k, count in enumerate(counts):
+            value |= count << (COUNT_BITS * k)
+        return value
+
+    @staticmethod
+    def unpack(value, player):
+        """Return the 6 tallies of a player from a packed value (see line_counts for their order)."""
+        value >>= COUNT_BITS * 6 * player
+        return [(value >> (COUNT_BITS * k)) & COUNT_MASK for k in range(6)]
+
+    # ---------- Tallies ----------
+    def line_counts(self, line, player):
+        """
+        Threat tallies of a line string for a player, in this order: semi-opened,
+        dangerous semi-opened and opened threats of length K - 2, then of length K - 1.
+        """
+        return self.unpack(self.line_value(line), player)
+
+    def line_value(self, line):
+        """Packed tallies of a line string, both players."""
+        if len(line) <= self.width:
+            return self.short_line_value(line)
+        value = sum(self.start_value(line[start:start + self.width]) for start in range(len(line)))
+        return value + self.left_value(line[:self.width]) + self.right_value(line[-self.width:])
+
+    def short_line_value(self, line):
+        """Tallies of a line no longer than width, with the string heuristics."""
+        value = self.short_line_values.get(line)
+        if value is None:
+            counts = []
+            for player in (0, 1):
+                symbol, opponent = PLAYER_SYMBOLS[player], PLAYER_SYMBOLS[1 - player]
+                for length in self.threat_lengths:
+                    counts.append(contains_all_semi_opened_threats(line, length, symbol, opponent, self.pattern_victory_length))
+                    counts.append(contains_dangerous_semi_opened_threats(line, length, symbol, opponent, self.pattern_victory_length))
+                    counts.append(contains_opened_threats(line, length, symbol))
+            value = self.short_line_values[line] = self.pack(counts)
+        return value
+
+    def start_value(self, segment):
+        """
+        Tallies of the patterns starting at the first position of segment (the next
+        width cells of a longer line, fewer at its end), wall-blocked patterns excluded.
+        """
+        value = self.start_values.get(segment)
+        if value is None:
+            counts = []
+            for player in (0, 1):
+                for patterns, opened in zip(self.patterns[player], self.opened_patterns[player]):
+                    counts.append(sum(table.get(segment[:length], 0) for length, table in patterns.semi_opened if length <= len(segment)))
+                    counts.append(sum(table.get(segment[:length], 0) for length, table in patterns.dangerous if length <= len(segment)))
+                    counts.append(int(segment.startswith(opened)))
+            value = self.start_values[segment] = self.pack(counts)
+        return value
+
+    def left_value(self, prefix):
+        """Wall-blocked pattern at the start of a longer line, counted when no semi-opened pattern starts there."""
+        value = self.left_values.get(prefix)
+        if value is None:
+            counts = [0] * 12
+            for player in (0, 1):
+                for index, patterns in enumerate(self.patterns[player]):
+                    if any(prefix[:length] in table for length, table in patterns.semi_opened):
+                        continue
+                    counts[6 * player + 3 * index] = int(any(prefix.startswith(pattern) for pattern in patterns.wall_blocked_left))
+            value = self.left_values[prefix] = self.pack(counts)
+        return value
+
+    def right_value(self, suffix):
+        """Wall-blocked pattern at the end of a longer line, counted when no semi-opened pattern ends there."""
+        value = self.right_values.get(suffix)
+        if value is None:
+            counts = [0] * 12
+            for player in (0, 1):
+                for index, patterns in enumerate(self.patterns[player]):
+                    if any(suffix[-length:] in table for length, table in patterns.semi_opened):
+                        continue
+                    counts[6 * player + 3 * index] = int(any(suffix.endswith(pattern) for pattern in patterns.wall_blocked_right))
+            value = self.right_values[suffix] = self.pack(counts)
+        return value
+
+    def segment_value(self, line, position):
+        """
+        Packed tallies of a line (list of symbols) that depend on its cell at position:
+        the patterns starting within width cells before it, and the edge patterns
+        when it is among the first / last width cells.
+        """
+        width, length = self.width, len(line)
+        if length <= width:
+            line = "".join(line)
+            value = self.short_line_values.get(line)
+            return self.short_line_value(line) if value is None else value
+        first = max(position - width + 1, 0)
+        segment = "".join(line[first:position + width])
+        values = self.start_values
+        value = 0
+        for start in range(position - first + 1):
+            window = segment[start:start + width]
+            start_value = values.get(window)
+            value += self.start_value(window) if start_value is None else start_value
+        if position < width:
+            value += self.left_value("".join(line[:width]))
+        if position >= length - width:
+            value += self.right_value("".join(line[-width:]))
+        return value
+
+
+@lru_cache(maxsize=None)
+def get_line_tables(board_length, pattern_victory_length):
+    """Return the (cached) LineTables of a board configuration."""
+    return LineTables(board_length, pattern_victory_length)
+
+
+class LineState:
+    """
+    Incrementally maintained evaluation state of a board.
+
+    Keeps:
+    - every line of the board as a list of symbols, and the threat tallies of
+      heuristic_points_calcul of both players summed over every line (packed, see
+      LineTables.pack);
+    - the number of marks of each player in every winning window (the empty cells
+      being the rest of its K cells), and for both players the empty cells completing
+      one of their windows (immediate wins).
+
+    Placing or removing a mark only updates the windows through its cell, and the
+    tallies of the patterns of the 4 lines through it that overlap the cell, after
+    which heuristic_points_calcul and the immediate wins are read without scanning
+    the board.
+    """
+
+    def __init__(self, board_length, pattern_victory_length):
+        self.tables = get_line_tables(board_length, pattern_victory_length)
+        self.reset()
+
+    def reset(self):
+        """Empty board."""
+        tables = self.tables
+        self.board = [EMPTY_CELL] * tables.n_cells
+        self.lines = [[EMPTY_SYMBOL] * len(cells) for cells in tables.lines]
+        self.total = tables.empty_total
+        self.window_counts = [[0] * len(tables.windows), [0] * len(tables.windows)]
+        # Number of windows each empty cell completes, and the bitmask of those cells, per player
+        self.win_counts = [[0] * tables.n_cells, [0] * tables.n_cells]
+        self.win_masks = [0, 0]
+
+    def set_gameboard(self, gameboard):
+        """Rebuild the state from a (N, N) gameboard."""
+        self.reset()
+        for cell, value in enumerate(gameboard.reshape(-1)):
+            if value != EMPTY_CELL:
+                self.place(cell, int(value))
+
+    def copy_from(self, other):
+        """Overwrite the state with the one of another LineState of the same configuration, in place."""
+        self.board[:] = other.board
+        for line, other_line in zip(self.lines, other.lines):
+            line[:] = other_line
+        self.total = other.total
+        for player in (0, 1):
+            self.window_counts[player][:] = other.window_counts[player]
+            self.win_counts[player][:] = other.win_counts[player]
+        self.win_masks[:] = other.win_masks
+
+    # ---------- Queries ----------
+    def heuristic_points(self, player):
+        """heuristic_points_calcul of the player (the opponent being the other player)."""
+        return threat_points(self.tables.unpack(self.total, player), self.tables.board_length)
+
+    def winning_cells(self, player):
+        """Bitmask of the empty cells where a mark of the player completes a winning window."""
+        return self.win_masks[player]
+
+    def completes_window(self, player, cell):
+        """
+        Whether a mark of the player on a cell completes a winning window, whatever the
+        cell contains (same result as utils.heuristics.is_winning_move on positions
+        where no window is complete yet, i.e. before the game is won).
+        """
+        cell = int(cell)
+        if self.board[cell] == EMPTY_CELL:
+            return bool(self.win_masks[player] >> cell & 1)
+        length = self.tables.pattern_victory_length
+        own, other = self.window_counts[player], self.window_counts[1 - player]
+        if self.board[cell] == player:
+            return any(own[window] == length for window in self.tables.cell_windows[cell])
+        # The opponent's mark is replaced
+        return any(own[window] == length - 1 and other[window] == 1 for window in self.tables.cell_windows[cell])
+
+    # ---------- Updates ----------
+    def place(self, cell, player):
+        """Put the player's mark on an empty cell."""
+        cell = int(cell)
+        self.board[cell] = player
+        missing = self.tables.pattern_victory_length - 1
+        own, other = self.window_counts[player], self.window_counts[1 - player]
+        for window in self.tables.cell_windows[cell]:
+            # The cell was the one completing the window for a player
+            if own[window] == missing and other[window] == 0:
+                self._count_win(player, cell, -1)
+            elif other[window] == missing and own[window] == 0:
+                self._count_win(1 - player, cell, -1)
+            own[window] += 1
+            if own[window] == missing and other[window] == 0:
+                self._count_win(player, self._empty_cell(window), 1)
+        self._update_lines(cell, PLAYER_SYMBOLS[player])
+
+    def remove(self, cell):
+        """Clear a cell (undo of place)."""
+        cell = int(cell)
+        player = self.board[cell]
+        self.board[cell] = EMPTY_CELL
+        missing = self.tables.pattern_victory_length - 1
+        own, other = self.window_counts[player], self.window_counts[1 - player]
+        for window in self.tables.cell_windows[cell]:
+            if own[window] == missing and other[window] == 0:
+                self._count_win(player, self._empty_cell(window, cell), -1)
+            own[window] -= 1
+            # The cell is now the one completing the window for a player
+            if own[window] == missing and other[window] == 0:
+                self._count_win(player, cell, 1)
+            elif other[window] == missing and own[window] == 0:
+                self._count_win(1 - player, cell, 1)
+        self._update_lines(cell, EMPTY_SYMBOL)
+
+    def _empty_cell(self, window, excluded=None):
+        """The empty cell of a window with a single one (excluded is treated as occupied)."""
+        board = self.board
+        return next(cell for cell in self.tables.windows[window] if board[cell] == EMPTY_CELL and cell != excluded)
+
+    def _count_win(self, player, cell, delta):
+        """Add (delta=1) or remove (delta=-1) a window completed by a cell for a player."""
+        counts = self.win_counts[player]
+        counts[cell] += delta
+        if counts[cell] == 0:
+            self.win_masks[player] &= ~(1 << cell)
+        elif counts[cell] == 1 and delta > 0:
+            self.win_masks[player] |= 1 << cell
+
+    def _update_lines(self, cell, symbol):
+        """Write a symbol in the lines through a cell and update the threat tallies."""
+        tables = self.tables
+        for index, position in tables.cell_lines[cell]:
+            line = self.lines[index]
+            before = tables.segment_value(line, position)
+            line[position] = symbol
+            self.total += tables.segment_value(line, position) - before
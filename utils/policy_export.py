@@ -0,0 +1,167 @@
+import hashlib
+import os
+
+import numpy as np
+
+from configs.config import EMPTY_CELL
+
+# Feature extractors of training/config.py that can be exported
+EXPORTABLE_EXTRACTORS = ("CustomMLP3x3", "CustomCNN3x3", "CNNGlobalMLPFeatures")
+
+
+def exported_policy_path(agent_path):
+    """Path of the exported policy of an agent file (agent_v1_3x3_3.zip -> agent_v1_3x3_3.npz)."""
+    return os.path.splitext(agent_path)[0] + ".npz"
+
+
+def file_digest(path):
+    """SHA-1 of a file, recorded in the export to detect a retrained agent."""
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+# ---------------------------
+# Export (needs torch / sb3_contrib)
+# ---------------------------
+def export_policy(agent_path, output_path=None):
+    """
+    Export the inference part of a MaskablePPO agent to a NumPy weight file.
+
+    Only the features extractor, the policy MLP and the action head are written
+    (no value function, optimizer state or training configuration), along with the
+    architecture information needed to rebuild the forward pass with NumPy.
+
+    Parameters:
+    - agent_path (str): trained agent file (.zip)
+    - output_path (str): export path (exported_policy_path(agent_path) by default)
+
+    Returns:
+    - str: path of the written file
+    """
+    from agents.model_registry import get_model_registry
+
+    policy = get_model_registry().get(agent_path).policy
+    extractor = policy.pi_features_extractor
+    extractor_name = type(extractor).__name__
+    if extractor_name not in EXPORTABLE_EXTRACTORS:
+        raise ValueError(f"❌ Unsupported features extractor for export: {extractor_name}")
+
+    arrays = {f"features.{name}": value.detach().cpu().numpy() for name, value in extractor.state_dict().items()}
+    linear_layers = [module for module in policy.mlp_extractor.policy_net if hasattr(module, "weight")]
+    for index, layer in enumerate(linear_layers):
+        arrays[f"policy_net.{index}.weight"] = layer.weight.detach().cpu().numpy()
+        arrays[f"policy_net.{index}.bias"] = layer.bias.detach().cpu().numpy()
+    arrays["action_net.weight"] = policy.action_net.weight.detach().cpu().numpy()
+    arrays["action_net.bias"] = policy.action_net.bias.detach().cpu().numpy()
+
+    output_path = output_path or exported_policy_path(agent_path)
+    np.savez(
+        output_path,
+        extractor=extractor_name,
+        activation=policy.activation_fn.__name__,
+        board_length=policy.observation_space["observation"].shape[0],
+        n_policy_layers=len(linear_layers),
+        source_digest=file_digest(agent_path),
+        **arrays
+    )
+    return output_path
+
+
+def export_agents(agents_dir="best_agents"):
+    """Export every agent file of a directory whose export is missing or outdated. Returns the written paths."""
+    written = []
+    for name in sorted(os.listdir(agents_dir)):
+        agent_path = os.path.join(agents_dir, name)
+        if name.endswith(".zip") and find_exported_policy(agent_path) is None:
+            written.append(export_policy(agent_path))
+    return written
+
+
+def find_exported_policy(agent_path):
+    """Return the export of an agent file if it exists and matches the agent file, else None."""
+    path = exported_policy_path(agent_path)
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as data:
+        digest = str(data["source_digest"])
+    return path if digest == file_digest(agent_path) else None
+
+
+# ---------------------------
+# NumPy forward pass
+# ---------------------------
+def _linear(x, weight, bias):
+    return x @ weight.T + bias
+
+
+def _relu(x):
+    return np.maximum(x, 0.0)
+
+
+def _conv3x3(x, weight, bias):
+    """3x3 convolution with padding 1: x (B, C, H, W), weight (O, C, 3, 3) -> (B, O, H, W)."""
+    padded = np.pad(x, ((0, 0), (0, 0), (1, 1), (1, 1)))
+    windows = np.lib.stride_tricks.sliding_window_view(padded, (3, 3), axis=(2, 3))  # B, C, H, W, 3, 3
+    return np.einsum("bchwij,ocij->bohw", windows, weight, optimize=True) + bias[None, :, None, None]
+
+
+ACTIVATIONS = {"Tanh": np.tanh, "ReLU": _relu}
+
+
+class FastPolicy:
+    """
+    NumPy re-implementation of the policy forward pass of an exported agent:
+    features extractor, policy MLP and action head, returning the action logits.
+    """
+
+    def __init__(self, path):
+        with np.load(path) as data:
+            self.weights = {key: data[key].astype(np.float32) for key in data.files
+                            if key.startswith(("features.", "policy_net.", "action_net."))}
+            self.extractor = str(data["extractor"])
+            self.activation = ACTIVATIONS[str(data["activation"])]
+            self.board_length = int(data["board_length"])
+            self.n_policy_layers = int(data["n_policy_layers"])
+        self.path = path
+
+    def features(self, boards, players):
+        """Features of boards (B, N, N) seen by players (B,)."""
+        w = self.weights
+        boards = boards.astype(np.float32)
+        players = players.astype(np.float32).reshape(-1, 1, 1)
+        mine = boards == players
+        theirs = boards == 1 - players
+
+        if self.extractor == "CustomCNN3x3":
+            x = np.stack([mine, theirs, boards == EMPTY_CELL], axis=1).astype(np.float32)
+            x = _relu(_conv3x3(x, w["features.cnn.0.weight"], w["features.cnn.0.bias"])).reshape(len(boards), -1)
+            return _relu(_linear(x, w["features.linear.0.weight"], w["features.linear.0.bias"]))
+
+        normalized = mine.astype(np.float32) - theirs.astype(np.float32)
+        if self.extractor == "CustomMLP3x3":
+            x = normalized.reshape(len(boards), -1)
+            x = _relu(_linear(x, w["features.mlp.1.weight"], w["features.mlp.1.bias"]))
+            return _relu(_linear(x, w["features.mlp.3.weight"], w["features.mlp.3.bias"]))
+
+        # CNNGlobalMLPFeatures
+        x = normalized[:, None]
+        x = _relu(_conv3x3(x, w["features.cnn.0.weight"], w["features.cnn.0.bias"]))
+        x = _relu(_conv3x3(x, w["features.cnn.2.weight"], w["features.cnn.2.bias"]))
+        x = x.mean(axis=(2, 3))
+        return _relu(_linear(x, w["features.fc.0.weight"], w["features.fc.0.bias"]))
+
+    def logits(self, boards, players):
+        """Action logits (B, N*N) of boards (B, N, N) seen by players (B,)."""
+        w = self.weights
+        x = self.features(boards, players)
+        for index in range(self.n_policy_layers):
+            x = self.activation(_linear(x, w[f"policy_net.{index}.weight"], w[f"policy_net.{index}.bias"]))
+        return _linear(x, w["action_net.weight"], w["action_net.bias"])
+
+
+if __name__ == "__main__":
+    import sys
+
+    for agents_dir in sys.argv[1:] or ["best_agents"]:
+        for path in export_agents(agents_dir):
+            print(f"Exported {path}")
@@ -0,0 +1,202 @@
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+
+from configs.config import EMPTY_CELL, RENDER_CELL_SIZE, RENDER_THREADS
+
+# Palette indices of the rendered frames
+BACKGROUND, GRID, PLAYER_0, PLAYER_1 = 0, 1, 2, 3
+
+# RGB colors of the palette indices, per theme
+THEMES = {
+    "neon": ((0, 0, 0), (255, 255, 255), (255, 0, 0), (11, 158, 216)),
+    "light": ((250, 250, 250), (40, 40, 40), (220, 40, 40), (30, 90, 200)),
+}
+
+
+def _load_font(size):
+    from PIL import ImageFont
+
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:  # Pillow < 10.1: fixed-size bitmap font
+        return ImageFont.load_default()
+
+
+class BoardRenderer:
+    """
+    Fast image renderer of NxN boards.
+
+    Everything that does not depend on the position (background, grid, the X and O
+    sprites) is drawn once per (board_length, theme, cell_size). A frame is then a
+    copy of the base canvas with the sprites of the occupied cells stamped in with
+    array operations. Frames are palette-indexed uint8 arrays (see THEMES), so they
+    are encoded to GIF / PNG without any color quantization.
+    """
+
+    def __init__(self, board_length, theme="neon", cell_size=RENDER_CELL_SIZE):
+        """
+        Parameters:
+        - board_length (int): size of the board (NxN)
+        - theme (str): color theme (key of THEMES)
+        - cell_size (int): cell width and height in pixels
+        """
+        from PIL import Image, ImageDraw
+
+        self.board_length = board_length
+        self.theme = theme
+        self.cell_size = cell_size
+        self.palette = [channel for color in THEMES[theme] for channel in color]
+        self.header = cell_size // 2
+        size = board_length * cell_size
+        self.font = _load_font(max(10, self.header * 2 // 3))
+
+        # Base canvas: header band for the player names, then the grid
+        canvas = np.full((self.header + size, size), BACKGROUND, dtype=np.uint8)
+        grid = canvas[self.header:]
+        for line in range(board_length + 1):
+            position = min(line * cell_size, size - 1)
+            grid[position, :] = GRID
+            grid[:, position] = GRID
+        self.base = canvas
+
+        # Sprites (palette index per pixel, BACKGROUND where transparent), indexed by cell value
+        margin = cell_size // 5
+        width = max(2, cell_size // 10)
+        sprites = np.zeros((EMPTY_CELL + 1, cell_size, cell_size), dtype=np.uint8)
+        for player, color in ((0, PLAYER_0), (1, PLAYER_1)):
+            image = Image.new("L", (cell_size, cell_size), 0)
+            draw = ImageDraw.Draw(image)
+            if player == 0:
+                draw.line((margin, margin, cell_size - margin, cell_size - margin), fill=255, width=width)
+                draw.line((margin, cell_size - margin, cell_size - margin, margin), fill=255, width=width)
+            else:
+                draw.ellipse((margin, margin, cell_size - margin, cell_size - margin), outline=255, width=width)
+            sprites[player][np.asarray(image) > 127] = color
+        # Keep the grid lines visible over the sprites
+        sprites[:, 0, :] = sprites[:, :, 0] = BACKGROUND
+        self.sprites = sprites
+
+    @lru_cache(maxsize=256)
+    def header_band(self, left_name, right_name):
+        """Header band with the two player names (cached per pair of names)."""
+        from PIL import Image, ImageDraw
+
+        band = Image.fromarray(self.base[:self.header].copy(), "P")
+        draw = ImageDraw.Draw(band)
+        draw.fontmode = "1"  # no anti-aliasing: palette colors only
+        draw.text((2, self.header // 2), left_name, fill=PLAYER_0, font=self.font, anchor="lm")
+        draw.text((band.width - 2, self.header // 2), right_name, fill=PLAYER_1, font=self.font, anchor="rm")
+        band = np.asarray(band)
+        band.setflags(write=False)
+        return band
+
+    def render(self, gameboard, left_name="", right_name=""):
+        """Render one board (NxN or flat) as a palette-indexed frame (H, W)."""
+        return self.render_batch(np.asarray(gameboard)[None], left_name, right_name)[0]
+
+    def render_batch(self, gameboards, left_name="", right_name=""):
+        """Render B boards ((B, N, N) or (B, N*N)) as palette-indexed frames (B, H, W)."""
+        n, cell = self.board_length, self.cell_size
+        boards = np.asarray(gameboards).reshape(-1, n, n)
+        frames = np.repeat(self.base[None], len(boards), axis=0)
+        if left_name or right_name:
+            frames[:, :self.header] = self.header_band(left_name, right_name)
+
+        # (B, N, N) cell values -> (B, N, N, cell, cell) sprites -> (B, N*cell, N*cell) pixels
+        tiles = self.sprites[boards].transpose(0, 1, 3, 2, 4).reshape(len(boards), n * cell, n * cell)
+        grid = frames[:, self.header:self.header + n * cell, :n * cell]
+        np.copyto(grid, tiles, where=tiles != BACKGROUND)
+        return frames
+
+    def to_image(self, frame):
+        """PIL image of a frame."""
+        from PIL import Image
+
+        image = Image.fromarray(frame, "P")
+        image.putpalette(self.palette)
+        return image
+
+    def to_rgb(self, frame):
+        """(H, W, 3) RGB array of a frame."""
+        return np.asarray(self.palette, dtype=np.uint8).reshape(-1, 3)[frame]
+
+
+@lru_cache(maxsize=None)
+def get_board_renderer(board_length, theme="neon", cell_size=RENDER_CELL_SIZE):
+    """Return the (cached) BoardRenderer of a board size and theme."""
+    return BoardRenderer(board_length, theme, cell_size)
+
+
+_executor = None
+
+
+def get_render_executor():
+    """Thread pool shared by every FrameRecorder of the process."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=RENDER_THREADS, thread_name_prefix="render")
+    return _executor
+
+
+def encode_animation(renderer, frames, output=None, duration=500, format="GIF"):
+    """
+    Encode palette frames as an animated GIF or PNG (APNG).
+
+    Parameters:
+    - renderer (BoardRenderer): renderer of the frames (palette)
+    - frames (list[np.ndarray]): palette-indexed frames
+    - output (str or file object): destination (None: return the encoded bytes)
+    - duration (int): duration per frame in ms
+    - format (str): 'GIF' or 'PNG'
+
+    Returns:
+    - str or bytes: the output path, or the encoded animation when output is None
+    """
+    images = [renderer.to_image(frame) for frame in frames]
+    target = io.BytesIO() if output is None else output
+    images[0].save(target, format=format, save_all=True, append_images=images[1:], duration=duration, loop=0)
+    return target.getvalue() if output is None else output
+
+
+class FrameRecorder:
+    """
+    Records the frames of games in memory and encodes them to an animation.
+
+    Boards are copied and rendered on the shared render thread pool, so recording
+    costs the caller a board copy; frames go straight to the GIF / APNG encoder
+    without being written to and read back from disk.
+    """
+
+    def __init__(self, board_length, theme="neon", cell_size=RENDER_CELL_SIZE):
+        self.renderer = get_board_renderer(board_length, theme, cell_size)
+        self.executor = get_render_executor()
+        self.frames = []  # futures of the rendered frames, in order
+
+    def __len__(self):
+        return len(self.frames)
+
+    def add(self, gameboard, left_name="", right_name=""):
+        """Queue a board for rendering."""
+        self.frames.append(self.executor.submit(self.renderer.render, np.array(gameboard), left_name, right_name))
+
+    def clear(self):
+        self.frames = []
+
+    def save(self, path, duration=500):
+        """
+        Encode the recorded frames (GIF, or APNG for a .png path) on the render thread pool.
+
+        Returns:
+        - concurrent.futures.Future: resolves to path once the file is written
+        """
+        frames, self.frames = self.frames, []
+        format = "PNG" if os.path.splitext(path)[1].lower() in (".png", ".apng") else "GIF"
+
+        def _encode():
+            return encode_animation(self.renderer, [frame.result() for frame in frames], path, duration, format)
+
+        return self.executor.submit(_encode)
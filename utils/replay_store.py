@@ -0,0 +1,268 @@
+import hashlib
+import json
+import os
+import struct
+import time
+
+import numpy as np
+
+from configs.config import FILE_CACHE_CHECK_INTERVAL
+from utils.symmetry import get_symmetries
+
+# Header: magic, format version, board length, moves slots per side, 52 reserved bytes
+MAGIC = b"TTTR"
+VERSION = 1
+HEADER_FORMAT = "<4sHHH"
+HEADER_SIZE = 64
+
+
+def record_dtype(board_length):
+    """
+    Fixed-size record of one lost game: the agent's player id, the opponent and
+    agent move sequences (uint8, padded), their lengths and a 64-bit game hash.
+    """
+    max_moves = (board_length * board_length + 1) // 2
+    return np.dtype([
+        ("player", "u1"),
+        ("n_opponent_moves", "u1"),
+        ("n_agent_moves", "u1"),
+        ("opponent_moves", "u1", (max_moves,)),
+        ("agent_moves", "u1", (max_moves,)),
+        ("game_hash", "<u8"),
+    ])
+
+
+def game_hash(player, opponent_moves, symmetries=None):
+    """
+    64-bit hash of a review game (the agent's side and the opponent moves replayed).
+    With symmetries, the moves are canonicalized first so that the 8 rotated /
+    reflected versions of a game share the same hash.
+    """
+    if symmetries is not None and len(opponent_moves):
+        opponent_moves = symmetries.canonical_moves(opponent_moves)
+    data = bytes([player, len(opponent_moves)]) + bytes(opponent_moves)
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+
+class ReplayStore:
+    """
+    Append-only binary store of lost games, replacing defeated_games.json.
+
+    Games are fixed-size records after a 64-byte header, so the file is read through
+    a read-only np.memmap and a random game is sampled in O(1) without parsing.
+    New games are appended in a single write; the file is compacted to the newest
+    max_games records (retention) once it grows past max_games * (1 + slack).
+    Games whose (player, opponent moves) were already stored, up to a rotation or
+    reflection of the board, are skipped when deduplicate is set.
+
+    The mapping is refreshed when the file changes on disk (checked at most once
+    every check_interval seconds), so a store written by the evaluator is picked up
+    by the training environments of the same or other processes.
+    """
+
+    def __init__(self,
+                 path,
+                 board_length,
+                 max_games=100_000,
+                 deduplicate=True,
+                 slack=0.25,
+                 check_interval=FILE_CACHE_CHECK_INTERVAL):
+        """
+        Parameters:
+        - path (str): store file path
+        - board_length (int): size of the board (NxN)
+        - max_games (int): number of most recent games kept by compaction
+        - deduplicate (bool): skip games already present in the store
+        - slack (float): fraction of max_games appended before compacting
+        - check_interval (float): minimum seconds between two file change checks
+        """
+        self.path = path
+        self.board_length = board_length
+        self.dtype = record_dtype(board_length)
+        self.max_moves = self.dtype["opponent_moves"].shape[0]
+        self.symmetries = get_symmetries(board_length)
+        self.max_games = max_games
+        self.deduplicate = deduplicate
+        self.slack = slack
+        self.check_interval = check_interval
+
+        self.records = np.zeros(0, dtype=self.dtype)
+        self.signature = None
+        self.checked_at = None
+        self.hashes = None  # set of stored game hashes, built on the first append and extended by ours
+
+    # ---------------------------
+    # File handling
+    # ---------------------------
+    def header(self):
+        return struct.pack(HEADER_FORMAT, MAGIC, VERSION, self.board_length, self.max_moves).ljust(HEADER_SIZE, b"\0")
+
+    def check_header(self, f):
+        header = f.read(HEADER_SIZE)
+        if len(header) < HEADER_SIZE:
+            raise ValueError(f"❌ Corrupt replay store {self.path}: truncated header ({len(header)} of {HEADER_SIZE} bytes).")
+        magic, version, board_length, max_moves = struct.unpack_from(HEADER_FORMAT, header)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"❌ {self.path} is not a replay store (version {VERSION}).")
+        if board_length != self.board_length or max_moves != self.max_moves:
+            raise ValueError(f"❌ {self.path} stores {board_length}x{board_length} games, expected {self.board_length}x{self.board_length}.")
+
+    def refresh(self, force=False):
+        """Map the file again if it changed on disk since the last check."""
+        now = time.monotonic()
+        if not force and self.checked_at is not None and now - self.checked_at < self.check_interval:
+            return
+        self.checked_at = now
+
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self.records = np.zeros(0, dtype=self.dtype)
+            self.signature = None
+            self.hashes = None
+            return
+
+        signature = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        if signature == self.signature:
+            return
+        if stat.st_size == 0:
+            # Created but never written (e.g. interrupted first append): reinitialised on the next append
+            self.records = np.zeros(0, dtype=self.dtype)
+            self.signature = signature
+            self.hashes = None
+            return
+        with open(self.path, "rb") as f:
+            self.check_header(f)
+        # Ignore a partially written trailing record
+        n_records = (stat.st_size - HEADER_SIZE) // self.dtype.itemsize
+        if n_records > 0:
+            self.records = np.memmap(self.path, dtype=self.dtype, mode="r", offset=HEADER_SIZE, shape=(n_records,))
+        else:
+            self.records = np.zeros(0, dtype=self.dtype)
+        self.signature = signature
+        self.hashes = None
+
+    def __len__(self):
+        self.refresh()
+        return len(self.records)
+
+    # ---------------------------
+    # Reading
+    # ---------------------------
+    def game(self, index):
+        """Return (player, opponent_moves, agent_moves) of a stored game."""
+        record = self.records[index]
+        return (
+            int(record["player"]),
+            record["opponent_moves"][:record["n_opponent_moves"]].tolist(),
+            record["agent_moves"][:record["n_agent_moves"]].tolist(),
+        )
+
+    def sample(self, randrange):
+        """
+        Return (player, opponent_moves) of a uniformly chosen game, or None if the
+        store is empty.
+
+        Parameters:
+        - randrange (callable): random.randrange-like function (e.g. the env's random module)
+        """
+        n_records = len(self)
+        if n_records == 0:
+            return None
+        player, opponent_moves, _ = self.game(randrange(n_records))
+        return player, opponent_moves
+
+    # ---------------------------
+    # Writing
+    # ---------------------------
+    def append(self, games):
+        """
+        Append lost games to the store.
+
+        Parameters:
+        - games (list[tuple]): (player, opponent_moves, agent_moves) per game
+
+        Returns:
+        - int: number of games written (duplicates skipped)
+        """
+        self.refresh(force=True)
+        if self.deduplicate and self.hashes is None:
+            self.hashes = set(self.records["game_hash"].tolist())
+
+        new_records = np.zeros(len(games), dtype=self.dtype)
+        n_new = 0
+        for player, opponent_moves, agent_moves in games:
+            key = game_hash(player, opponent_moves, self.symmetries)
+            if self.deduplicate:
+                if key in self.hashes:
+                    continue
+                self.hashes.add(key)
+            record = new_records[n_new]
+            record["player"] = player
+            record["n_opponent_moves"] = len(opponent_moves)
+            record["opponent_moves"][:len(opponent_moves)] = opponent_moves
+            record["n_agent_moves"] = len(agent_moves)
+            record["agent_moves"][:len(agent_moves)] = agent_moves
+            record["game_hash"] = key
+            n_new += 1
+
+        if n_new:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            if len(self.records) == 0:
+                with open(self.path, "wb") as f:
+                    f.write(self.header())
+                expected_size = HEADER_SIZE
+            else:
+                expected_size = self.signature[1]
+            expected_size += n_new * self.dtype.itemsize
+            with open(self.path, "ab") as f:
+                f.write(new_records[:n_new].tobytes())
+            hashes = self.hashes
+            self.refresh(force=True)
+            # Keep the extended hash set unless another writer changed the file meanwhile
+            if hashes is not None and self.signature is not None and self.signature[1] == expected_size:
+                self.hashes = hashes
+            if len(self.records) > self.max_games * (1 + self.slack):
+                self.compact()
+        return n_new
+
+    def compact(self):
+        """Rewrite the store with its newest max_games games (atomic replace)."""
+        self.refresh(force=True)
+        kept = np.array(self.records[-self.max_games:])
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, "wb") as f:
+            f.write(self.header())
+            f.write(kept.tobytes())
+        os.replace(temporary_path, self.path)
+        self.refresh(force=True)
+
+    def clear(self):
+        """Delete every stored game."""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.refresh(force=True)
+
+
+_replay_stores = {}
+
+
+def get_replay_store(path, board_length):
+    """Return the process-wide ReplayStore of a file, shared by every environment."""
+    key = (os.path.abspath(path), board_length)
+    if key not in _replay_stores:
+        _replay_stores[key] = ReplayStore(path, board_length)
+    return _replay_stores[key]
+
+
+def import_lost_games_json(json_path, store):
+    """
+    Append the games of a legacy defeated_games.json file to a replay store.
+    Returns the number of games written.
+    """
+    with open(json_path, "r") as f:
+        data = json.load(f)
+    return store.append([
+        (value["player"], value["opponent_moves"], value.get("agent_moves", []))
+        for value in data.values()
+    ])
@@ -0,0 +1,368 @@
+import os
+
+import numpy as np
+
+from configs.config import SOLVER_TABLE_DIR, SOLVER_TABLE_MAX_CELLS
+from utils.bitboard import get_winning_lines, wins_through
+from utils.symmetry import get_symmetries
+from utils.tactics import winning_cells
+
+# Transposition table flags
+EXACT, LOWER_BOUND, UPPER_BOUND = 0, 1, 2
+
+
+def popcount(bits):
+    return bin(bits).count("1")
+
+
+class Solver:
+    """
+    Exact solver of (board_length, pattern_victory_length) tic-tac-toe.
+
+    Negamax with alpha-beta pruning on bitboards (marks of the side to move, marks of
+    the other side), with:
+    - move ordering: immediate win, forced block, transposition table move, then
+      cells crossed by the most winning lines first
+    - a transposition table keyed by the canonical position among the 8 symmetries
+      of the board (rotations / reflections)
+    - iterative deepening: searches of increasing depth until the value is proven
+
+    Scores are seen from the side to move: a win scores the number of empty cells
+    left before the winning move (faster wins score higher), a loss the opposite,
+    a draw 0.
+    """
+
+    def __init__(self, board_length, pattern_victory_length):
+        self.board_length = board_length
+        self.pattern_victory_length = pattern_victory_length
+        self.lines = get_winning_lines(board_length, pattern_victory_length)
+        self.n_cells = self.lines.n_cells
+        self.table = {}
+        self.winning = {}  # bitboard -> cells completing one of its windows, see winning_cells
+        self.nodes = 0
+
+        # Center-first static order: cells crossed by many winning lines first
+        self.move_order = sorted(range(self.n_cells), key=lambda action: -len(self.lines.lines_through_cell[action]))
+
+        # Symmetries of the board, shared with the other canonicalizing caches
+        self.symmetries = get_symmetries(board_length)
+        self.permutations = self.symmetries.permutation_tuples
+        self.inverse_permutations = self.symmetries.inverse_tuples
+
+    def canonical(self, mine, theirs):
+        """Return the smallest key of the position over the 8 symmetries, and that symmetry."""
+        return self.symmetries.canonical_bits(mine, theirs)
+
+    # ---------------------------
+    # Search
+    # ---------------------------
+    def wins(self, bits, action):
+        return wins_through(bits | self.lines.cell_bits[action], action, self.lines)
+
+    def winning_cells(self, bits):
+        """Cells completing a window of bits (memoized: sibling nodes share the bits of one side)."""
+        cells = self.winning.get(bits)
+        if cells is None:
+            cells = self.winning[bits] = winning_cells(bits, self.lines)
+        return cells
+
+    def search(self, mine, theirs, depth, alpha, beta):
+        """
+        Depth-limited negamax. Returns (score, best move); a score of 0 may be a
+        draw or an unresolved position when depth < number of empty cells.
+        """
+        self.nodes += 1
+        occupied = mine | theirs
+        moves = [action for action in self.move_order if not occupied >> action & 1]
+        empties = len(moves)
+
+        # Immediate wins of both sides, each found in one pass over the winning windows
+        winning = self.winning_cells(mine) & ~occupied
+        if winning:
+            return empties, next(action for action in moves if winning >> action & 1)
+        if empties == 1:
+            return 0, moves[0]
+
+        depth = min(depth, empties)
+        if depth == 0:
+            return 0, moves[0]
+
+        key, symmetry = self.canonical(mine, theirs)
+        entry = self.table.get(key)
+        table_move = None
+        alpha_start = alpha
+        if entry is not None:
+            flag, score, canonical_move, entry_depth = entry
+            table_move = self.inverse_permutations[symmetry][canonical_move]
+            if entry_depth >= depth:
+                if flag == EXACT:
+                    return score, table_move
+                if flag == LOWER_BOUND:
+                    alpha = max(alpha, score)
+                else:
+                    beta = min(beta, score)
+                if alpha >= beta:
+                    return score, table_move
+
+        threatened = self.winning_cells(theirs) & ~occupied
+        threats = [action for action in moves if threatened >> action & 1] if threatened else []
+        if len(threats) >= 2:
+            # Only one threat can be blocked: the opponent wins on its next move
+            return -(empties - 1), threats[0]
+        if threats:
+            ordered = threats
+        elif table_move is not None:
+            ordered = [table_move] + [action for action in moves if action != table_move]
+        else:
+            ordered = moves
+
+        best_score, best_move = -self.n_cells - 1, ordered[0]
+        for action in ordered:
+            score = -self.search(theirs, mine | self.lines.cell_bits[action], depth - 1, -beta, -alpha)[0]
+            if score > best_score:
+                best_score, best_move = score, action
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break
+
+        if best_score <= alpha_start:
+            flag = UPPER_BOUND
+        elif best_score >= beta:
+            flag = LOWER_BOUND
+        else:
+            flag = EXACT
+        self.table[key] = (flag, best_score, self.permutations[symmetry][best_move], depth)
+        return best_score, best_move
+
+    def solve(self, mine, theirs, max_depth=None):
+        """
+        Iterative deepening search of a position (side to move = mine).
+
+        Returns:
+        - tuple: (score, best move, proven); proven is False only when max_depth
+          stopped the search before the value was established.
+        """
+        empties = self.n_cells - popcount(mine | theirs)
+        max_depth = empties if max_depth is None else min(max_depth, empties)
+        score, move = 0, None
+        for depth in range(1, max_depth + 1):
+            score, move = self.search(mine, theirs, depth, -self.n_cells - 1, self.n_cells + 1)
+            if score != 0:
+                return score, move, True
+        return score, move, max_depth == empties
+
+
+# ---------------------------
+# Board helpers
+# ---------------------------
+def board_bits(board):
+    """Return the (player 0, player 1) bitboards of a gameboard (or flat board)."""
+    cells = np.asarray(board).ravel()
+    weights = 1 << np.arange(len(cells), dtype=object)
+    return int(weights[cells == 0].sum()), int(weights[cells == 1].sum())
+
+
+def player_to_move(board):
+    """Player 0 moves when both players have the same number of marks."""
+    cells = np.asarray(board).ravel()
+    return 0 if np.count_nonzero(cells == 0) == np.count_nonzero(cells == 1) else 1
+
+
+def outcome(score):
+    """Game-theoretic outcome of a score: 1 win, 0 draw, -1 loss."""
+    return (score > 0) - (score < 0)
+
+
+class SolutionTable:
+    """
+    Value / best-move table of a board configuration.
+
+    Positions solved once (and every position of small boards, precomputed by
+    build_solution_table) are stored under their canonical key in sorted arrays
+    persisted as .npz; other positions are solved on demand by the Solver, whose
+    transposition table is kept for the next queries.
+    """
+
+    def __init__(self, board_length, pattern_victory_length, keys=None, scores=None, moves=None):
+        self.board_length = board_length
+        self.pattern_victory_length = pattern_victory_length
+        self.solver = Solver(board_length, pattern_victory_length)
+        self.keys = np.zeros(0, dtype=np.uint64) if keys is None else keys
+        self.scores = np.zeros(0, dtype=np.int8) if scores is None else scores
+        self.moves = np.zeros(0, dtype=np.uint8) if moves is None else moves
+        self.solved = {}
+
+    def __len__(self):
+        return len(self.keys) + len(self.solved)
+
+    def lookup(self, board, player=None):
+        """
+        Solve a position.
+
+        Parameters:
+        - board (np.ndarray): gameboard (EMPTY_CELL, 0, 1)
+        - player (int): player to move (deduced from the mark counts if None)
+
+        Returns:
+        - tuple: (score, best move) from the point of view of the player to move
+          (score > 0 win, 0 draw, < 0 loss; larger |score| = faster)
+        """
+        player = player_to_move(board) if player is None else player
+        bits = board_bits(board)
+        return self.lookup_bits(bits[player], bits[1 - player])
+
+    def lookup_bits(self, mine, theirs, max_depth=None):
+        """
+        Same as lookup for bitboards of the side to move and of its opponent.
+
+        With max_depth, a position missing from the table is searched max_depth plies
+        deep only: a score of 0 may then be an unresolved position, and such results
+        are not stored.
+        """
+        solver = self.solver
+        key, symmetry = solver.canonical(mine, theirs)
+
+        index = np.searchsorted(self.keys, key)
+        if index < len(self.keys) and int(self.keys[index]) == key:
+            return int(self.scores[index]), solver.inverse_permutations[symmetry][int(self.moves[index])]
+        if key in self.solved:
+            score, canonical_move = self.solved[key]
+            return score, solver.inverse_permutations[symmetry][canonical_move]
+
+        score, move, proven = solver.solve(mine, theirs, max_depth)
+        if proven:
+            self.solved[key] = (score, solver.permutations[symmetry][move])
+        return score, move
+
+    def move_scores(self, board, player=None):
+        """
+        Score of every valid move of a position, from the mover's point of view.
+
+        Returns:
+        - dict: action -> score after playing it
+        """
+        player = player_to_move(board) if player is None else player
+        bits = board_bits(board)
+        return self.move_scores_bits(bits[player], bits[1 - player])
+
+    def move_scores_bits(self, mine, theirs, max_depth=None):
+        """
+        Same as move_scores for bitboards of the side to move and of its opponent.
+
+        With max_depth, every move is searched max_depth plies deep (its own ply
+        included), see lookup_bits. The solver's transposition table is cleared
+        and win tables are cleared afterwards, so that they do not grow with every
+        position met on large boards.
+        """
+        occupied = mine | theirs
+        empties = self.solver.n_cells - popcount(occupied)
+        scores = {}
+        for action in range(self.solver.n_cells):
+            if occupied >> action & 1:
+                continue
+            if self.solver.wins(mine, action):
+                scores[action] = empties
+            elif empties == 1:
+                scores[action] = 0
+            else:
+                child_depth = None if max_depth is None else max(max_depth - 1, 0)
+                scores[action] = -self.lookup_bits(theirs, mine | 1 << action, child_depth)[0]
+        if max_depth is not None:
+            self.solver.table.clear()
+            self.solver.winning.clear()
+        return scores
+
+    def regret(self, board, action, player=None):
+        """
+        Outcome lost by playing action instead of a perfect move:
+        0 (optimal), 1 (win -> draw or draw -> loss) or 2 (win -> loss).
+        """
+        scores = self.move_scores(board, player)
+        return outcome(max(scores.values())) - outcome(scores[action])
+
+    # ---------------------------
+    # Persistence
+    # ---------------------------
+    def merged(self):
+        """Return (keys, scores, moves) of every solved position, sorted by key."""
+        keys = np.concatenate([self.keys, np.array(list(self.solved.keys()), dtype=np.uint64)])
+        scores = np.concatenate([self.scores, np.array([value[0] for value in self.solved.values()], dtype=np.int8)])
+        moves = np.concatenate([self.moves, np.array([value[1] for value in self.solved.values()], dtype=np.uint8)])
+        order = np.argsort(keys)
+        return keys[order], scores[order], moves[order]
+
+    def save(self, path):
+        """Persist the table (precomputed and on-demand entries) to a .npz file."""
+        self.keys, self.scores, self.moves = self.merged()
+        self.solved = {}
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        np.savez_compressed(path, keys=self.keys, scores=self.scores, moves=self.moves,
+                            board_length=self.board_length, pattern_victory_length=self.pattern_victory_length)
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        return cls(int(data["board_length"]), int(data["pattern_victory_length"]),
+                   data["keys"], data["scores"], data["moves"])
+
+
+def solution_table_path(board_length, pattern_victory_length):
+    return os.path.join(SOLVER_TABLE_DIR, f"solution_{board_length}x{board_length}_{pattern_victory_length}.npz")
+
+
+def build_solution_table(board_length, pattern_victory_length):
+    """
+    Solve every reachable non-terminal position of a board configuration.
+    Practical for 3x3 boards (627 canonical positions); much slower beyond.
+
+    Returns:
+    - SolutionTable: table with one entry per canonical position
+    """
+    table = SolutionTable(board_length, pattern_victory_length)
+    solver = table.solver
+    lines = solver.lines
+
+    # Positions as (side to move, other side), expanded move by move
+    frontier = {(0, 0)}
+    while frontier:
+        following = set()
+        for mine, theirs in frontier:
+            table.lookup_bits(mine, theirs)
+            occupied = mine | theirs
+            for action in range(solver.n_cells):
+                if occupied >> action & 1:
+                    continue
+                placed = mine | lines.cell_bits[action]
+                if wins_through(placed, action, lines) or occupied | lines.cell_bits[action] == lines.full_mask:
+                    continue
+                key, symmetry = solver.canonical(theirs, placed)
+                # One representative per canonical position
+                following.add((key >> solver.n_cells, key & lines.full_mask))
+        frontier = following
+
+    table.keys, table.scores, table.moves = table.merged()
+    table.solved = {}
+    return table
+
+
+_solution_tables = {}
+
+
+def get_solution_table(board_length, pattern_victory_length):
+    """
+    Return the process-wide SolutionTable of a board configuration: loaded from
+    SOLVER_TABLE_DIR, else built and saved when the board has at most
+    SOLVER_TABLE_MAX_CELLS cells, else empty (positions solved on demand).
+    """
+    key = (board_length, pattern_victory_length)
+    if key not in _solution_tables:
+        path = solution_table_path(board_length, pattern_victory_length)
+        if os.path.exists(path):
+            table = SolutionTable.load(path)
+        elif board_length * board_length <= SOLVER_TABLE_MAX_CELLS:
+            table = build_solution_table(board_length, pattern_victory_length)
+            table.save(path)
+        else:
+            table = SolutionTable(board_length, pattern_victory_length)
+        _solution_tables[key] = table
+    return _solution_tables[key]
@@ -0,0 +1,169 @@
+from functools import lru_cache
+
+import numpy as np
+
+# The 8 symmetries of the square (dihedral group D4), as (line, column) -> image maps
+TRANSFORM_NAMES = (
+    "identity",
+    "rotate_90",
+    "rotate_180",
+    "rotate_270",
+    "flip_columns",
+    "flip_lines",
+    "transpose",
+    "anti_transpose",
+)
+
+
+def _transform_cell(transform, x, y, n):
+    return (
+        (x, y),
+        (y, n - 1 - x),
+        (n - 1 - x, n - 1 - y),
+        (n - 1 - y, x),
+        (x, n - 1 - y),
+        (n - 1 - x, y),
+        (y, x),
+        (n - 1 - y, n - 1 - x),
+    )[transform]
+
+
+class BoardSymmetries:
+    """
+    Precomputed index permutations of the 8 symmetries of an NxN board.
+
+    permutations[t][action] is the cell a mark on `action` moves to under transform t,
+    inverse_permutations[t] maps it back. A board transformed by t is therefore
+    board.ravel()[inverse_permutations[t]], an action chosen on a transformed board is
+    mapped back with inverse_action, and a mask is transformed like a board.
+
+    canonical(board) returns a key shared by the 8 images of a position and the
+    transform leading to it, so that caches, solvers and replay stores can store one
+    entry per equivalence class.
+    """
+
+    def __init__(self, board_length):
+        self.board_length = board_length
+        self.n_cells = board_length * board_length
+        permutations = np.zeros((8, self.n_cells), dtype=np.int64)
+        for transform in range(8):
+            for x in range(board_length):
+                for y in range(board_length):
+                    image_x, image_y = _transform_cell(transform, x, y, board_length)
+                    permutations[transform, x * board_length + y] = image_x * board_length + image_y
+        self.permutations = permutations
+        self.inverse_permutations = np.argsort(permutations, axis=1)
+        # Python tuples for the scalar helpers (faster than indexing arrays)
+        self.permutation_tuples = tuple(tuple(row) for row in permutations.tolist())
+        self.inverse_tuples = tuple(tuple(row) for row in self.inverse_permutations.tolist())
+
+        # Cell values (0, 1, EMPTY_CELL < 4) as base-4 digits: exact integer keys up to 32 cells
+        self.powers = 4 ** np.arange(self.n_cells - 1, -1, -1, dtype=np.uint64) if self.n_cells <= 32 else None
+
+        # Byte-wise lookup tables applying each transform to an integer bitboard
+        n_chunks = (self.n_cells + 7) // 8
+        self.byte_tables = []
+        for permutation in self.permutation_tuples:
+            tables = []
+            for chunk in range(n_chunks):
+                table = []
+                for byte in range(256):
+                    image = 0
+                    for bit in range(8):
+                        cell = chunk * 8 + bit
+                        if byte >> bit & 1 and cell < self.n_cells:
+                            image |= 1 << permutation[cell]
+                    table.append(image)
+                tables.append(tuple(table))
+            self.byte_tables.append(tuple(tables))
+
+    # ---------------------------
+    # Boards and masks
+    # ---------------------------
+    def transform_board(self, board, transform):
+        """Image of a board (NxN or flat) under a transform, with the same shape."""
+        board = np.asarray(board)
+        return board.ravel()[self.inverse_permutations[transform]].reshape(board.shape)
+
+    def inverse_board(self, board, transform):
+        """Undo transform_board."""
+        board = np.asarray(board)
+        return board.ravel()[self.permutations[transform]].reshape(board.shape)
+
+    def all_boards(self, board):
+        """The 8 images of a board, shape (8, n_cells)."""
+        return np.asarray(board).ravel()[self.inverse_permutations]
+
+    def canonical(self, board):
+        """
+        Canonical form of a board.
+
+        Returns:
+        - tuple: (key, transform) where key is identical for the 8 images of the board
+          (an integer up to 32 cells, bytes beyond) and transform maps the board to
+          its canonical image
+        """
+        images = self.all_boards(board)
+        if self.powers is not None:
+            keys = images.astype(np.uint64) @ self.powers
+            transform = int(np.argmin(keys))
+            return int(keys[transform]), transform
+        keys = [image.astype(np.int8).tobytes() for image in images]
+        transform = min(range(8), key=keys.__getitem__)
+        return keys[transform], transform
+
+    def canonical_batch(self, boards):
+        """canonical for a (B, n_cells) array of boards (up to 32 cells): (keys, transforms)."""
+        images = np.asarray(boards).reshape(len(boards), -1)[:, self.inverse_permutations]
+        keys = images.astype(np.uint64) @ self.powers
+        transforms = keys.argmin(axis=1)
+        return keys[np.arange(len(keys)), transforms], transforms
+
+    transform_mask = transform_board
+    inverse_mask = inverse_board
+
+    # ---------------------------
+    # Actions
+    # ---------------------------
+    def transform_action(self, action, transform):
+        """Cell of the transformed board corresponding to action."""
+        return self.permutation_tuples[transform][int(action)]
+
+    def inverse_action(self, action, transform):
+        """Cell of the original board corresponding to an action on the transformed board."""
+        return self.inverse_tuples[transform][int(action)]
+
+    # ---------------------------
+    # Bitboards
+    # ---------------------------
+    def transform_bits(self, bits, transform):
+        """Image of an integer bitboard under a transform."""
+        image = 0
+        for table in self.byte_tables[transform]:
+            image |= table[bits & 0xFF]
+            bits >>= 8
+        return image
+
+    def canonical_bits(self, first, second):
+        """
+        Canonical form of a position given as two bitboards.
+
+        Returns:
+        - tuple: (key, transform), key = (first image << n_cells) | second image, minimal over the 8 transforms
+        """
+        best_key, best_transform = None, 0
+        for transform in range(8):
+            key = self.transform_bits(first, transform) << self.n_cells | self.transform_bits(second, transform)
+            if best_key is None or key < best_key:
+                best_key, best_transform = key, transform
+        return best_key, best_transform
+
+    def canonical_moves(self, moves):
+        """Smallest image of a move sequence over the 8 transforms (as a tuple)."""
+        return min(tuple(permutation[int(move)] for move in moves) for permutation in self.permutation_tuples)
+
+
+@lru_cache(maxsize=None)
+def get_symmetries(board_length):
+    """Return the (cached) BoardSymmetries of a board size."""
+    return BoardSymmetries(board_length)
@@ -0,0 +1,46 @@
+def winning_cells(bits, lines):
+    """
+    Cells where a mark of the player completes a winning window, in one pass over the windows.
+
+    For each window, `window & ~bits` is the set of cells the player still lacks in it
+    (K minus the player's count in the window): a window with exactly one missing cell
+    makes that cell a win. Every window is visited once whatever the number of
+    candidate cells, and no board is copied.
+
+    Same semantics as utils.heuristics.is_winning_move: the mark is placed on the
+    cell whatever it contains, and any winning window on the resulting board counts
+    (if the player already owns a full window, every cell wins).
+
+    Parameters:
+    - bits (int): bitboard of the player
+    - lines (WinningLines): tables of the board configuration
+
+    Returns:
+    - int: bitmask of the winning cells
+    """
+    cells = 0
+    for window in lines.all_lines:
+        missing = window & ~bits
+        if missing & (missing - 1) == 0:  # At most one cell missing
+            if missing == 0:
+                return lines.full_mask
+            cells |= missing
+    return cells
+
+
+def first_winning_move(bits, lines, moves):
+    """
+    Return the first of the moves that completes a winning window for the player, or None.
+
+    Parameters:
+    - bits (int): bitboard of the player
+    - lines (WinningLines): tables of the board configuration
+    - moves (iterable[int]): candidate cell indices, in the order they are tested
+    """
+    cells = winning_cells(bits, lines)
+    if cells:
+        for move in moves:
+            if cells >> int(move) & 1:
+                return int(move)
+    return None
+
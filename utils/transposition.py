@@ -0,0 +1,242 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from configs.config import (
+    EMPTY_CELL,
+    HEURISTIC_CACHE_SIZE,
+    HEURISTIC_CACHE_PRECOMPUTE,
+    HEURISTIC_CACHE_PRECOMPUTE_MAX_CELLS,
+)
+from utils.bitboard import get_winning_lines, wins_through
+from utils.symmetry import get_symmetries
+
+
+class HeuristicCache:
+    """
+    Bounded LRU cache of heuristic results (heuristic_points_calcul differences of the
+    player who just moved) keyed by position.
+
+    A key is the canonical form of (marks of the player who just moved, marks of the
+    other player) over the 8 board symmetries (utils/symmetry.py): the heuristic is
+    invariant under the symmetries, so every symmetric image of a position shares
+    one entry, and the key is exact (no hash collisions).
+
+    Precomputed entries (see precompute_heuristic_cache) live in a separate table that
+    is never evicted.
+    """
+
+    def __init__(self, max_size=HEURISTIC_CACHE_SIZE):
+        """
+        Parameters:
+        - max_size (int): maximum number of LRU entries (0 disables caching)
+        """
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.precomputed = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Return the cached value of a key (counted as a hit), or None (counted as a miss)."""
+        value = self.precomputed.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        value = self.entries.get(key)
+        if value is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return value
+
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        """Store a value, evicting the least recently used entry beyond max_size."""
+        if self.max_size > 0:
+            self.entries[key] = value
+            if len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def get_or_compute(self, key, compute):
+        """
+        Return the cached value of a key, computing and storing it on a miss.
+
+        Parameters:
+        - key (int): canonical position key
+        - compute (callable): function without arguments returning the value
+        """
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        """Remove every entry and reset the counters."""
+        self.entries.clear()
+        self.precomputed.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        """Return hit / miss counters and sizes."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "size": len(self.entries),
+            "precomputed": len(self.precomputed),
+            "max_size": self.max_size,
+        }
+
+
+_heuristic_caches = {}
+
+
+def get_heuristic_cache(board_length, pattern_victory_length):
+    """
+    Return the process-wide heuristic cache of a board configuration. Precomputes it
+    when HEURISTIC_CACHE_PRECOMPUTE is set and the board is small enough.
+    """
+    key = (board_length, pattern_victory_length)
+    if key not in _heuristic_caches:
+        cache = HeuristicCache(HEURISTIC_CACHE_SIZE)
+        _heuristic_caches[key] = cache
+        if HEURISTIC_CACHE_PRECOMPUTE and board_length * board_length <= HEURISTIC_CACHE_PRECOMPUTE_MAX_CELLS:
+            precompute_heuristic_cache(board_length, pattern_victory_length, cache)
+    return _heuristic_caches[key]
+
+
+def board_bits_batch(boards, player_ids):
+    """
+    Bitboards of K boards seen from the given players.
+
+    Parameters:
+    - boards (np.ndarray): shape (K, N, N) or (K, N*N)
+    - player_ids (int or np.ndarray): player of each board, scalar or shape (K,)
+
+    Returns:
+    - list[tuple[int, int]]: (marks of the player, marks of the other player) of each board
+    """
+    boards = np.asarray(boards).reshape(len(boards), -1)
+    player_ids = np.broadcast_to(np.asarray(player_ids, dtype=np.int64), boards.shape[:1])
+    own = np.packbits(boards == player_ids[:, None], axis=1, bitorder="little")
+    other = np.packbits(boards == 1 - player_ids[:, None], axis=1, bitorder="little")
+    return [(int.from_bytes(a.tobytes(), "little"), int.from_bytes(b.tobytes(), "little")) for a, b in zip(own, other)]
+
+
+def bits_boards_batch(positions, board_length):
+    """
+    Gameboards of K positions given as (player 0 marks, player 1 marks) bitboards.
+
+    Returns:
+    - np.ndarray: int8 boards of shape (K, N, N)
+    """
+    n_cells = board_length * board_length
+    weights = 1 << np.arange(n_cells, dtype=object)
+    boards = np.full((len(positions), n_cells), EMPTY_CELL, dtype=np.int8)
+    for i, (first, second) in enumerate(positions):
+        boards[i, (first & weights).astype(bool)] = 0
+        boards[i, (second & weights).astype(bool)] = 1
+    return boards.reshape(-1, board_length, board_length)
+
+
+def heuristic_differences(boards, player_ids, board_length, pattern_victory_length):
+    """
+    heuristic_points_calcul of the given players minus their opponents', for K boards,
+    through the process-wide cache of the configuration: the misses are scored
+    together with the batched NumPy evaluator and stored.
+
+    Parameters:
+    - boards (np.ndarray): shape (K, N, N) or (K, N*N)
+    - player_ids (int or np.ndarray): player of each board (usually the one who just moved), scalar or shape (K,)
+    - board_length (int): Size of the board (NxN).
+    - pattern_victory_length (int): Number of consecutive marks needed to win.
+
+    Returns:
+    - np.ndarray: float64 differences of shape (K,)
+    """
+    from utils.heuristics_vectorized import heuristic_points_batch
+
+    boards = np.asarray(boards).reshape(-1, board_length, board_length)
+    player_ids = np.broadcast_to(np.asarray(player_ids, dtype=np.int64), boards.shape[:1])
+    cache = get_heuristic_cache(board_length, pattern_victory_length)
+    if cache.max_size == 0 and not cache.precomputed:
+        return (heuristic_points_batch(boards, player_ids, board_length, pattern_victory_length)
+                - heuristic_points_batch(boards, 1 - player_ids, board_length, pattern_victory_length))
+    symmetries = get_symmetries(board_length)
+    keys = [symmetries.canonical_bits(own, other)[0] for own, other in board_bits_batch(boards, player_ids)]
+    values = np.array([cache.get(key) for key in keys], dtype=np.float64)
+
+    missing = np.flatnonzero(np.isnan(values))
+    if len(missing):
+        players = player_ids[missing]
+        values[missing] = (heuristic_points_batch(boards[missing], players, board_length, pattern_victory_length)
+                           - heuristic_points_batch(boards[missing], 1 - players, board_length, pattern_victory_length))
+        for i in missing:
+            cache.put(keys[i], float(values[i]))
+    return values
+
+
+def precompute_heuristic_cache(board_length, pattern_victory_length, cache, batch_size=4096):
+    """
+    Evaluate the heuristic difference (heuristic_points_calcul of the player who just
+    moved minus the opponent's) on every reachable non-terminal position and store
+    the results in cache.precomputed. Only practical for 3x3 and 4x4 boards.
+
+    The heuristic is invariant under the board symmetries, so positions are
+    enumerated move by move on bitboards up to symmetry (one representative per
+    class, keyed by its canonical form) and scored with the batched NumPy evaluator.
+
+    Parameters:
+    - board_length (int): Size of the board (NxN).
+    - pattern_victory_length (int): Number of consecutive marks needed to win.
+    - cache (HeuristicCache): cache to fill.
+    - batch_size (int): number of positions scored per batch.
+
+    Returns:
+    - int: number of precomputed positions
+    """
+    from utils.heuristics_vectorized import heuristic_points_batch
+
+    lines = get_winning_lines(board_length, pattern_victory_length)
+    symmetries = get_symmetries(board_length)
+    n_cells = lines.n_cells
+
+    def score(positions):
+        """Score canonical positions given as (marks of the player who just moved, other marks)."""
+        positions = list(positions)
+        for start in range(0, len(positions), batch_size):
+            chunk = positions[start:start + batch_size]
+            # The player who just moved is written as player 0
+            boards = bits_boards_batch(chunk, board_length)
+            rewards = (heuristic_points_batch(boards, 0, board_length, pattern_victory_length)
+                       - heuristic_points_batch(boards, 1, board_length, pattern_victory_length))
+            for (mover, other), reward in zip(chunk, rewards.tolist()):
+                cache.precomputed[mover << n_cells | other] = reward
+
+    # Positions as (marks of the player who just moved, marks of the player to move)
+    frontier = {(0, 0)}
+    n_positions = 0
+    while frontier:
+        following = set()
+        for mover, to_move in frontier:
+            occupied = mover | to_move
+            for action in range(n_cells):
+                if occupied >> action & 1:
+                    continue
+                cell = 1 << action
+                played = to_move | cell
+                if wins_through(played, action, lines) or occupied | cell == lines.full_mask:
+                    continue
+                # One representative per symmetry class
+                key, _ = symmetries.canonical_bits(played, mover)
+                following.add((key >> n_cells, key & lines.full_mask))
+        score(following)
+        n_positions += len(following)
+        frontier = following
+    return n_positions